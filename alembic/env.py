@@ -13,6 +13,8 @@ from src.core.database import Base
 from src.models.location import Location
 from src.models.category import Category
 from src.models.review import LocationCategoryReview
+from src.models.api_key import ApiKey
+from src.models.view_event import LocationViewEvent, LocationViewStats, ViewRollup
 
 config = context.config
 
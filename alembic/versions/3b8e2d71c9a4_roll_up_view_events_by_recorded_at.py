@@ -0,0 +1,33 @@
+"""Roll up view events by recorded_at
+
+Revision ID: 3b8e2d71c9a4
+Revises: e6b1c3a8f540
+Create Date: 2026-10-19 18:12:05.114862
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8e2d71c9a4'
+down_revision: Union[str, None] = 'e6b1c3a8f540'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('location_view_events', sa.Column('recorded_at', sa.DateTime(timezone=True), nullable=True))
+    # existing rows were windowed by viewed_at, keep them where they were
+    op.execute('UPDATE location_view_events SET recorded_at = viewed_at')
+    op.alter_column('location_view_events', 'recorded_at', nullable=False, server_default=sa.text('now()'))
+    op.drop_index('idx_location_view_events_viewed_at', table_name='location_view_events', postgresql_using='brin')
+    op.create_index('idx_location_view_events_recorded_at', 'location_view_events', ['recorded_at'], unique=False, postgresql_using='brin')
+
+
+def downgrade() -> None:
+    op.drop_index('idx_location_view_events_recorded_at', table_name='location_view_events', postgresql_using='brin')
+    op.create_index('idx_location_view_events_viewed_at', 'location_view_events', ['viewed_at'], unique=False, postgresql_using='brin')
+    op.drop_column('location_view_events', 'recorded_at')
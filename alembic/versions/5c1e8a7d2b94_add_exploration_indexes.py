@@ -0,0 +1,28 @@
+"""Add exploration indexes
+
+Revision ID: 5c1e8a7d2b94
+Revises: 097e2f9388a6
+Create Date: 2026-10-19 11:40:08.517392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e8a7d2b94'
+down_revision: Union[str, None] = '097e2f9388a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_locations_point_geography', 'locations', [sa.text('geography(point)')], unique=False, postgresql_using='gist')
+    op.create_index('idx_location_category_reviews_staleness', 'location_category_reviews', [sa.text('last_reviewed_at ASC NULLS FIRST')], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_location_category_reviews_staleness', table_name='location_category_reviews')
+    op.drop_index('idx_locations_point_geography', table_name='locations', postgresql_using='gist')
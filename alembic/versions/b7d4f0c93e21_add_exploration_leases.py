@@ -0,0 +1,28 @@
+"""Add exploration leases
+
+Revision ID: b7d4f0c93e21
+Revises: 5c1e8a7d2b94
+Create Date: 2026-10-19 12:26:51.093147
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d4f0c93e21'
+down_revision: Union[str, None] = '5c1e8a7d2b94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('location_category_reviews', sa.Column('leased_until', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('location_category_reviews', sa.Column('leased_by', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('location_category_reviews', 'leased_by')
+    op.drop_column('location_category_reviews', 'leased_until')
@@ -0,0 +1,28 @@
+"""Add location name trigram index
+
+Revision ID: d2a94f61c8e7
+Revises: b7d4f0c93e21
+Create Date: 2026-10-19 15:04:12.480316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a94f61c8e7'
+down_revision: Union[str, None] = 'b7d4f0c93e21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('idx_locations_name_trgm', 'locations', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    op.drop_index('idx_locations_name_trgm', table_name='locations', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    # pg_trgm is left installed, other objects may depend on it
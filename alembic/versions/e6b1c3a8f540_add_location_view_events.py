@@ -0,0 +1,47 @@
+"""Add location view events
+
+Revision ID: e6b1c3a8f540
+Revises: d2a94f61c8e7
+Create Date: 2026-10-19 16:41:37.902215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b1c3a8f540'
+down_revision: Union[str, None] = 'd2a94f61c8e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('location_view_events',
+    sa.Column('id', sa.BigInteger(), sa.Identity(always=False), nullable=False),
+    sa.Column('location_id', sa.Integer(), nullable=False),
+    sa.Column('viewed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_location_view_events_viewed_at', 'location_view_events', ['viewed_at'], unique=False, postgresql_using='brin')
+    op.create_table('location_view_stats',
+    sa.Column('location_id', sa.Integer(), nullable=False),
+    sa.Column('view_count', sa.BigInteger(), nullable=False),
+    sa.Column('last_viewed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['location_id'], ['locations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('location_id')
+    )
+    op.create_table('location_view_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('rolled_up_to', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('location_view_rollups')
+    op.drop_table('location_view_stats')
+    op.drop_index('idx_location_view_events_viewed_at', table_name='location_view_events', postgresql_using='brin')
+    op.drop_table('location_view_events')
@@ -0,0 +1,74 @@
+"""
+Python CPU spent preparing repository statements, rebuilt per call vs prebuilt.
+
+Each case goes through the statement compiled cache the way
+``Connection.execute`` does, on the asyncpg dialect, with a warm cache on
+both variants. A statement rebuilt per call pays construction plus a full
+cache-key traversal before its cache hit; a prebuilt one memoizes its key.
+The "cold" column is a compilation without a cache hit, for scale.
+Round trips to the database are not included.
+
+Usage:
+    python -m benchmarks.bench_queries
+"""
+import timeit
+
+from sqlalchemy.dialects.postgresql import asyncpg
+from sqlalchemy.util import LRUCache
+
+from src.models.category import Category
+from src.repositories.base import BaseRepository
+from src.repositories.recomendation import EXPLORATION_QUERY, build_exploration_query
+
+NUMBER = 2000
+
+dialect = asyncpg.dialect()
+
+
+def _compile(statement, compiled_cache) -> None:
+    # what Connection._execute_clauseelement runs before it hits the driver
+    statement._compile_w_cache(
+        dialect,
+        compiled_cache=compiled_cache,
+        column_keys=[],
+        for_executemany=False,
+        schema_translate_map=None
+    )
+
+
+def _per_call_us(fn, number: int = NUMBER) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def main() -> None:
+    repository = BaseRepository(Category)
+    shape = (("is_active", False), ("name", False))
+
+    cases = [
+        (
+            "get_exploration_recommendations",
+            build_exploration_query,
+            lambda: EXPLORATION_QUERY,
+        ),
+        (
+            "get_multi (2 filters)",
+            lambda: repository._build_get_multi_statement(shape).offset(0).limit(100),
+            lambda: repository._get_multi_statement(shape),
+        ),
+    ]
+
+    print(f"{'query':<34} {'cold us':>9} {'rebuilt us':>11} {'prebuilt us':>12} {'speedup':>9}")
+    for name, rebuilt, prebuilt in cases:
+        cold_us = _per_call_us(lambda: _compile(rebuilt(), None), number=NUMBER // 10)
+        compiled_cache = LRUCache(100)
+        _compile(prebuilt(), compiled_cache)
+        rebuilt_us = _per_call_us(lambda: _compile(rebuilt(), compiled_cache))
+        prebuilt_us = _per_call_us(lambda: _compile(prebuilt(), compiled_cache))
+        print(
+            f"{name:<34} {cold_us:>9.2f} {rebuilt_us:>11.2f} {prebuilt_us:>12.2f} "
+            f"{rebuilt_us / prebuilt_us:>8.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
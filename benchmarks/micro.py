@@ -0,0 +1,274 @@
+"""
+Microbenchmarks of the Python-side hot paths, checked against stored baselines.
+
+Timings are divided by a fixed reference workload measured in the same run,
+so the baselines in baselines.json hold machine-independent ratios rather
+than microseconds. A case regresses when its ratio grows by more than the
+tolerance.
+
+Usage:
+    python -m benchmarks.micro                  # compare, exit 1 on regression
+    python -m benchmarks.micro --tolerance 0.5
+    python -m benchmarks.micro --update         # rewrite baselines.json
+"""
+import argparse
+import json
+import sys
+import timeit
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+from geoalchemy2.elements import WKTElement
+from pydantic import TypeAdapter
+
+from src.models.category import Category
+from src.repositories.base import BaseRepository
+from src.repositories.recomendation import RecommendationRepository
+from src.schemas.location import LocationWithDistance
+from src.schemas.recomendation import ExplorationRecommendation
+from src.services.base_service import BaseService
+
+BASELINES_PATH = Path(__file__).with_name("baselines.json")
+DEFAULT_TOLERANCE = 0.3
+REPEAT = 5
+
+
+@dataclass
+class Case:
+    name: str
+    fn: Callable[[], object]
+    number: int = 2000
+
+
+@dataclass
+class Result:
+    name: str
+    us: float
+    ratio: float
+    baseline: Optional[float] = None
+
+    @property
+    def change(self) -> Optional[float]:
+        if self.baseline is None:
+            return None
+        return self.ratio / self.baseline - 1
+
+
+def run_sync(coroutine):
+    """Drive a coroutine that never suspends, without an event loop per call"""
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("coroutine suspended, the fake session must not await")
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def scalars(self):
+        return self
+
+    def scalar_one_or_none(self):
+        return self.rows[0] if self.rows else None
+
+
+class FakeSession:
+    """Pays the statement cache-key lookup like a real execute, no I/O"""
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def execute(self, statement, params=None):
+        statement._generate_cache_key()
+        return FakeResult(self.rows)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _exploration_rows(count: int = 10) -> List[SimpleNamespace]:
+    return [
+        SimpleNamespace(
+            location_id=i,
+            location_name=f"Location {i}",
+            category_id=i % 3,
+            category_name=f"Category {i % 3}",
+            last_reviewed_at=None if i % 2 else _now()
+        )
+        for i in range(count)
+    ]
+
+
+def _locations(count: int = 10) -> List[SimpleNamespace]:
+    return [
+        SimpleNamespace(
+            id=i,
+            name=f"Location {i}",
+            description=None,
+            latitude=4.6 + i / 1000,
+            longitude=-74.08 + i / 1000,
+            created_at=_now(),
+            updated_at=_now(),
+            distance_km=i / 10,
+            # as LOCATION_CATEGORIES returns them
+            categories=[{"id": 1, "name": "Parks"}, {"id": 2, "name": "Museums"}]
+        )
+        for i in range(count)
+    ]
+
+
+def cases() -> List[Case]:
+    exploration_repository = RecommendationRepository()
+    exploration_session = FakeSession(_exploration_rows())
+
+    category_repository = BaseRepository(Category)
+    category_session = FakeSession([SimpleNamespace(id=1, name="Parks")])
+
+    exploration_adapter = TypeAdapter(List[ExplorationRecommendation])
+    exploration_payload = [
+        {
+            "location_id": row.location_id,
+            "location_name": row.location_name,
+            "category_id": row.category_id,
+            "category_name": row.category_name,
+            "last_reviewed_at": row.last_reviewed_at,
+        }
+        for row in _exploration_rows()
+    ]
+
+    locations = _locations()
+
+    class StubRepository:
+        async def get(self, db, id):
+            return id
+
+    service = BaseService(StubRepository())
+
+    return [
+        Case(
+            "get_exploration_recommendations",
+            lambda: run_sync(exploration_repository.get_exploration_recommendations(
+                exploration_session, limit=10
+            )),
+            number=500
+        ),
+        Case(
+            "get_multi (2 filters)",
+            lambda: run_sync(category_repository.get_multi(
+                category_session,
+                filters={"is_active": True, "name": "Parks"}
+            ))
+        ),
+        Case(
+            "ExplorationRecommendation x10 validate+dump",
+            lambda: exploration_adapter.dump_json(
+                exploration_adapter.validate_python(exploration_payload)
+            ),
+            number=1000
+        ),
+        Case(
+            "LocationWithDistance x10 from_attributes+dump",
+            lambda: [
+                LocationWithDistance.model_validate(location, from_attributes=True).model_dump_json()
+                for location in locations
+            ],
+            number=1000
+        ),
+        Case(
+            "WKTElement point",
+            lambda: WKTElement(f'POINT({-74.08} {4.61})', srid=4326),
+            number=20000
+        ),
+        Case(
+            "BaseService.get dispatch",
+            lambda: run_sync(service.get(None, 1)),
+            number=20000
+        ),
+    ]
+
+
+def _per_call_us(fn: Callable[[], object], number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=REPEAT)) / number * 1e6
+
+
+def _reference() -> None:
+    sorted(range(200, 0, -1))
+
+
+def reference_us() -> float:
+    """The unit every case is expressed in"""
+    return _per_call_us(_reference, 20000)
+
+
+def run(selected: Optional[List[Case]] = None) -> List[Result]:
+    unit = reference_us()
+    results = []
+    for case in selected if selected is not None else cases():
+        us = _per_call_us(case.fn, case.number)
+        results.append(Result(name=case.name, us=us, ratio=us / unit))
+    return results
+
+
+def load_baselines(path: Path = BASELINES_PATH) -> Dict[str, float]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())["cases"]
+
+
+def save_baselines(results: List[Result], path: Path = BASELINES_PATH) -> None:
+    path.write_text(json.dumps(
+        {
+            "unit": "time per call / time of the reference workload",
+            "cases": {result.name: round(result.ratio, 4) for result in results},
+        },
+        indent=2
+    ) + "\n")
+
+
+def regressions(results: List[Result], baselines: Dict[str, float], tolerance: float) -> List[Result]:
+    for result in results:
+        result.baseline = baselines.get(result.name)
+    return [
+        result for result in results
+        if result.change is not None and result.change > tolerance
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown over the baseline ratio, 0.3 = 30%%")
+    parser.add_argument("--update", action="store_true",
+                        help="store this run as the new baselines")
+    args = parser.parse_args(argv)
+
+    results = run()
+    if args.update:
+        save_baselines(results)
+        print(f"Baselines written to {BASELINES_PATH}")
+        return 0
+
+    regressed = regressions(results, load_baselines(), args.tolerance)
+    print(f"{'case':<46} {'us':>9} {'ratio':>8} {'baseline':>9} {'change':>8}")
+    for result in results:
+        baseline = f"{result.baseline:.2f}" if result.baseline is not None else "-"
+        change = f"{result.change:+.0%}" if result.change is not None else "new"
+        flag = "  REGRESSION" if result in regressed else ""
+        print(f"{result.name:<46} {result.us:>9.2f} {result.ratio:>8.2f} {baseline:>9} {change:>8}{flag}")
+
+    if regressed:
+        print(f"{len(regressed)} case(s) slower than baseline by more than {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,23 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
-import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from src.core.admission import AdmissionControlMiddleware
 from src.core.config import get_settings
-from src.core.database import engine, Base, init_db_pool
+from src.core.coverage import coverage_counters
+from src.core.database import async_session, engine, Base, get_db, init_db_pool
+from src.core.invalidation import invalidation_bus
+from src.core.query_budget import QueryBudgetMiddleware
+from src.core.server_timing import ServerTimingMiddleware
+from src.core.view_events import view_event_log
+from src.core.warmup import keep_warming_up
+from src.api.health import router as health_router
 from src.api.v1.router import api_router
+from src.repositories.memory import get_memory_db
+from src.services.container import ServiceContainer
 
 
 settings = get_settings()
@@ -25,18 +35,54 @@ async def lifespan(app: FastAPI):
     Contexto de vida de la aplicación para setup y cleanup
     """
     # Setup
+    app.state.ready = False
+    # services and repositories live as long as the app, see ServiceContainer
+    app.state.services = ServiceContainer()
+    if settings.REPOSITORY_BACKEND == "memory":
+        # no database: nothing to connect, listen to or warm up
+        app.dependency_overrides[get_db] = get_memory_db
+        app.state.ready = True
+        yield
+        app.state.ready = False
+        return
+
     pool = await init_db_pool()
     app.state.pool = pool
     # create tables in development
     if settings.ENVIRONMENT == "development":
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
-    
-    
+
+    # listen for cache invalidations from other workers
+    if settings.INVALIDATION_BUS_ENABLED:
+        await invalidation_bus.start(pool)
+
+    # nearby views are buffered and copied in batches
+    await view_event_log.start(pool)
+    # the coverage counters are reloaded periodically to correct drift
+    await coverage_counters.start(
+        app.state.services.location_categories.repository,
+        async_session
+    )
+
+    # warm up in the background so /ready can report progress
+    if settings.WARMUP_ENABLED:
+        warmup_task = asyncio.create_task(keep_warming_up(app))
+    else:
+        warmup_task = None
+        app.state.ready = True
+
     yield
-    
+
     # Cleanup
     logger.info("Shutting down application...")
+    app.state.ready = False
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    await invalidation_bus.stop()
+    await view_event_log.stop(pool)
+    await coverage_counters.stop()
+    await pool.close()
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -44,6 +90,15 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Query counts per request, innermost so shed requests are not counted
+app.add_middleware(QueryBudgetMiddleware)
+
+# Per-phase latency of sampled requests in Server-Timing
+app.add_middleware(ServerTimingMiddleware)
+
+# Admission control, registered before CORS so shed responses still get CORS headers
+app.add_middleware(AdmissionControlMiddleware)
+
 # CORS Middleware
 app.add_middleware(
     CORSMiddleware,
@@ -54,9 +109,13 @@ app.add_middleware(
 )
 
 # Add API routes
+app.include_router(health_router)
 app.include_router(api_router, prefix="/api/v1")
 
 if __name__ == "__main__":
+    # uvicorn is only needed when running this module directly
+    import uvicorn
+
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
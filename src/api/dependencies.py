@@ -1,38 +1,166 @@
-from fastapi import Depends, Security, HTTPException, status
+from typing import List
+
+from fastapi import Depends, Query, Request, Response, Security, HTTPException, status
+from pydantic import ValidationError
 from fastapi.security.api_key import APIKeyHeader
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.config import get_settings
-
-from src.repositories.location import LocationRepository, Location
-from src.repositories.category import CategoryRepository, Category
-from src.repositories.recomendation import (
-    RecommendationRepository,
-    LocationCategoryReview
+from src.core.database import get_db
+from src.core.rate_limit import (
+    READ_POLICY,
+    WRITE_POLICY,
+    RateLimitPolicy,
+    get_rate_limiter
 )
+from src.core.server_timing import timed
+from src.schemas.location import BoundingBox
+from src.services.api_key import hash_api_key
+from src.services.category import CategoryService
+from src.services.container import ServiceContainer
+from src.services.location import LocationService
+from src.services.recomendation import RecommendationService
+from src.services.stats import StatsService
+from src.services.tile import TileService
 settings = get_settings()
 
-# TODO: simulate valid API keys this should be replaced by a real API key verification
-VALID_API_KEYS = {"valid-api-key-1", "valid-api-key-2"}
-
-
-
 api_key_header = APIKeyHeader(name=settings.API_KEY_HEADER, auto_error=False)
 
-def verify_api_key(api_key: str = Security(api_key_header)) -> str:
+def get_services(request: Request) -> ServiceContainer:
+    """The app-scoped container built in lifespan"""
+    return request.app.state.services
+
+async def verify_api_key(
+    api_key: str = Security(api_key_header),
+    session: AsyncSession = Depends(get_db),
+    services: ServiceContainer = Depends(get_services)
+) -> str:
     if settings.ENVIRONMENT == "development":
         return api_key
-    if not api_key:
+    # get_db is shared with the endpoint, so a cache miss costs one query
+    # on the request's connection, and a hit costs none, not even a checkout
+    with timed("auth"):
+        if not api_key or await services.api_keys.verify(session, api_key) is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Could not validate API key"
+            )
+    return api_key
+
+def get_lease_holder(
+    request: Request,
+    api_key: str = Depends(verify_api_key)
+) -> str:
+    """Leases are held per API key, stored hashed like the key itself"""
+    if api_key:
+        return hash_api_key(api_key)
+    # development without a key: one holder per client address
+    return request.client.host if request.client else "anonymous"
+
+async def _rate_limit_identity(
+    request: Request,
+    api_key: str,
+    session: AsyncSession,
+    services: ServiceContainer
+) -> str:
+    """
+    The verified key's id, or the client address when the key is missing or
+    invalid, so sending a new random key does not get a fresh bucket
+    """
+    if api_key:
+        principal = await services.api_keys.verify(session, api_key)
+        if principal is not None:
+            return f"key:{principal.id}"
+    return f"ip:{request.client.host if request.client else 'anonymous'}"
+
+def _rate_limit(policy: RateLimitPolicy):
+    async def dependency(
+        request: Request,
+        response: Response,
+        api_key: str = Security(api_key_header),
+        session: AsyncSession = Depends(get_db),
+        services: ServiceContainer = Depends(get_services)
+    ) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        identity = await _rate_limit_identity(request, api_key, session, services)
+        result = await get_rate_limiter().hit(f"{policy.name}:{identity}", policy)
+        if not result.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded",
+                headers=result.headers()
+            )
+        response.headers.update(result.headers())
+    return dependency
+
+rate_limit_read = _rate_limit(READ_POLICY)
+rate_limit_write = _rate_limit(WRITE_POLICY)
+
+def get_bounding_box(
+    min_longitude: float = Query(..., ge=-180, le=180),
+    min_latitude: float = Query(..., ge=-90, le=90),
+    max_longitude: float = Query(..., ge=-180, le=180),
+    max_latitude: float = Query(..., ge=-90, le=90)
+) -> BoundingBox:
+    try:
+        return BoundingBox(
+            min_longitude=min_longitude,
+            min_latitude=min_latitude,
+            max_longitude=max_longitude,
+            max_latitude=max_latitude
+        )
+    except ValidationError as e:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Could not validate API key"
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=e.errors(include_url=False, include_context=False)
         )
-    return api_key
 
-def get_location_repository() -> LocationRepository:
-    return LocationRepository(Location)
+def get_ids(
+    ids: str = Query(..., description="Comma separated ids, e.g. 3,7,12")
+) -> List[int]:
+    """ Parse the ids of a batch get, duplicates dropped and order kept """
+    try:
+        parsed = [int(id) for id in ids.split(",") if id.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="ids must be a comma separated list of integers"
+        )
+    parsed = list(dict.fromkeys(parsed))
+    if not parsed:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="ids must not be empty"
+        )
+    if len(parsed) > settings.BATCH_GET_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {settings.BATCH_GET_MAX_IDS} ids per request"
+        )
+    return parsed
+
+def get_category_service(
+    services: ServiceContainer = Depends(get_services)
+) -> CategoryService:
+    return services.categories
+
+def get_location_service(
+    services: ServiceContainer = Depends(get_services)
+) -> LocationService:
+    return services.locations
+
+def get_recommendation_service(
+    services: ServiceContainer = Depends(get_services)
+) -> RecommendationService:
+    return services.recommendations
 
-def get_category_repository() -> CategoryRepository:
-    return CategoryRepository(Category)
+def get_stats_service(
+    services: ServiceContainer = Depends(get_services)
+) -> StatsService:
+    return services.stats
 
-def get_recommendation_service() -> RecommendationRepository:
-    return RecommendationRepository(LocationCategoryReview)
+def get_tile_service(
+    services: ServiceContainer = Depends(get_services)
+) -> TileService:
+    return services.tiles
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, Request, Response, status
+
+from src.api.dependencies import verify_api_key
+from src.core.admission import admission_controller
+
+router = APIRouter()
+
+
+@router.get("/ready", include_in_schema=False)
+async def readiness(request: Request, response: Response):
+    """
+    Readiness probe, returns 200 only once the warm-up phase has succeeded
+    """
+    if not getattr(request.app.state, "ready", False):
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        if getattr(request.app.state, "warmup_failed", False):
+            # the warm-up is retried, see keep_warming_up
+            return {"status": "degraded"}
+        return {"status": "warming_up"}
+    return {"status": "ready"}
+
+
+@router.get(
+    "/metrics/admission",
+    include_in_schema=False,
+    dependencies=[Depends(verify_api_key)]
+)
+async def admission_metrics():
+    """
+    In-flight requests, pool wait and load shedding counters, behind the
+    same API key as the write routes
+    """
+    return admission_controller.snapshot()
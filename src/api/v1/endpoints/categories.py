@@ -2,22 +2,31 @@ from typing import List
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.core.database import get_db
+from src.core.server_timing import TimedRoute
 
+from src.schemas.base import BatchResponse
 from src.schemas.category import CategoryCreate, CategoryResponse
 from src.services.category import CategoryService
-from src.api.dependencies import  verify_api_key
+from src.api.dependencies import (
+    get_category_service,
+    get_ids,
+    rate_limit_read,
+    rate_limit_write,
+    verify_api_key
+)
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 @router.post(
     "/",
     response_model=CategoryResponse,
     status_code=201,
-    dependencies=[Depends(verify_api_key)]
+    dependencies=[Depends(verify_api_key), Depends(rate_limit_write)]
 )
 async def create_category(
     category_in: CategoryCreate,
     db: AsyncSession = Depends(get_db),
+    category_service: CategoryService = Depends(get_category_service),
 
 ):
     """
@@ -27,18 +36,38 @@ async def create_category(
         "name": category_in.name,
         "description": category_in.description
     }
-    category_service = CategoryService()
     category = await category_service.create(session=db, obj_in=category_data)
     return category
 
 
-@router.get("/", response_model=List[CategoryResponse])
+@router.get(
+    "/",
+    response_model=List[CategoryResponse],
+    dependencies=[Depends(rate_limit_read)]
+)
 async def get_categories(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     session: AsyncSession = Depends(get_db),
+    category_service: CategoryService = Depends(get_category_service),
 ):
 
-    category_service = CategoryService()
     category =  await category_service.get_active_categories(session=session, skip=skip, limit=limit)
-    return category
\ No newline at end of file
+    return category
+
+
+@router.get(
+    "/batch",
+    response_model=BatchResponse[CategoryResponse],
+    dependencies=[Depends(rate_limit_read)]
+)
+async def get_categories_by_ids(
+    ids: List[int] = Depends(get_ids),
+    session: AsyncSession = Depends(get_db),
+    category_service: CategoryService = Depends(get_category_service),
+):
+    """
+    Get several categories in one call, e.g. GET /categories/batch?ids=1,2,3.
+    Unknown ids are listed in missing instead of failing the request
+    """
+    return await category_service.get_categories_by_ids(session=session, ids=ids)
@@ -1,20 +1,40 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.config import get_settings
 from src.core.database import get_db
-from src.api.dependencies import verify_api_key
-from src.schemas.location import LocationResponse, LocationWithDistance
+from src.core.server_timing import TimedRoute
+from src.api.dependencies import (
+    get_bounding_box,
+    get_ids,
+    get_location_service,
+    rate_limit_read,
+    rate_limit_write,
+    verify_api_key
+)
+from src.schemas.base import BatchResponse
+from src.schemas.location import (
+    BoundingBox,
+    ClusterResponse,
+    LocationPage,
+    LocationResponse,
+    LocationSuggestion,
+    LocationWithCategories,
+    LocationWithDistance
+)
 from src.services.location import LocationService
 
-router = APIRouter()
+settings = get_settings()
+
+router = APIRouter(route_class=TimedRoute)
 
 @router.post(
     "/",
     response_model=LocationResponse,
     status_code=201,
-    dependencies=[Depends(verify_api_key)]
+    dependencies=[Depends(verify_api_key), Depends(rate_limit_write)]
 )
 async def create_location(
     name: str, 
@@ -22,10 +42,10 @@ async def create_location(
     longitude: float,
     category: int,
     description: Optional[str] = None,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    service: LocationService = Depends(get_location_service)
 ):
     # Awaiting the creation of the location
-    service = LocationService()
     return await service.create_location(
         session=db,
         name=name,
@@ -35,22 +55,130 @@ async def create_location(
         description=description
     )
 
-@router.get("/nearby", response_model=List[LocationWithDistance])
+@router.get(
+    "/batch",
+    response_model=BatchResponse[LocationResponse],
+    dependencies=[Depends(rate_limit_read)]
+)
+async def get_locations_by_ids(
+    ids: List[int] = Depends(get_ids),
+    db: AsyncSession = Depends(get_db),
+    service: LocationService = Depends(get_location_service),
+):
+    """
+    Get several locations in one call, e.g. GET /locations/batch?ids=1,2,3.
+    Unknown ids are listed in missing instead of failing the request
+    """
+    return await service.get_locations_by_ids(session=db, ids=ids)
+
+@router.get(
+    "/nearby",
+    response_model=List[LocationWithDistance],
+    dependencies=[Depends(rate_limit_read)]
+)
 async def get_nearby_locations(
     latitude: float = Query(..., ge=-90, le=90),
     longitude: float = Query(..., ge=-180, le=180),
     radius_km: float = Query(default=1.0, gt=0, le=10),
     limit: int = Query(default=10, ge=1, le=100),
     db: AsyncSession = Depends(get_db),
+    service: LocationService = Depends(get_location_service),
 ):
     """
     Obtain a list of nearby locations
     """
-    service = LocationService()
     return await service.get_nearby_locations(
         session=db,
         latitude=latitude,
         longitude=longitude,
         radius_km=radius_km,
         limit=limit
-    )
\ No newline at end of file
+    )
+
+@router.get(
+    "/search",
+    response_model=List[LocationSuggestion],
+    dependencies=[Depends(rate_limit_read)]
+)
+async def search_locations(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(default=10, ge=1, le=20),
+    latitude: Optional[float] = Query(default=None, ge=-90, le=90),
+    longitude: Optional[float] = Query(default=None, ge=-180, le=180),
+    db: AsyncSession = Depends(get_db),
+    service: LocationService = Depends(get_location_service),
+):
+    """
+    Autocomplete locations by name: prefix matches first, then fuzzy ones.
+    With latitude/longitude, closer locations rank higher
+    """
+    if (latitude is None) != (longitude is None):
+        raise HTTPException(
+            status_code=422,
+            detail="latitude and longitude must be provided together"
+        )
+    return await service.search_locations(
+        session=db,
+        query=q,
+        limit=limit,
+        latitude=latitude,
+        longitude=longitude
+    )
+
+@router.get(
+    "/viewport",
+    response_model=LocationPage,
+    dependencies=[Depends(rate_limit_read)]
+)
+async def get_viewport_locations(
+    bbox: BoundingBox = Depends(get_bounding_box),
+    category_id: Optional[int] = Query(default=None, ge=1),
+    after_id: int = Query(default=0, ge=0),
+    limit: int = Query(default=100, ge=1, le=settings.VIEWPORT_MAX_ROWS),
+    db: AsyncSession = Depends(get_db),
+    service: LocationService = Depends(get_location_service),
+):
+    """
+    Obtain the locations inside a map viewport, paged with the
+    next_after_id cursor of the previous response
+    """
+    return await service.get_viewport_locations(
+        session=db,
+        bbox=bbox,
+        limit=limit,
+        after_id=after_id,
+        category_id=category_id
+    )
+
+@router.get(
+    "/clusters",
+    response_model=ClusterResponse,
+    dependencies=[Depends(rate_limit_read)]
+)
+async def get_location_clusters(
+    zoom: int = Query(..., ge=0, le=22),
+    bbox: BoundingBox = Depends(get_bounding_box),
+    db: AsyncSession = Depends(get_db),
+    service: LocationService = Depends(get_location_service),
+):
+    """
+    Obtain the locations inside a bounding box grouped into map clusters,
+    cells with only a few locations are returned as individual points
+    """
+    return await service.get_clusters(session=db, bbox=bbox, zoom=zoom)
+
+# after the fixed paths, so /nearby and /viewport are not read as an id
+@router.get(
+    "/{location_id}",
+    response_model=LocationWithCategories,
+    dependencies=[Depends(rate_limit_read)]
+)
+async def get_location(
+    location_id: int,
+    db: AsyncSession = Depends(get_db),
+    service: LocationService = Depends(get_location_service),
+):
+    """
+    Obtain a location with the names of its categories
+    """
+    return await service.get_location(session=db, id=location_id)
@@ -1,32 +1,106 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Path, Query, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.config import get_settings
 from src.core.database import get_db
-from src.schemas.recomendation import ExplorationRecommendation
+from src.core.server_timing import TimedRoute
+from src.api.dependencies import (
+    get_lease_holder,
+    get_recommendation_service,
+    rate_limit_read,
+    rate_limit_write
+)
+from src.schemas.recomendation import ExplorationRecommendation, LeasedRecommendation
 from src.repositories.recomendation import RecommendationRepository
 from src.services.recomendation import RecommendationService
 
+settings = get_settings()
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
-@router.get("/explore", response_model=List[ExplorationRecommendation])
+@router.get(
+    "/explore",
+    response_model=List[ExplorationRecommendation],
+    dependencies=[Depends(rate_limit_read)]
+)
 async def get_exploration_recommendations(
     limit: int = Query(default=10, ge=1, le=50),
+    latitude: Optional[float] = Query(default=None, ge=-90, le=90),
+    longitude: Optional[float] = Query(default=None, ge=-180, le=180),
+    radius_km: float = Query(default=1.0, gt=0, le=10),
     db:AsyncSession = Depends(get_db),
+    recommendation_service: RecommendationService = Depends(get_recommendation_service),
 
 ):
-    
-    recommendation_service = RecommendationService()
+    """
+    Obtain stale location-category pairs to review, only the ones within
+    radius_km of latitude/longitude when a point is given
+    """
+    if (latitude is None) != (longitude is None):
+        raise HTTPException(
+            status_code=422,
+            detail="latitude and longitude must be provided together"
+        )
 
     try:
         raw_recommendations = await recommendation_service.get_exploration_recommendations(
             session=db,
-            limit=limit
+            limit=limit,
+            latitude=latitude,
+            longitude=longitude,
+            radius_km=radius_km
         )
       
         return raw_recommendations
     except Exception as e:
         print(e)
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post(
+    "/leases",
+    response_model=List[LeasedRecommendation],
+    dependencies=[Depends(rate_limit_write)]
+)
+async def lease_exploration_recommendations(
+    limit: int = Query(default=10, ge=1, le=50),
+    lease_seconds: int = Query(
+        default=settings.EXPLORATION_LEASE_SECONDS,
+        ge=1,
+        le=settings.EXPLORATION_LEASE_MAX_SECONDS
+    ),
+    leased_by: str = Depends(get_lease_holder),
+    db: AsyncSession = Depends(get_db),
+    recommendation_service: RecommendationService = Depends(get_recommendation_service),
+):
+    """
+    Claim up to limit stale location-category pairs for lease_seconds,
+    other reviewers will not get them until they are released or expire
+    """
+    return await recommendation_service.lease_exploration_recommendations(
+        session=db,
+        leased_by=leased_by,
+        limit=limit,
+        lease_seconds=lease_seconds
+    )
+
+@router.delete(
+    "/leases/{lease_id}",
+    status_code=204,
+    dependencies=[Depends(rate_limit_write)]
+)
+async def release_lease(
+    lease_id: int = Path(..., ge=1),
+    leased_by: str = Depends(get_lease_holder),
+    db: AsyncSession = Depends(get_db),
+    recommendation_service: RecommendationService = Depends(get_recommendation_service),
+):
+    """
+    Release a lease held by the caller
+    """
+    await recommendation_service.release_lease(
+        session=db,
+        lease_id=lease_id,
+        leased_by=leased_by
+    )
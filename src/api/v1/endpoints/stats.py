@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.database import get_db
+from src.core.server_timing import TimedRoute
+from src.api.dependencies import get_stats_service, rate_limit_read
+from src.schemas.stats import CoverageResponse
+from src.services.stats import StatsService
+
+router = APIRouter(route_class=TimedRoute)
+
+@router.get(
+    "/coverage",
+    response_model=CoverageResponse,
+    dependencies=[Depends(rate_limit_read)]
+)
+async def get_coverage(
+    db: AsyncSession = Depends(get_db),
+    service: StatsService = Depends(get_stats_service),
+):
+    """
+    Location-category pairs per category that were never reviewed, are
+    stale or are fresh. Served from counters, cheap enough to poll
+    """
+    return await service.get_coverage(session=db)
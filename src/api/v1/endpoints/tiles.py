@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import get_settings
+from src.core.database import get_db
+from src.core.server_timing import TimedRoute
+from src.core.tiles import is_valid_tile
+from src.api.dependencies import get_tile_service, rate_limit_read
+from src.services.tile import TileService
+
+settings = get_settings()
+
+router = APIRouter(route_class=TimedRoute)
+
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+
+@router.get(
+    "/{z}/{x}/{y}.mvt",
+    response_class=Response,
+    responses={200: {"content": {MVT_MEDIA_TYPE: {}}}},
+    dependencies=[Depends(rate_limit_read)]
+)
+async def get_tile(
+    z: int = Path(..., ge=0, le=settings.TILE_MAX_ZOOM),
+    x: int = Path(..., ge=0),
+    y: int = Path(..., ge=0),
+    db: AsyncSession = Depends(get_db),
+    service: TileService = Depends(get_tile_service),
+):
+    """
+    Obtain a Mapbox vector tile with every location, in a "locations" layer
+    """
+    if not is_valid_tile(z, x, y):
+        raise HTTPException(status_code=404, detail="Tile not found")
+
+    tile = await service.get_tile(session=db, z=z, x=x, y=y)
+    return Response(content=tile, media_type=MVT_MEDIA_TYPE)
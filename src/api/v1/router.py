@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from .endpoints import locations, recomendations, categories
+from .endpoints import locations, recomendations, categories, stats, tiles
 
 api_router = APIRouter()
 
@@ -17,4 +17,14 @@ api_router.include_router(
     recomendations.router,
     prefix="/recommendations",
     tags=["recommendations"]
-)
\ No newline at end of file
+)
+api_router.include_router(
+    tiles.router,
+    prefix="/tiles",
+    tags=["tiles"]
+)
+api_router.include_router(
+    stats.router,
+    prefix="/stats",
+    tags=["stats"]
+)
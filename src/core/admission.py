@@ -0,0 +1,179 @@
+import json
+import math
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .config import get_settings
+
+settings = get_settings()
+
+# Paths that must answer even when the service is shedding load
+EXEMPT_PATHS = frozenset({"/ready", "/metrics/admission"})
+
+# requests matching no route (404s, scans) share one counter, keying them
+# by raw path would let random paths grow the counters without bound
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class AdmissionController:
+    """
+    Tracks in-flight requests per route and connection pool wait time,
+    and decides whether a new request should be admitted or shed
+    """
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_in_flight_per_route: int,
+        max_pool_wait_ms: float,
+        retry_after_seconds: int,
+        pool_wait_decay_seconds: float = 5.0
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_in_flight_per_route = max_in_flight_per_route
+        self.max_pool_wait = max_pool_wait_ms / 1000
+        self.retry_after_seconds = retry_after_seconds
+        self.pool_wait_decay_seconds = pool_wait_decay_seconds
+
+        self.in_flight = 0
+        self.in_flight_by_route: Dict[str, int] = defaultdict(int)
+        self.admitted = 0
+        self.shed: Dict[str, int] = defaultdict(int)
+        self.shed_by_route: Dict[str, int] = defaultdict(int)
+        self._pool_wait = 0.0
+        self._pool_wait_at = 0.0
+
+    def record_pool_wait(self, seconds: float) -> None:
+        """Feed the time a request spent waiting for a database connection"""
+        self._pool_wait = 0.8 * self.pool_wait + 0.2 * seconds
+        self._pool_wait_at = time.monotonic()
+
+    @property
+    def pool_wait(self) -> float:
+        """
+        Moving average of pool wait time. It decays while no samples
+        arrive, so shedding stops on its own once the database recovers.
+        """
+        if not self._pool_wait_at:
+            return 0.0
+        idle = time.monotonic() - self._pool_wait_at
+        return self._pool_wait * math.exp(-idle / self.pool_wait_decay_seconds)
+
+    def try_admit(self, route: str) -> Optional[str]:
+        """Admit a request, or return the reason it must be shed"""
+        if self.in_flight >= self.max_in_flight:
+            reason = "in_flight"
+        elif self.in_flight_by_route.get(route, 0) >= self.max_in_flight_per_route:
+            reason = "route_in_flight"
+        elif self.pool_wait > self.max_pool_wait:
+            reason = "pool_wait"
+        else:
+            self.in_flight += 1
+            self.in_flight_by_route[route] += 1
+            self.admitted += 1
+            return None
+
+        self.record_shed(route, reason)
+        return reason
+
+    def release(self, route: str) -> None:
+        self.in_flight -= 1
+        self.in_flight_by_route[route] -= 1
+        if self.in_flight_by_route[route] <= 0:
+            del self.in_flight_by_route[route]
+
+    def record_shed(self, route: str, reason: str) -> None:
+        self.shed[reason] += 1
+        self.shed_by_route[route] += 1
+
+    def snapshot(self) -> dict:
+        """Counters exposed on the admission metrics endpoint"""
+        return {
+            "in_flight": self.in_flight,
+            "in_flight_by_route": {
+                route: count
+                for route, count in self.in_flight_by_route.items()
+                if count
+            },
+            "pool_wait_ms": round(self.pool_wait * 1000, 3),
+            "admitted_total": self.admitted,
+            "shed_total": sum(self.shed.values()),
+            "shed_by_reason": dict(self.shed),
+            "shed_by_route": dict(self.shed_by_route),
+            "limits": {
+                "max_in_flight": self.max_in_flight,
+                "max_in_flight_per_route": self.max_in_flight_per_route,
+                "max_pool_wait_ms": self.max_pool_wait * 1000,
+            },
+        }
+
+
+admission_controller = AdmissionController(
+    max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+    max_in_flight_per_route=settings.ADMISSION_MAX_IN_FLIGHT_PER_ROUTE,
+    max_pool_wait_ms=settings.ADMISSION_MAX_POOL_WAIT_MS,
+    retry_after_seconds=settings.ADMISSION_RETRY_AFTER_SECONDS
+)
+
+
+class AdmissionControlMiddleware:
+    """
+    Rejects requests with 503 and Retry-After as soon as the controller
+    reports saturation, instead of letting them queue on the pools
+    """
+    _max_cached_routes = 1024
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController = admission_controller):
+        self.app = app
+        self.controller = controller
+        self._routes: Dict[tuple, str] = {}
+
+    def _route_for(self, scope: Scope) -> str:
+        """Resolve the route template so /tiles/1/2/3 and /tiles/4/5/6 share a counter"""
+        key = (scope["method"], scope["path"])
+        route = self._routes.get(key)
+        if route is None:
+            route = UNMATCHED_ROUTE
+            for candidate in scope["app"].router.routes:
+                match, _ = candidate.matches(scope)
+                if match == Match.FULL:
+                    route = candidate.path
+                    break
+            if len(self._routes) < self._max_cached_routes:
+                self._routes[key] = route
+        return route
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        route = self._route_for(scope)
+        reason = self.controller.try_admit(route)
+        if reason is not None:
+            await self._reject(send, reason)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(route)
+
+    async def _reject(self, send: Send, reason: str) -> None:
+        body = json.dumps({
+            "detail": "Service overloaded, retry later",
+            "reason": reason,
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.controller.retry_after_seconds).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
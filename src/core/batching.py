@@ -0,0 +1,112 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+BatchFunction = Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+
+
+class BatchLoader:
+    """
+    DataLoader-style batching: every ``load(key)`` made in the same event
+    loop tick is resolved by one ``batch_fn(keys)`` call, scheduled with
+    ``call_soon`` after the callers that are already runnable. Results are
+    memoized for the loader's lifetime, keys missing from the batch result
+    resolve to None. Failed keys are not memoized.
+
+    Batches run one at a time, chunks of ``max_batch_size`` included: the
+    batch function usually queries one AsyncSession, which does not allow
+    concurrent operations.
+    """
+    def __init__(self, batch_fn: BatchFunction, max_batch_size: Optional[int] = None):
+        self._batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self._futures: Dict[Hashable, asyncio.Future] = {}
+        self._queue: List[Hashable] = []
+        self._dispatching: Set[asyncio.Task] = set()
+        self._lock = asyncio.Lock()
+        self.batches = 0
+
+    async def load(self, key: Hashable) -> Any:
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[key] = future
+            if not self._queue:
+                loop.call_soon(self._dispatch)
+            self._queue.append(key)
+        # shield so a cancelled caller does not cancel the key for the others
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: List[Hashable]) -> List[Any]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: Hashable, value: Any) -> None:
+        """Memoize a value known without a query, e.g. a row just written"""
+        future = self._futures.get(key)
+        if future is None or future.done():
+            future = asyncio.get_running_loop().create_future()
+            self._futures[key] = future
+        # a pending future has callers waiting on it, resolve it for them
+        future.set_result(value)
+
+    def clear(self, key: Hashable) -> None:
+        future = self._futures.get(key)
+        if future is not None and future.done():
+            del self._futures[key]
+
+    def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        # keys primed since they were queued are already resolved
+        pending = [
+            (key, self._futures[key]) for key in keys
+            if not self._futures[key].done()
+        ]
+        if not pending:
+            return
+        size = self.max_batch_size or len(pending)
+        chunks = [pending[start:start + size] for start in range(0, len(pending), size)]
+        task = asyncio.get_running_loop().create_task(self._resolve_all(chunks))
+        # keep a reference until it finishes, the loop only holds weak ones
+        self._dispatching.add(task)
+        task.add_done_callback(self._dispatching.discard)
+
+    async def _resolve_all(self, chunks: List[List[Tuple[Hashable, asyncio.Future]]]) -> None:
+        try:
+            # a dispatch of a later tick waits for the one still running
+            async with self._lock:
+                for chunk in chunks:
+                    await self._resolve(chunk)
+        except asyncio.CancelledError:
+            # the chunks not run yet would otherwise never resolve
+            for chunk in chunks:
+                for key, future in chunk:
+                    if not future.done():
+                        if self._futures.get(key) is future:
+                            del self._futures[key]
+                        future.cancel()
+            raise
+
+    async def _resolve(self, pending: List[Tuple[Hashable, asyncio.Future]]) -> None:
+        self.batches += 1
+        try:
+            values = await self._batch_fn([key for key, _ in pending])
+        except BaseException as e:
+            for key, future in pending:
+                if future.done():
+                    # primed while the batch ran
+                    continue
+                if self._futures.get(key) is future:
+                    del self._futures[key]
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                    continue
+                future.set_exception(e)
+                # reading the exception marks it retrieved, so an error nobody
+                # waited for is not logged again as "never retrieved"
+                future.exception()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            return
+        for key, future in pending:
+            if not future.done():
+                future.set_result(values.get(key))
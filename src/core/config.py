@@ -1,23 +1,73 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 from dotenv import load_dotenv
 import os
 
 
-load_dotenv()
-
 class Settings(BaseSettings):
     APP_NAME: str = "Orbidi Challenge"
     APP_VERSION: str = "0.1.0"
     ENVIRONMENT: str =  os.getenv("ENVIRONMENT", "development")
     DATABASE_URL: str = os.getenv('DATABASE_URL', 'postgresql+asyncpg://postgres:postgres@db:5432/fastapi_db')
-    REDIS_URL: str = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    REDIS_URL: Optional[str] = os.getenv('REDIS_URL')
     API_KEY_HEADER: str =  "X-API-KEY"
     REVIEW_EXPIRATION_DAYS: int = 30
+    # "postgres" or "memory", the latter runs without a database
+    REPOSITORY_BACKEND: str = os.getenv("REPOSITORY_BACKEND", "postgres")
+    DB_POOL_MIN_SIZE: int = 5
+    DB_POOL_MAX_SIZE: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 5.0
+    WARMUP_ENABLED: bool = True
+    WARMUP_RETRY_SECONDS: float = 5.0
+    STARTUP_IMPORT_BUDGET_SECONDS: float = 3.0
+    ADMISSION_MAX_IN_FLIGHT: int = 200
+    ADMISSION_MAX_IN_FLIGHT_PER_ROUTE: int = 100
+    ADMISSION_MAX_POOL_WAIT_MS: float = 250.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 2
+    API_KEY_CACHE_TTL_SECONDS: float = 60.0
+    API_KEY_NEGATIVE_CACHE_TTL_SECONDS: float = 10.0
+    API_KEY_CACHE_MAX_ENTRIES: int = 10_000
+    CATEGORY_CATALOG_REFRESH_SECONDS: float = 5.0
+    INVALIDATION_BUS_ENABLED: bool = True
+    VIEWPORT_MAX_ROWS: int = 500
+    BATCH_GET_MAX_IDS: int = 100
+    CLUSTER_CELLS_PER_TILE: int = 8
+    CLUSTER_EXPAND_MAX_POINTS: int = 3
+    EXPLORATION_LEASE_SECONDS: int = 900
+    EXPLORATION_LEASE_MAX_SECONDS: int = 3600
+    TILE_MAX_ZOOM: int = 20
+    TILE_CACHE_MAX_ENTRIES: int = 5_000
+    TILE_CACHE_TTL_SECONDS: float = 300.0
+    SEARCH_CACHE_MAX_PREFIX: int = 3
+    SEARCH_CACHE_MAX_ENTRIES: int = 2_000
+    SEARCH_CACHE_TTL_SECONDS: float = 60.0
+    SEARCH_BIAS_KM: float = 5.0
+    VIEW_EVENTS_FLUSH_SIZE: int = 1_000
+    VIEW_EVENTS_FLUSH_SECONDS: float = 1.0
+    VIEW_EVENTS_MAX_BUFFERED: int = 100_000
+    VIEW_ROLLUP_INTERVAL_SECONDS: float = 30.0
+    VIEW_ROLLUP_LAG_SECONDS: float = 10.0
+    VIEW_EVENTS_RETENTION_SECONDS: float = 86_400.0
+    COVERAGE_RECONCILE_SECONDS: float = 300.0
+    QUERY_BUDGET_PER_REQUEST: int = 20
+    QUERY_N_PLUS_ONE_THRESHOLD: int = 5
+    SERVER_TIMING_ENABLED: bool = True
+    # None: every request outside production, none in production
+    SERVER_TIMING_SAMPLE_RATE: Optional[float] = None
+    # X-Server-Timing must carry this value to force timing in production
+    SERVER_TIMING_TOKEN: Optional[str] = os.getenv("SERVER_TIMING_TOKEN")
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_READ_BURST: int = 100
+    RATE_LIMIT_READ_PER_MINUTE: int = 600
+    RATE_LIMIT_WRITE_BURST: int = 10
+    RATE_LIMIT_WRITE_PER_MINUTE: int = 60
 
     class Config:
         case_sensitive = True
 
 @lru_cache()
 def get_settings():
-    return Settings()
\ No newline at end of file
+    # .env is read once, the first time settings are needed
+    load_dotenv()
+    return Settings()
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from src.core.config import get_settings
+from src.core.invalidation import invalidation_bus
+from src.core.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+HOUR_SECONDS = 3600
+# invalidation bus topic, its ids are the categories whose pairs changed
+COVERAGE_TOPIC = "coverage"
+
+# (never reviewed, stale, fresh)
+Coverage = Tuple[int, int, int]
+
+
+def _hour(timestamp: datetime) -> int:
+    if timestamp.tzinfo is None:
+        # the repositories write datetime.utcnow()
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return int(timestamp.timestamp() // HOUR_SECONDS)
+
+
+class CoverageCounters:
+    """
+    Per-category counts of location-category pairs that were never
+    reviewed, are stale or are fresh, kept in process.
+
+    Reviewed pairs are counted in hourly buckets of last_reviewed_at, so a
+    pair turning stale as time passes needs no write: stale and fresh are
+    split at read time, to the hour. Writes on this worker adjust the
+    buckets right away. Writers also publish COVERAGE_TOPIC on the
+    invalidation bus, and every worker reloads the buckets from the table
+    on its next read after the notification, so workers agree once it is
+    delivered. The periodic reconciliation bounds the drift when the bus is
+    disabled or a notification is lost.
+    """
+    def __init__(self, stale_after_days: int, reconcile_interval_seconds: float):
+        self.stale_after_days = stale_after_days
+        self.reconcile_interval_seconds = reconcile_interval_seconds
+        self._never: Counter = Counter()
+        self._reviewed: Dict[int, Counter] = defaultdict(Counter)
+        self._flight = SingleFlight()
+        self._task: Optional[asyncio.Task] = None
+        self.reconciled_at: Optional[datetime] = None
+        self.last_drift = 0
+        self._generation = 0
+        self._reconciled_generation = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self.reconciled_at is not None
+
+    @property
+    def current(self) -> bool:
+        """Loaded, and no write was notified since the last reload"""
+        return self.loaded and self._reconciled_generation == self._generation
+
+    def invalidate(self) -> None:
+        """Reload the buckets on the next read"""
+        self._generation += 1
+
+    def pair_added(self, category_id: int, reviewed_at: Optional[datetime] = None) -> None:
+        if reviewed_at is None:
+            self._never[category_id] += 1
+        else:
+            self._reviewed[category_id][_hour(reviewed_at)] += 1
+
+    def pair_reviewed(
+        self,
+        category_id: int,
+        previous: Optional[datetime],
+        reviewed_at: datetime
+    ) -> None:
+        if previous is None:
+            counter, key = self._never, category_id
+        else:
+            counter, key = self._reviewed[category_id], _hour(previous)
+        # a pair this worker has not counted yet is left to the reconciliation
+        if counter[key] > 1:
+            counter[key] -= 1
+        else:
+            del counter[key]
+        self.pair_added(category_id, reviewed_at)
+
+    def apply_reviews(self, reviews: Iterable[Tuple[int, Optional[datetime], datetime]]) -> None:
+        """``pair_reviewed`` for (category_id, previous, reviewed_at) rows"""
+        for category_id, previous, reviewed_at in reviews:
+            self.pair_reviewed(category_id, previous, reviewed_at)
+
+    def snapshot(self, now: Optional[datetime] = None) -> Dict[int, Coverage]:
+        now = now or datetime.now(timezone.utc)
+        cutoff = _hour(now - timedelta(days=self.stale_after_days))
+        coverage = {}
+        for category_id in set(self._never) | set(self._reviewed):
+            hours = self._reviewed.get(category_id, {})
+            stale = sum(count for hour, count in hours.items() if hour < cutoff)
+            fresh = sum(hours.values()) - stale
+            coverage[category_id] = (self._never.get(category_id, 0), stale, fresh)
+        return coverage
+
+    def stale_floor(self, now: Optional[datetime] = None) -> datetime:
+        """Reviews older than this may share one bucket, they stay stale"""
+        now = now or datetime.now(timezone.utc)
+        return now - timedelta(days=self.stale_after_days, hours=1)
+
+    async def reconcile(self, repository: Any, session: Any) -> int:
+        """Reload the buckets from the table, returns the pairs that had drifted"""
+        return await self._flight.do("reconcile", lambda: self._reconcile(repository, session))
+
+    async def _reconcile(self, repository: Any, session: Any) -> int:
+        # a notification arriving during the query may not be reflected by it
+        generation = self._generation
+        rows = await repository.get_coverage_buckets(session, floor=self.stale_floor())
+        never: Counter = Counter()
+        reviewed: Dict[int, Counter] = defaultdict(Counter)
+        for category_id, reviewed_at, count in rows:
+            if reviewed_at is None:
+                never[category_id] += count
+            else:
+                reviewed[category_id][_hour(reviewed_at)] += count
+
+        before = self.snapshot()
+        self._never, self._reviewed = never, reviewed
+        after = self.snapshot()
+        drift = sum(
+            abs(a - b)
+            for category_id in set(before) | set(after)
+            for a, b in zip(before.get(category_id, (0, 0, 0)), after.get(category_id, (0, 0, 0)))
+        )
+        if self.loaded and drift:
+            logger.info(f"Coverage counters reconciled, {drift} pairs had drifted")
+        self.last_drift = drift
+        self.reconciled_at = datetime.now(timezone.utc)
+        self._reconciled_generation = generation
+        return drift
+
+    def reset(self) -> None:
+        """Forget every count, the next read reloads them"""
+        self._never = Counter()
+        self._reviewed = defaultdict(Counter)
+        self.reconciled_at = None
+
+    async def ensure_loaded(self, repository: Any, session: Any) -> None:
+        if not self.current:
+            await self.reconcile(repository, session)
+
+    async def start(self, repository: Any, session_factory: Callable) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(repository, session_factory))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, repository: Any, session_factory: Callable) -> None:
+        while True:
+            try:
+                async with session_factory() as session:
+                    await self.reconcile(repository, session)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Coverage reconciliation failed: {str(e)}")
+            await asyncio.sleep(self.reconcile_interval_seconds)
+
+
+coverage_counters = CoverageCounters(
+    stale_after_days=settings.REVIEW_EXPIRATION_DAYS,
+    reconcile_interval_seconds=settings.COVERAGE_RECONCILE_SECONDS
+)
+
+# writes of every worker, this one included, arrive through the bus
+invalidation_bus.register(
+    COVERAGE_TOPIC,
+    lambda category_ids: coverage_counters.invalidate(),
+    resync=coverage_counters.invalidate
+)
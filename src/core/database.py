@@ -1,13 +1,19 @@
-from contextlib import asynccontextmanager
+import asyncio
+import time
 from typing import AsyncGenerator
 
 import asyncpg
-from fastapi import FastAPI
+from fastapi import Request
 from sqlalchemy.engine.url import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 
+from .admission import admission_controller
 from .config import get_settings
+from .exceptions import ServiceUnavailable
+from .query_budget import install as count_queries
+from .server_timing import install as time_queries, timed
 
 
 settings = get_settings()
@@ -15,17 +21,103 @@ settings = get_settings()
 # SQLAlchemy async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
-    echo=settings.ENVIRONMENT == "development"
+    echo=settings.ENVIRONMENT == "development",
+    pool_size=settings.DB_POOL_MIN_SIZE,
+    max_overflow=settings.DB_POOL_MAX_SIZE - settings.DB_POOL_MIN_SIZE,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS
 )
+# per-request statement counts and durations, see QueryBudgetMiddleware
+# and ServerTimingMiddleware
+count_queries(engine)
+time_queries(engine)
 
 class Base(DeclarativeBase):
     pass
 
 
+class AdmittedSession(AsyncSession):
+    """
+    AsyncSession that checks out its connection on the first statement,
+    not when it is opened, so requests answered from the in-process caches
+    never hold a pool slot. The checkout is timed as pool wait for the
+    admission controller, and a saturated pool fails fast with 503 instead
+    of a late 500.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.has_connection = False
+        self.pool_timed_out = False
+
+    async def _acquire(self) -> None:
+        if self.has_connection:
+            return
+        started = time.perf_counter()
+        try:
+            with timed("db-acquire"):
+                await super().connection()
+        except PoolTimeoutError:
+            self.pool_timed_out = True
+            admission_controller.record_pool_wait(time.perf_counter() - started)
+            admission_controller.record_shed("get_db", "pool_timeout")
+            raise ServiceUnavailable(admission_controller.retry_after_seconds)
+        admission_controller.record_pool_wait(time.perf_counter() - started)
+        self.has_connection = True
+
+    async def connection(self, *args, **kwargs):
+        await self._acquire()
+        return await super().connection(*args, **kwargs)
+
+    async def execute(self, *args, **kwargs):
+        await self._acquire()
+        return await super().execute(*args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        await self._acquire()
+        return await super().scalar(*args, **kwargs)
+
+    async def scalars(self, *args, **kwargs):
+        await self._acquire()
+        return await super().scalars(*args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        await self._acquire()
+        return await super().get(*args, **kwargs)
+
+    async def flush(self, *args, **kwargs):
+        await self._acquire()
+        return await super().flush(*args, **kwargs)
+
+    async def refresh(self, *args, **kwargs):
+        await self._acquire()
+        return await super().refresh(*args, **kwargs)
+
+    async def commit(self) -> None:
+        if self.new or self.dirty or self.deleted:
+            # the commit flushes them
+            await self._acquire()
+        try:
+            await super().commit()
+        finally:
+            # the connection goes back to the pool with the transaction
+            self.has_connection = False
+
+    async def rollback(self) -> None:
+        try:
+            await super().rollback()
+        finally:
+            self.has_connection = False
+
+    async def close(self) -> None:
+        try:
+            await super().close()
+        finally:
+            self.has_connection = False
+
+
 # Async session maker
 async_session = sessionmaker(
     engine,
-    class_=AsyncSession,
+    class_=AdmittedSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False
@@ -35,6 +127,13 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with async_session() as session:
         try:
             yield session
+        except ServiceUnavailable:
+            raise
+        except Exception:
+            # a repository may have wrapped the 503 of the first statement
+            if session.pool_timed_out:
+                raise ServiceUnavailable(admission_controller.retry_after_seconds)
+            raise
         finally:
             await session.close()
 
@@ -51,8 +150,8 @@ async def init_db_pool() -> asyncpg.Pool:
         # try to connect to the database
         return await asyncpg.create_pool(
             asyncpg_url,
-            min_size=5,
-            max_size=20,
+            min_size=settings.DB_POOL_MIN_SIZE,
+            max_size=settings.DB_POOL_MAX_SIZE,
             max_inactive_connection_lifetime=300,
             command_timeout=60.0,
             timeout=60.0
@@ -64,36 +163,7 @@ async def init_db_pool() -> asyncpg.Pool:
         print(f"Database connection error: {str(e)}")
         raise
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    try:
-        # try to initialize the database pool
-        print("Initializing database pool...")
-        app.state.pool = await init_db_pool()
-        print("Database pool initialized successfully")
-        from alembic.config import Config
-        from alembic.runtime.migration import MigrationContext
-        from alembic.script import ScriptDirectory
-
-        async with engine.begin() as conn:
-            context = MigrationContext.configure(conn)
-            script = ScriptDirectory.from_config(Config("alembic.ini"))
-
-            if context.get_current_revision() != script.get_current_head():
-                print("Warning: Database is not up-to-date. Running migrations...")
-            else:
-                print("Database is up-to-date")
-        print("Starting application...")            
-
-        yield
-    except Exception as e:
-        print(f"Error in lifespan: {str(e)}")
-        raise
-    finally:
-        if hasattr(app.state, 'pool'):
-            await app.state.pool.close()
-
-async def get_pool_conn(app: FastAPI):
+async def get_pool_conn(request: Request):
     """
     Dependency for getting raw asyncpg connections.
     Usage:
@@ -101,5 +171,16 @@ async def get_pool_conn(app: FastAPI):
         async def handler(conn = Depends(get_pool_conn)):
             ...
     """
-    async with app.state.pool.acquire() as conn:
-        yield conn
\ No newline at end of file
+    pool = request.app.state.pool
+    started = time.perf_counter()
+    try:
+        conn = await pool.acquire(timeout=settings.DB_POOL_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        admission_controller.record_pool_wait(time.perf_counter() - started)
+        admission_controller.record_shed("get_pool_conn", "pool_timeout")
+        raise ServiceUnavailable(admission_controller.retry_after_seconds)
+    admission_controller.record_pool_wait(time.perf_counter() - started)
+    try:
+        yield conn
+    finally:
+        await pool.release(conn)
\ No newline at end of file
@@ -28,6 +28,13 @@ class CategoryNotFound(MapMyWordException):
              status_code=status.HTTP_404_NOT_FOUND,
              detail=f"Category with id: {category_id} not found")
         
+class ServiceUnavailable(MapMyWordException):
+    def __init__(self, retry_after: int):
+        super().__init__(
+             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+             detail="Service overloaded, retry later")
+        self.headers = {"Retry-After": str(retry_after)}
+
 class NotFoundException(Exception):
     """Excepción para recursos no encontrados."""
     def __init__(self, message: str = "Resource not found"):
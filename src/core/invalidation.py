@@ -0,0 +1,168 @@
+import asyncio
+import inspect
+import json
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import asyncpg
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache_invalidation"
+# NOTIFY payloads are limited to 8000 bytes, ids are sent in chunks
+MAX_IDS_PER_NOTIFICATION = 500
+
+InvalidationHandler = Callable[[List[int]], Any]
+ResyncHandler = Callable[[], Any]
+
+
+async def _call(handler: Callable, *args) -> None:
+    try:
+        result = handler(*args)
+        if inspect.isawaitable(result):
+            await result
+    except Exception as e:
+        logger.error(f"Cache invalidation handler failed: {str(e)}")
+
+
+def _payloads(table: str, ids: Iterable[int]) -> Iterable[str]:
+    ids = [id for id in ids if id is not None]
+    for start in range(0, len(ids), MAX_IDS_PER_NOTIFICATION):
+        yield json.dumps({
+            "table": table,
+            "ids": ids[start:start + MAX_IDS_PER_NOTIFICATION],
+        })
+
+
+class InvalidationBus:
+    """
+    Cross-worker cache invalidation over Postgres LISTEN/NOTIFY.
+
+    Writers publish (table, ids) inside their own transaction, so the
+    notification is only delivered if the write commits. Every worker holds
+    one LISTEN connection from the asyncpg pool and dispatches notifications
+    to the handlers registered for the table. When that connection drops,
+    the bus reconnects and runs every resync handler, because notifications
+    sent in the gap are lost.
+    """
+    def __init__(
+        self,
+        channel: str = CHANNEL,
+        reconnect_delay_seconds: float = 1.0,
+        max_reconnect_delay_seconds: float = 30.0,
+        health_check_seconds: float = 30.0
+    ):
+        self.channel = channel
+        self.reconnect_delay_seconds = reconnect_delay_seconds
+        self.max_reconnect_delay_seconds = max_reconnect_delay_seconds
+        self.health_check_seconds = health_check_seconds
+        self._handlers: Dict[str, List[InvalidationHandler]] = defaultdict(list)
+        self._resync_handlers: List[ResyncHandler] = []
+        self._task: Optional[asyncio.Task] = None
+        self._dispatching: Set[asyncio.Task] = set()
+        self.received = 0
+        self.reconnects = 0
+
+    def register(
+        self,
+        table: str,
+        handler: InvalidationHandler,
+        resync: Optional[ResyncHandler] = None
+    ) -> None:
+        """Call ``handler(ids)`` when rows of ``table`` change, ``resync()`` after a reconnect"""
+        self._handlers[table].append(handler)
+        if resync is not None:
+            self._resync_handlers.append(resync)
+
+    async def publish(self, session: AsyncSession, table: str, ids: Iterable[int]) -> None:
+        """Queue a notification on the session's transaction, delivered on commit"""
+        for payload in _payloads(table, ids):
+            await session.execute(select(func.pg_notify(self.channel, payload)))
+
+    async def publish_on(self, connection: asyncpg.Connection, table: str, ids: Iterable[int]) -> None:
+        """``publish`` for a raw asyncpg connection, delivered when its transaction commits"""
+        for payload in _payloads(table, ids):
+            await connection.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+
+    async def dispatch(self, payload: str) -> None:
+        self.received += 1
+        try:
+            message = json.loads(payload)
+            table, ids = message["table"], message["ids"]
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Ignoring malformed invalidation payload: {str(e)}")
+            return
+        for handler in self._handlers.get(table, ()):
+            await _call(handler, ids)
+
+    async def resync(self) -> None:
+        for handler in self._resync_handlers:
+            await _call(handler)
+
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        task = asyncio.get_running_loop().create_task(self.dispatch(payload))
+        # keep a reference until it finishes, the loop only holds weak ones
+        self._dispatching.add(task)
+        task.add_done_callback(self._dispatching.discard)
+
+    async def start(self, pool: asyncpg.Pool) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen(pool))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self, pool: asyncpg.Pool) -> None:
+        delay = self.reconnect_delay_seconds
+        connected_before = False
+        while True:
+            try:
+                connection = await pool.acquire()
+                try:
+                    lost = asyncio.Event()
+                    connection.add_termination_listener(lambda _: lost.set())
+                    await connection.add_listener(self.channel, self._on_notification)
+                    if connected_before:
+                        # anything published while we were away was missed
+                        await self.resync()
+                    connected_before = True
+                    delay = self.reconnect_delay_seconds
+                    await self._wait_until_lost(connection, lost)
+                finally:
+                    await self._release(pool, connection)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Invalidation listener disconnected: {str(e)}")
+
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay_seconds)
+
+    async def _wait_until_lost(self, connection, lost: asyncio.Event) -> None:
+        while not lost.is_set():
+            try:
+                await asyncio.wait_for(lost.wait(), timeout=self.health_check_seconds)
+            except asyncio.TimeoutError:
+                # a half-open TCP connection never fires the termination listener
+                await connection.execute("SELECT 1", timeout=self.health_check_seconds)
+
+    async def _release(self, pool: asyncpg.Pool, connection) -> None:
+        try:
+            if not connection.is_closed():
+                await connection.remove_listener(self.channel, self._on_notification)
+            await pool.release(connection)
+        except Exception as e:
+            logger.warning(f"Error releasing invalidation listener connection: {str(e)}")
+
+
+invalidation_bus = InvalidationBus()
@@ -0,0 +1,89 @@
+"""
+Startup import-time profiling.
+
+Usage:
+    python -m src.core.profiling                # profile `import main`
+    python -m src.core.profiling --top 30
+    python -m src.core.profiling --module src.core.database
+"""
+import argparse
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import List
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def profile_imports(module: str = "main") -> List[ImportTiming]:
+    """Import ``module`` in a fresh interpreter and collect ``-X importtime`` output"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            timings.append(ImportTiming(
+                module=name,
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=(len(indent) - 1) // 2,
+            ))
+    return timings
+
+
+def measure_import_time(module: str = "main") -> float:
+    """Wall-clock seconds needed to import ``module`` in a fresh interpreter"""
+    code = (
+        "import time\n"
+        "started = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(time.perf_counter() - started)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report import time per module")
+    parser.add_argument("--module", default="main", help="module to import")
+    parser.add_argument("--top", type=int, default=20, help="number of rows to show")
+    args = parser.parse_args()
+
+    timings = profile_imports(args.module)
+    total = next((t for t in timings if t.module == args.module and t.depth == 0), None)
+
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for timing in sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[:args.top]:
+        print(
+            f"{timing.cumulative_us / 1000:>14.1f} {timing.self_us / 1000:>9.1f}  "
+            f"{'  ' * timing.depth}{timing.module}"
+        )
+
+    own = [t for t in timings if t.module.split(".")[0] in ("main", "src")]
+    print(f"\nproject modules (self): {sum(t.self_us for t in own) / 1000:.1f} ms")
+    if total is not None:
+        print(f"total `import {args.module}`: {total.cumulative_us / 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+QUERY_COUNT_HEADER = b"x-query-count"
+
+_current: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+
+class QueryStats:
+    """
+    Statements executed while tracking is on. The same SQL text run again
+    and again, with different parameters, is the signature of an N+1 loop.
+    """
+    def __init__(self):
+        self.count = 0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str) -> None:
+        self.count += 1
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements executed at least ``threshold`` times, most repeated first"""
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Count the statements run by this task, and the tasks it starts, until
+    the block exits. Nested blocks count into their own stats only.
+    """
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    # the async engine runs this in a greenlet that shares the task's context
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement)
+
+
+def install(engine: Any) -> None:
+    """Count the statements of an engine, sync or async, idempotent"""
+    target = getattr(engine, "sync_engine", engine)
+    if not event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        event.listen(target, "before_cursor_execute", _before_cursor_execute)
+
+
+def report(stats: QueryStats, route: str) -> None:
+    """Log the requests over budget and the statements that look like N+1"""
+    if stats.count > settings.QUERY_BUDGET_PER_REQUEST:
+        logger.warning(
+            f"{route} ran {stats.count} queries, "
+            f"the budget is {settings.QUERY_BUDGET_PER_REQUEST}"
+        )
+    for statement, count in stats.repeated(settings.QUERY_N_PLUS_ONE_THRESHOLD):
+        logger.warning(f"Possible N+1 in {route}, {count} times: {' '.join(statement.split())[:200]}")
+
+
+class QueryBudgetMiddleware:
+    """
+    Counts the SQLAlchemy statements of each request, reports the count in
+    X-Query-Count outside production and logs budget overruns and repeated
+    statements. Raw asyncpg connections from the pool are not counted.
+    """
+    def __init__(self, app: ASGIApp, expose_header: Optional[bool] = None):
+        self.app = app
+        if expose_header is None:
+            expose_header = settings.ENVIRONMENT != "production"
+        self.expose_header = expose_header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            async def send_with_count(message: Message) -> None:
+                if message["type"] == "http.response.start" and self.expose_header:
+                    # statements after this point, on teardown, are only logged
+                    headers = list(message.get("headers", []))
+                    headers.append((QUERY_COUNT_HEADER, str(stats.count).encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_count)
+            finally:
+                report(stats, f"{scope['method']} {scope['path']}")
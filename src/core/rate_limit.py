@@ -0,0 +1,146 @@
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """Token bucket holding ``burst`` tokens, refilled at ``per_minute`` tokens a minute"""
+    name: str
+    burst: int
+    per_minute: int
+
+    @property
+    def rate(self) -> float:
+        return self.per_minute / 60
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_seconds: int
+    retry_after_seconds: int
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(self.reset_seconds),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(self.retry_after_seconds)
+        return headers
+
+
+def _result(policy: RateLimitPolicy, allowed: bool, tokens: float) -> RateLimitResult:
+    return RateLimitResult(
+        allowed=allowed,
+        limit=policy.burst,
+        remaining=int(tokens),
+        reset_seconds=math.ceil((policy.burst - tokens) / policy.rate),
+        retry_after_seconds=0 if allowed else math.ceil((1 - tokens) / policy.rate),
+    )
+
+
+class InMemoryRateLimiter:
+    """Token buckets held in this worker, a dict lookup and a few float ops per hit"""
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    async def hit(self, key: str, policy: RateLimitPolicy) -> RateLimitResult:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                # drop the least recently used bucket, a flood of new keys
+                # evicts idle callers before an active one
+                self._buckets.popitem(last=False)
+            bucket = self._buckets[key] = [float(policy.burst), now]
+        else:
+            self._buckets.move_to_end(key)
+
+        tokens = min(policy.burst, bucket[0] + (now - bucket[1]) * policy.rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        bucket[0] = tokens
+        bucket[1] = now
+        return _result(policy, allowed, tokens)
+
+
+# Refill and take a token atomically, using the Redis clock so every pod agrees
+_TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisRateLimiter:
+    """Token buckets shared by every worker through Redis"""
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError(
+                "REDIS_URL is set but the 'redis' package is not installed"
+            ) from e
+        self.prefix = prefix
+        self._client = redis.from_url(url)
+        self._script = self._client.register_script(_TOKEN_BUCKET_SCRIPT)
+
+    async def hit(self, key: str, policy: RateLimitPolicy) -> RateLimitResult:
+        try:
+            allowed, tokens = await self._script(
+                keys=[self.prefix + key],
+                args=[policy.burst, policy.rate]
+            )
+        except Exception as e:
+            # fail open, an unavailable Redis must not take the API down
+            logger.warning(f"Rate limiter unavailable: {str(e)}")
+            return _result(policy, True, policy.burst)
+        return _result(policy, bool(allowed), float(tokens))
+
+
+READ_POLICY = RateLimitPolicy(
+    name="read",
+    burst=settings.RATE_LIMIT_READ_BURST,
+    per_minute=settings.RATE_LIMIT_READ_PER_MINUTE
+)
+WRITE_POLICY = RateLimitPolicy(
+    name="write",
+    burst=settings.RATE_LIMIT_WRITE_BURST,
+    per_minute=settings.RATE_LIMIT_WRITE_PER_MINUTE
+)
+
+
+@lru_cache()
+def get_rate_limiter():
+    if settings.REDIS_URL:
+        return RedisRateLimiter(settings.REDIS_URL)
+    return InMemoryRateLimiter()
@@ -0,0 +1,175 @@
+import asyncio
+import functools
+import random
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import get_settings
+
+settings = get_settings()
+
+SERVER_TIMING_HEADER = b"server-timing"
+# requests carrying this header are always timed, e.g. by load tests; in
+# production only when its value is SERVER_TIMING_TOKEN
+FORCE_HEADER = b"x-server-timing"
+
+_current: ContextVar[Optional["ServerTiming"]] = ContextVar("server_timing", default=None)
+
+
+class ServerTiming:
+    """
+    Seconds spent per phase of one request. Phases are self times: a phase
+    timed inside another, e.g. the queries of verify_api_key, is not counted
+    again in the outer one. Phases run concurrently by the tasks of a
+    request are summed.
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.recorded = 0.0
+        self.endpoint_done: Optional[float] = None
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+        self.recorded += seconds
+
+    def header(self, now: float) -> bytes:
+        metrics = [f"{phase};dur={seconds * 1000:.2f}" for phase, seconds in self.phases.items()]
+        metrics.append(f"total;dur={(now - self.started) * 1000:.2f}")
+        return ", ".join(metrics).encode()
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Add the block's self time to ``phase`` when the request is sampled"""
+    timing = _current.get()
+    if timing is None:
+        yield
+        return
+    started, inner = time.perf_counter(), timing.recorded
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started - (timing.recorded - inner)
+        timing.add(phase, max(elapsed, 0.0))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None and _current.get() is not None:
+        context._server_timing_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    timing = _current.get()
+    started = getattr(context, "_server_timing_started", None)
+    if timing is not None and started is not None:
+        timing.add("db", time.perf_counter() - started)
+
+
+def install(engine: Any) -> None:
+    """Time the statements of an engine, sync or async, idempotent"""
+    target = getattr(engine, "sync_engine", engine)
+    for name, listener in (
+        ("before_cursor_execute", _before_cursor_execute),
+        ("after_cursor_execute", _after_cursor_execute),
+    ):
+        if not event.contains(target, name, listener):
+            event.listen(target, name, listener)
+
+
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    # wraps keeps the signature FastAPI reads the parameters from
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        try:
+            with timed("app"):
+                return await endpoint(*args, **kwargs)
+        finally:
+            timing = _current.get()
+            if timing is not None:
+                timing.endpoint_done = time.perf_counter()
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """
+    Times the endpoint function as "app", so the response validation and
+    serialization FastAPI runs after it can be reported as "encode"
+    """
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        if asyncio.iscoroutinefunction(endpoint):
+            endpoint = _timed_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+class ServerTimingMiddleware:
+    """
+    Reports the phases of sampled requests in a Server-Timing header:
+    auth, db-acquire, db, views, app, encode and total, in milliseconds.
+    A request is sampled with probability ``sample_rate``, or always when
+    it sends X-Server-Timing. In production no request is sampled by
+    default, and X-Server-Timing is honoured only with ``force_token``:
+    the phases, auth above all, would otherwise be a timing side channel
+    for any client.
+    """
+    def __init__(
+        self,
+        app: ASGIApp,
+        enabled: Optional[bool] = None,
+        sample_rate: Optional[float] = None,
+        require_token: Optional[bool] = None,
+        force_token: Optional[str] = None
+    ):
+        self.app = app
+        production = settings.ENVIRONMENT == "production"
+        if sample_rate is None:
+            sample_rate = settings.SERVER_TIMING_SAMPLE_RATE
+        if sample_rate is None:
+            sample_rate = 0.0 if production else 1.0
+        self.enabled = settings.SERVER_TIMING_ENABLED if enabled is None else enabled
+        self.sample_rate = sample_rate
+        self.require_token = production if require_token is None else require_token
+        self.force_token = settings.SERVER_TIMING_TOKEN if force_token is None else force_token
+
+    def _forced(self, value: bytes) -> bool:
+        if not self.require_token:
+            return True
+        return bool(self.force_token) and secrets.compare_digest(value, self.force_token.encode())
+
+    def _sampled(self, scope: Scope) -> bool:
+        for name, value in scope.get("headers", ()):
+            if name == FORCE_HEADER:
+                if self._forced(value):
+                    return True
+                break
+        return random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.enabled or not self._sampled(scope):
+            await self.app(scope, receive, send)
+            return
+
+        timing = ServerTiming()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                now = time.perf_counter()
+                if timing.endpoint_done is not None:
+                    timing.add("encode", now - timing.endpoint_done)
+                headers = list(message.get("headers", []))
+                headers.append((SERVER_TIMING_HEADER, timing.header(now)))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _current.set(timing)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
@@ -0,0 +1,59 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class _LeaderCancelled(Exception):
+    """The caller running the shared call was cancelled, waiters must retry"""
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: the first caller for a key runs
+    the call, callers arriving while it is in flight await the same result.
+    Nothing is cached, once the call finishes the next caller runs it again.
+    """
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.coalesced = 0
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                break
+            self.coalesced += 1
+            try:
+                # shield so a cancelled waiter does not cancel the shared call
+                return await asyncio.shield(future)
+            except _LeaderCancelled:
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+            # reading the exception marks it retrieved, so an error nobody
+            # waited for is not logged again as "never retrieved"
+            future.exception()
+
+
+def normalize_key(*parts: Any) -> tuple:
+    """Build a single-flight key, rounding floats so equivalent queries coalesce"""
+    return tuple(round(part, 6) if isinstance(part, float) else part for part in parts)
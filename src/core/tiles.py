@@ -0,0 +1,54 @@
+import math
+from typing import Iterator, Tuple
+
+# ST_AsMVTGeom defaults, kept in sync with the tile query
+TILE_EXTENT = 4096
+TILE_BUFFER = 256
+
+# Web Mercator stops short of the poles
+MAX_LATITUDE = 85.05112878
+
+# invalidation bus topic, its ids are packed tile keys
+TILES_TOPIC = "location_tiles"
+
+Tile = Tuple[int, int, int]
+
+
+def is_valid_tile(z: int, x: int, y: int) -> bool:
+    return 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def pack_tile(z: int, x: int, y: int) -> int:
+    """One int per tile, so tile keys travel on the invalidation bus as ids"""
+    return (z << 44) | (x << 22) | y
+
+
+def unpack_tile(key: int) -> Tile:
+    mask = (1 << 22) - 1
+    return key >> 44, (key >> 22) & mask, key & mask
+
+
+def _tile_position(longitude: float, latitude: float, z: int) -> Tuple[float, float]:
+    """Fractional tile coordinates of a point at zoom ``z``"""
+    n = 2 ** z
+    latitude = max(-MAX_LATITUDE, min(MAX_LATITUDE, latitude))
+    lat_rad = math.radians(latitude)
+    x = (longitude + 180.0) / 360.0 * n
+    y = (1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n
+    return x, y
+
+
+def tiles_for_point(longitude: float, latitude: float, max_zoom: int) -> Iterator[Tile]:
+    """
+    Every tile that renders the point, at each zoom up to ``max_zoom``.
+    Tiles carry a buffer, so a point near an edge is in its neighbours too.
+    """
+    margin = TILE_BUFFER / TILE_EXTENT
+    for z in range(max_zoom + 1):
+        last = 2 ** z - 1
+        x, y = _tile_position(longitude, latitude, z)
+        xs = range(max(0, math.floor(x - margin)), min(last, math.floor(x + margin)) + 1)
+        ys = range(max(0, math.floor(y - margin)), min(last, math.floor(y + margin)) + 1)
+        for tile_x in xs:
+            for tile_y in ys:
+                yield z, tile_x, tile_y
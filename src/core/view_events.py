@@ -0,0 +1,226 @@
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Iterable, List, Optional, Tuple
+
+import asyncpg
+
+from src.core.config import get_settings
+from src.core.coverage import COVERAGE_TOPIC, coverage_counters
+from src.core.invalidation import invalidation_bus
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+EVENTS_TABLE = "location_view_events"
+EVENT_COLUMNS = ("location_id", "viewed_at")
+
+# one worker rolls up at a time, the others skip the round
+ROLLUP_LOCK_KEY = 0x6C766965  # "lvie"
+
+ENSURE_ROLLUP_ROW = """
+    INSERT INTO location_view_rollups (id, rolled_up_to)
+    VALUES (1, '-infinity')
+    ON CONFLICT (id) DO NOTHING
+"""
+
+# Folds the events recorded in [rolled_up_to, now() - lag) into the
+# per-location stats and moves last_reviewed_at forward once per location,
+# then advances the watermark. recorded_at is stamped by the database when
+# the COPY runs, so requeued batches land above the watermark; the lag leaves
+# time for a COPY in progress to commit. Events rolled up in earlier rounds
+# are deleted once they are older than the retention.
+# Returns the moved pairs for the coverage counters.
+ROLLUP = """
+    WITH bounds AS (
+        SELECT rolled_up_to AS start, now() - make_interval(secs => $1) AS stop
+        FROM location_view_rollups
+        WHERE id = 1
+    ),
+    views AS (
+        SELECT e.location_id, count(*) AS views, max(e.viewed_at) AS last_viewed_at
+        FROM location_view_events e, bounds b
+        WHERE e.recorded_at >= b.start AND e.recorded_at < b.stop
+        GROUP BY e.location_id
+    ),
+    stats AS (
+        INSERT INTO location_view_stats AS s (location_id, view_count, last_viewed_at)
+        SELECT v.location_id, v.views, v.last_viewed_at
+        FROM views v
+        JOIN locations l ON l.id = v.location_id
+        ON CONFLICT (location_id) DO UPDATE SET
+            view_count = s.view_count + EXCLUDED.view_count,
+            last_viewed_at = GREATEST(s.last_viewed_at, EXCLUDED.last_viewed_at)
+        RETURNING s.location_id, s.last_viewed_at
+    ),
+    reviews AS (
+        -- the self join sees the rows as they were before this update
+        UPDATE location_category_reviews r
+        SET last_reviewed_at = stats.last_viewed_at
+        FROM stats, location_category_reviews previous
+        WHERE r.location_id = stats.location_id
+          AND previous.id = r.id
+          AND (r.last_reviewed_at IS NULL OR r.last_reviewed_at < stats.last_viewed_at)
+        RETURNING r.category_id, previous.last_reviewed_at AS previous, r.last_reviewed_at
+    ),
+    pruned AS (
+        DELETE FROM location_view_events e
+        USING bounds b
+        WHERE e.recorded_at < b.start - make_interval(secs => $2)
+    ),
+    advanced AS (
+        UPDATE location_view_rollups
+        SET rolled_up_to = bounds.stop
+        FROM bounds
+        WHERE location_view_rollups.id = 1
+        RETURNING 1
+    )
+    SELECT category_id, previous, last_reviewed_at FROM reviews
+"""
+
+ViewEvent = Tuple[int, datetime]
+
+
+class ViewEventLog:
+    """
+    Append-only log of nearby views.
+
+    ``record`` only appends to an in-memory buffer. A background task copies
+    the buffer into location_view_events with COPY when it reaches
+    ``flush_size`` or every ``flush_interval_seconds``, and periodically rolls
+    the new events up into location_view_stats and last_reviewed_at. A
+    request therefore never waits on, or contends for, a review row.
+
+    The buffer is bounded: while the database is unreachable the oldest
+    events are dropped and counted in ``dropped``. Rolled-up events are
+    kept for ``retention_seconds``, then the rollup deletes them.
+    """
+    def __init__(
+        self,
+        flush_size: int = settings.VIEW_EVENTS_FLUSH_SIZE,
+        flush_interval_seconds: float = settings.VIEW_EVENTS_FLUSH_SECONDS,
+        max_buffered: int = settings.VIEW_EVENTS_MAX_BUFFERED,
+        rollup_interval_seconds: float = settings.VIEW_ROLLUP_INTERVAL_SECONDS,
+        rollup_lag_seconds: float = settings.VIEW_ROLLUP_LAG_SECONDS,
+        retention_seconds: float = settings.VIEW_EVENTS_RETENTION_SECONDS
+    ):
+        self.flush_size = flush_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_buffered = max_buffered
+        self.rollup_interval_seconds = rollup_interval_seconds
+        self.rollup_lag_seconds = rollup_lag_seconds
+        self.retention_seconds = retention_seconds
+        self._buffer: Deque[ViewEvent] = deque(maxlen=max_buffered)
+        self._full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.enabled = False
+        self.copied = 0
+        self.dropped = 0
+        self.rollups = 0
+
+    def record(self, location_ids: Iterable[int]) -> None:
+        """Buffer one view of each location, never blocks"""
+        if not self.enabled:
+            return
+        viewed_at = datetime.now(timezone.utc)
+        for location_id in location_ids:
+            if len(self._buffer) == self.max_buffered:
+                self.dropped += 1
+            self._buffer.append((location_id, viewed_at))
+        if len(self._buffer) >= self.flush_size:
+            self._full.set()
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    async def flush(self, pool: asyncpg.Pool) -> int:
+        """COPY the buffered events, they are put back if the copy fails"""
+        if not self._buffer:
+            return 0
+        events = list(self._buffer)
+        self._buffer.clear()
+        try:
+            async with pool.acquire() as connection:
+                await connection.copy_records_to_table(
+                    EVENTS_TABLE,
+                    records=events,
+                    columns=EVENT_COLUMNS
+                )
+        except Exception:
+            # older first, so a full buffer drops the oldest events
+            requeued = events + list(self._buffer)
+            overflow = max(len(requeued) - self.max_buffered, 0)
+            self.dropped += overflow
+            self._buffer.clear()
+            self._buffer.extend(requeued[overflow:])
+            raise
+        self.copied += len(events)
+        return len(events)
+
+    async def rollup(self, pool: asyncpg.Pool) -> Optional[List[asyncpg.Record]]:
+        """Fold new events into the stats, None when another worker holds the lock"""
+        async with pool.acquire() as connection:
+            async with connection.transaction():
+                locked = await connection.fetchval(
+                    "SELECT pg_try_advisory_xact_lock($1)",
+                    ROLLUP_LOCK_KEY
+                )
+                if not locked:
+                    return None
+                await connection.execute(ENSURE_ROLLUP_ROW)
+                reviews = await connection.fetch(
+                    ROLLUP,
+                    self.rollup_lag_seconds,
+                    self.retention_seconds
+                )
+                await invalidation_bus.publish_on(
+                    connection,
+                    COVERAGE_TOPIC,
+                    sorted({review[0] for review in reviews})
+                )
+        self.rollups += 1
+        coverage_counters.apply_reviews(reviews)
+        return reviews
+
+    async def start(self, pool: asyncpg.Pool) -> None:
+        if self._task is None:
+            self.enabled = True
+            self._task = asyncio.create_task(self._run(pool))
+
+    async def stop(self, pool: asyncpg.Pool) -> None:
+        self.enabled = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # the rollup of these runs on the next start, on any worker
+        try:
+            await self.flush(pool)
+        except Exception as e:
+            logger.warning(f"Could not flush {len(self)} view events on shutdown: {str(e)}")
+
+    async def _run(self, pool: asyncpg.Pool) -> None:
+        loop = asyncio.get_running_loop()
+        next_rollup = loop.time() + self.rollup_interval_seconds
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            try:
+                await self.flush(pool)
+                if loop.time() >= next_rollup:
+                    next_rollup = loop.time() + self.rollup_interval_seconds
+                    await self.rollup(pool)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"View event log: {str(e)}")
+
+
+view_event_log = ViewEventLog()
@@ -0,0 +1,74 @@
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack
+
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from src.core.config import get_settings
+from src.core.database import engine
+from src.repositories.category import CategoryRepository
+from src.repositories.location import LocationRepository
+from src.repositories.recomendation import RecommendationRepository
+from src.services.category_catalog import category_catalog
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+async def _prepare_hot_statements(connection: AsyncConnection) -> None:
+    """Run the hot read paths once so they are compiled and prepared on this connection"""
+    async with AsyncSession(bind=connection, expire_on_commit=False) as session:
+        await CategoryRepository().get_active_categories(session, skip=0, limit=1)
+        await LocationRepository().get_nearby(
+            session,
+            latitude=0.0,
+            longitude=0.0,
+            radius_km=0.001,
+            limit=1
+        )
+        await RecommendationRepository().get_exploration_recommendations(session, limit=1)
+        await session.rollback()
+
+
+async def _prime_caches(connection: AsyncConnection) -> None:
+    """Load the in-process caches so the first requests are served from memory"""
+    async with AsyncSession(bind=connection, expire_on_commit=False) as session:
+        await category_catalog.load(CategoryRepository(), session)
+
+
+async def warm_up(app: FastAPI) -> bool:
+    """
+    Open the minimum number of engine connections and warm the hot statements
+    on each of them. The asyncpg pool already opens ``min_size`` connections
+    in ``init_db_pool``. The app is marked ready only when this succeeds; a
+    failure, e.g. an unreachable database, is reported as degraded by /ready.
+    """
+    started = time.perf_counter()
+    try:
+        async with AsyncExitStack() as stack:
+            # one at a time, so every connection that opened is in the stack
+            # and closed even when a later one fails
+            connections = [
+                await stack.enter_async_context(engine.connect())
+                for _ in range(settings.DB_POOL_MIN_SIZE)
+            ]
+            await asyncio.gather(*(
+                _prepare_hot_statements(connection) for connection in connections
+            ))
+            await _prime_caches(connections[0])
+    except Exception as e:
+        app.state.warmup_failed = True
+        logger.warning(f"Warm-up did not complete: {str(e)}")
+        return False
+    app.state.warmup_failed = False
+    app.state.ready = True
+    logger.info(f"Warm-up finished in {time.perf_counter() - started:.3f}s")
+    return True
+
+
+async def keep_warming_up(app: FastAPI) -> None:
+    """Retry the warm-up until it succeeds, the worker stays unready meanwhile"""
+    while not await warm_up(app):
+        await asyncio.sleep(settings.WARMUP_RETRY_SECONDS)
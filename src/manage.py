@@ -0,0 +1,55 @@
+"""
+Management commands.
+
+Usage:
+    python -m src.manage create-api-key "integrator name"
+    python -m src.manage revoke-api-key 42
+
+The plaintext of a new key is printed once, only its hash is stored.
+"""
+import argparse
+import asyncio
+from typing import Callable, List, Optional
+
+from src.services.api_key import ApiKeyService
+
+
+async def create_api_key(session_factory: Callable, name: str) -> str:
+    async with session_factory() as session:
+        plaintext, api_key_obj = await ApiKeyService().create_key(session, name=name)
+    print(f"created api key {api_key_obj.id} ({name}), store it now, it is not shown again:")
+    print(plaintext)
+    return plaintext
+
+
+async def revoke_api_key(session_factory: Callable, api_key_id: int) -> bool:
+    async with session_factory() as session:
+        api_key_obj = await ApiKeyService().revoke_key(session, api_key_id=api_key_id)
+    if api_key_obj is None:
+        print(f"api key {api_key_id} not found")
+        return False
+    print(f"revoked api key {api_key_id} ({api_key_obj.name})")
+    return True
+
+
+def main(argv: Optional[List[str]] = None, session_factory: Optional[Callable] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.manage")
+    commands = parser.add_subparsers(dest="command", required=True)
+    create = commands.add_parser("create-api-key", help="create a key and print it once")
+    create.add_argument("name")
+    revoke = commands.add_parser("revoke-api-key", help="deactivate a key by id")
+    revoke.add_argument("id", type=int)
+    args = parser.parse_args(argv)
+
+    if session_factory is None:
+        # only the command line needs the engine, tests pass their own sessions
+        from src.core.database import async_session as session_factory
+
+    if args.command == "create-api-key":
+        asyncio.run(create_api_key(session_factory, args.name))
+        return 0
+    return 0 if asyncio.run(revoke_api_key(session_factory, args.id)) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
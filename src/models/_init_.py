@@ -1,5 +1,15 @@
 from .location import Location
 from .category import Category
 from .review import LocationCategoryReview
+from .api_key import ApiKey
+from .view_event import LocationViewEvent, LocationViewStats, ViewRollup
 
-__all__ = ["Location", "Category", "LocationCategoryReview"]
+__all__ = [
+    "Location",
+    "Category",
+    "LocationCategoryReview",
+    "ApiKey",
+    "LocationViewEvent",
+    "LocationViewStats",
+    "ViewRollup"
+]
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, Boolean, DateTime
+from .base import BaseModel
+
+class ApiKey(BaseModel):
+    __tablename__ = "api_keys"
+
+    name = Column(String, nullable=False)
+    # sha256 hex digest, the plaintext key is never stored
+    key_hash = Column(String(64), unique=True, nullable=False)
+    is_active = Column(Boolean, default=True, nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
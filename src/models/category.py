@@ -9,4 +9,4 @@ class Category(BaseModel):
     description = Column(String)
     is_active = Column(Boolean, default=True, nullable=False)
     
-    reviews = relationship("LocationCategoryReview", back_populates="category")
\ No newline at end of file
+    reviews = relationship("LocationCategoryReview", back_populates="category", lazy="raise")
\ No newline at end of file
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Float, String, Index
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Float, String, Index, func
+from sqlalchemy.orm import query_expression, relationship
 from .base import BaseModel
 from geoalchemy2 import Geometry
 
@@ -12,8 +12,25 @@ class Location(BaseModel):
     longitude = Column(Float, nullable=False)
     point = Column(Geometry(geometry_type='POINT', srid=4326))
     
-    reviews = relationship("LocationCategoryReview", back_populates="location")
+    # lazy loading cannot run under AsyncSession, load it explicitly
+    reviews = relationship("LocationCategoryReview", back_populates="location", lazy="raise")
+    # [{"id", "name"}] of the location's categories, only filled by queries
+    # that ask for it with with_expression, see LOCATION_CATEGORIES
+    categories = query_expression()
     
     __table_args__ = (
         Index('idx_locations_point', 'point', postgresql_using='gist'),
+        # metre radius filters cast to geography, see build_exploration_query
+        Index(
+            'idx_locations_point_geography',
+            func.geography(point),
+            postgresql_using='gist'
+        ),
+        # prefix ILIKE and word similarity (<%) of the name search
+        Index(
+            'idx_locations_name_trgm',
+            'name',
+            postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'}
+        ),
     )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, DateTime, Index, Integer
+from sqlalchemy import Column, ForeignKey, DateTime, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from .base import BaseModel
@@ -18,9 +18,12 @@ class LocationCategoryReview(BaseModel):
         nullable=False
     )
     last_reviewed_at = Column(DateTime(timezone=True), nullable=True )
+    # exploration lease, free again once leased_until has passed
+    leased_until = Column(DateTime(timezone=True), nullable=True)
+    leased_by = Column(String(64), nullable=True)
     
-    location = relationship("Location", back_populates="reviews")
-    category = relationship("Category", back_populates="reviews")
+    location = relationship("Location", back_populates="reviews", lazy="raise")
+    category = relationship("Category", back_populates="reviews", lazy="raise")
     
     __table_args__ = (
         Index(
@@ -29,4 +32,9 @@ class LocationCategoryReview(BaseModel):
             'category_id',
             'last_reviewed_at'
         ),
+        # matches the exploration ORDER BY last_reviewed_at NULLS FIRST
+        Index(
+            'idx_location_category_reviews_staleness',
+            last_reviewed_at.asc().nullsfirst()
+        ),
     )
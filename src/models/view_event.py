@@ -0,0 +1,45 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Identity, Index, Integer, func
+
+from src.core.database import Base
+
+
+class LocationViewEvent(Base):
+    """
+    One nearby view of a location. Append-only: rows are written in batches
+    with COPY and never updated, LocationViewStats holds the rollup.
+    """
+    __tablename__ = "location_view_events"
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    # no foreign key, so appends skip the lookup; the rollup drops deleted locations
+    location_id = Column(Integer, nullable=False)
+    # app clock, when the view happened
+    viewed_at = Column(DateTime(timezone=True), nullable=False)
+    # database clock, when the row was copied in. The rollup windows on it,
+    # so a batch copied late, e.g. after a failed COPY, is still rolled up
+    recorded_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        # rows arrive in recorded_at order, a BRIN index stays tiny
+        Index('idx_location_view_events_recorded_at', 'recorded_at', postgresql_using='brin'),
+    )
+
+
+class LocationViewStats(Base):
+    __tablename__ = "location_view_stats"
+
+    location_id = Column(
+        Integer,
+        ForeignKey("locations.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    view_count = Column(BigInteger, nullable=False, default=0)
+    last_viewed_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class ViewRollup(Base):
+    """Single row: events with recorded_at before rolled_up_to are in the stats"""
+    __tablename__ = "location_view_rollups"
+
+    id = Column(Integer, primary_key=True)
+    rolled_up_to = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,61 @@
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, and_
+from src.models.api_key import ApiKey
+from src.core.invalidation import invalidation_bus
+from .base import BaseRepository
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ApiKeyRepository(BaseRepository[ApiKey]):
+    """
+    Repository for handling ApiKey-related database operations
+    """
+    def __init__(self):
+
+        super().__init__(model=ApiKey)
+
+    async def get_active_by_hash(
+        self,
+        db: AsyncSession,
+        key_hash: str
+    ) -> Optional[ApiKey]:
+        """Get an active API key by the hash of its plaintext"""
+        try:
+            query = select(ApiKey).where(
+                and_(
+                    ApiKey.key_hash == key_hash,
+                    ApiKey.is_active == True
+                )
+            )
+            result = await db.execute(query)
+            return result.scalar_one_or_none()
+        except Exception as e:
+            logger.error(f"Error fetching api key by hash: {str(e)}")
+            raise
+
+    async def revoke(
+        self,
+        db: AsyncSession,
+        id: int
+    ) -> Optional[ApiKey]:
+        """Deactivate an API key"""
+        try:
+            query = (
+                update(ApiKey)
+                .where(ApiKey.id == id)
+                .values(is_active=False, revoked_at=datetime.now(timezone.utc))
+                .returning(ApiKey)
+            )
+            result = await db.execute(query)
+            api_key = result.scalar_one_or_none()
+            if api_key is not None:
+                await invalidation_bus.publish(db, ApiKey.__tablename__, [id])
+            await db.commit()
+            return api_key
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error revoking api key {id}: {str(e)}")
+            raise
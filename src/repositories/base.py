@@ -1,30 +1,96 @@
-from typing import Generic, TypeVar, Type, Optional, List, Any
+from typing import Generic, TypeVar, Type, Optional, List, Any, Dict, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, update, delete, any_, bindparam, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import DeclarativeMeta
+from sqlalchemy.sql import Select
 
 ModelType = TypeVar("ModelType", bound=DeclarativeMeta)
 
+from src.core.batching import BatchLoader
+from src.core.config import get_settings
 from src.core.exceptions import NotFoundException
+from src.core.invalidation import invalidation_bus
 import logging
 
 ModelType = TypeVar("ModelType", bound=DeclarativeMeta)
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# session.info key of the per-session {model: BatchLoader} map
+LOADERS_KEY = "batch_loaders"
 
 class BaseRepository(Generic[ModelType]):
     """
     Base Repository with common CRUD operations and caching support
     """
+    # Prebuilt statements keyed by (model, query shape). A prebuilt statement
+    # memoizes its SQLAlchemy cache key, so executing it skips construction
+    # and cache-key generation; only the bound parameters change per call.
+    _statements: Dict[Tuple, Select] = {}
+
     def __init__(self, model: Type[ModelType]):
         self.model = model
 
+    def _get_many_statement(self) -> Select:
+        key = (self.model, "get_many")
+        statement = self._statements.get(key)
+        if statement is None:
+            statement = select(self.model).where(
+                self.model.id == any_(bindparam("ids", type_=ARRAY(Integer)))
+            )
+            self._statements[key] = statement
+        return statement
+
+    def _loader(self, db: AsyncSession) -> BatchLoader:
+        """
+        The get-by-id loader of this model for the session. The session is
+        request scoped (get_db), so batching and memoization are too.
+        """
+        loaders = db.info.setdefault(LOADERS_KEY, {})
+        loader = loaders.get(self.model)
+        if loader is None:
+            loader = BatchLoader(
+                lambda ids: self._get_by_ids(db, ids),
+                max_batch_size=settings.BATCH_GET_MAX_IDS
+            )
+            loaders[self.model] = loader
+        return loader
+
+    async def _get_by_ids(self, db: AsyncSession, ids: List[int]) -> Dict[int, ModelType]:
+        result = await db.execute(self._get_many_statement(), {"ids": list(ids)})
+        return {instance.id: instance for instance in result.scalars().all()}
+
+    def _build_get_multi_statement(self, filter_shape: Tuple[Tuple[str, bool], ...]) -> Select:
+        query = select(self.model)
+        for field, is_null in filter_shape:
+            column = getattr(self.model, field)
+            if is_null:
+                query = query.where(column.is_(None))
+            else:
+                query = query.where(column == bindparam(f"filter_{field}"))
+        return query
+
+    def _get_multi_statement(self, filter_shape: Tuple[Tuple[str, bool], ...]) -> Select:
+        key = (self.model, "get_multi", filter_shape)
+        statement = self._statements.get(key)
+        if statement is None:
+            statement = (
+                self._build_get_multi_statement(filter_shape)
+                .offset(bindparam("skip", type_=Integer))
+                .limit(bindparam("limit", type_=Integer))
+            )
+            self._statements[key] = statement
+        return statement
+
     async def get(self, db: AsyncSession, id: int) -> Optional[ModelType]:
-        """Get a single record by ID with caching"""
+        """
+        Get a single record by ID. Calls made in the same event loop tick
+        share one ``id = ANY(:ids)`` query, results are memoized for the session.
+        """
         try:
-            query = select(self.model).where(self.model.id == id)
-            result = await db.execute(query)
-            instance = result.scalar_one_or_none()
+            instance = await self._loader(db).load(id)
             
             if not instance:
                 raise NotFoundException(f"{self.model.__name__} with id {id} not found")
@@ -34,6 +100,24 @@ class BaseRepository(Generic[ModelType]):
             logger.error(f"Error fetching {self.model.__name__} with id {id}: {str(e)}")
             raise
 
+    async def get_many(self, db: AsyncSession, ids: List[int]) -> Dict[int, ModelType]:
+        """
+        Get the records of several IDs, keyed by ID. IDs without a record are
+        left out. Goes through the same loader as get, so it is one ANY query
+        per BATCH_GET_MAX_IDS ids, run one after another on the session, and
+        shares the session memo.
+        """
+        try:
+            instances = await self._loader(db).load_many(list(ids))
+            return {
+                id: instance
+                for id, instance in zip(ids, instances)
+                if instance is not None
+            }
+        except Exception as e:
+            logger.error(f"Error fetching {self.model.__name__} with ids {ids}: {str(e)}")
+            raise
+
     async def get_multi(
         self,
         db: AsyncSession,
@@ -45,17 +129,29 @@ class BaseRepository(Generic[ModelType]):
     ) -> List[ModelType]:
         """Get multiple records with filtering and ordering"""
         try:
-            query = select(self.model)
-
-            if filters:
-                for field, value in filters.items():
-                    query = query.where(getattr(self.model, field) == value)
+            filters = filters or {}
+            # the shape (which fields, which are NULL checks) keys the statement
+            filter_shape = tuple(sorted((field, value is None) for field, value in filters.items()))
+            params = {
+                f"filter_{field}": value
+                for field, value in filters.items()
+                if value is not None
+            }
 
             if order_by:
-                query = query.order_by(*order_by)
-
-            query = query.offset(skip).limit(limit)
-            result = await db.execute(query)
+                # order_by expressions are new objects on every call, so these
+                # shapes cannot be keyed and are built per call
+                query = (
+                    self._build_get_multi_statement(filter_shape)
+                    .order_by(*order_by)
+                    .offset(skip)
+                    .limit(limit)
+                )
+            else:
+                query = self._get_multi_statement(filter_shape)
+                params.update(skip=skip, limit=limit)
+
+            result = await db.execute(query, params)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error fetching multiple {self.model.__name__}: {str(e)}")
@@ -74,12 +170,17 @@ class BaseRepository(Generic[ModelType]):
 
             # Add the new object to the session
             session.add(db_obj)
-            
+
+            # Flush to get the id, and tell other workers once this commits
+            await session.flush()
+            await invalidation_bus.publish(session, self.model.__tablename__, [db_obj.id])
+
             # Commit the transaction asynchronously
             await session.commit()
 
             # Refresh the object to get updated fields (like autogenerated IDs)
             await session.refresh(db_obj)
+            self._loader(session).prime(db_obj.id, db_obj)
 
             return db_obj
 
@@ -105,8 +206,12 @@ class BaseRepository(Generic[ModelType]):
                 .returning(self.model)
             )
             result = await db.execute(query)
+            db_obj = result.scalar_one_or_none()
+            if db_obj is not None:
+                await invalidation_bus.publish(db, self.model.__tablename__, [id])
             await db.commit()
-            return result.scalar_one_or_none()
+            self._loader(db).prime(id, db_obj)
+            return db_obj
         except Exception as e:
             await db.rollback()
             logger.error(f"Error updating {self.model.__name__} with id {id}: {str(e)}")
@@ -117,7 +222,10 @@ class BaseRepository(Generic[ModelType]):
         try:
             query = delete(self.model).where(self.model.id == id)
             result = await db.execute(query)
+            if result.rowcount > 0:
+                await invalidation_bus.publish(db, self.model.__tablename__, [id])
             await db.commit()
+            self._loader(db).prime(id, None)
             return result.rowcount > 0
         except Exception as e:
             await db.rollback()
@@ -1,12 +1,30 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, bindparam, func, Integer
 from src.models.category import Category
+from src.core.invalidation import invalidation_bus
 from .base import BaseRepository
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Built once, see BaseRepository._statements
+ACTIVE_CATEGORIES_QUERY = (
+    select(Category)
+    .where(Category.is_active == True)
+    .offset(bindparam('skip', type_=Integer))
+    .limit(bindparam('limit', type_=Integer))
+)
+CATEGORY_BY_NAME_QUERY = select(Category).where(
+    and_(
+        Category.name == bindparam('name'),
+        Category.is_active == True
+    )
+)
+ALL_CATEGORIES_QUERY = select(Category).order_by(Category.id)
+# Changes whenever a category is created, updated or deleted
+CATALOG_VERSION_QUERY = select(func.count(Category.id), func.max(Category.updated_at))
+
 class CategoryRepository(BaseRepository[Category]):
     """
     Repository for handling Category-related database operations
@@ -23,18 +41,33 @@ class CategoryRepository(BaseRepository[Category]):
     ) -> List[Category]:
         """Get all active categories"""
         try:
-            query = (
-                select(Category)
-                .where(Category.is_active == True)
-                .offset(skip)
-                .limit(limit)
+            result = await db.execute(
+                ACTIVE_CATEGORIES_QUERY,
+                {"skip": skip, "limit": limit}
             )
-            result = await db.execute(query)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error fetching active categories: {str(e)}")
             raise
 
+    async def get_all(self, db: AsyncSession) -> List[Category]:
+        """Get every category, active or not, ordered by id"""
+        try:
+            result = await db.execute(ALL_CATEGORIES_QUERY)
+            return result.scalars().all()
+        except Exception as e:
+            logger.error(f"Error fetching all categories: {str(e)}")
+            raise
+
+    async def get_catalog_version(self, db: AsyncSession) -> Tuple:
+        """Cheap stamp of the categories table, (row count, last update)"""
+        try:
+            result = await db.execute(CATALOG_VERSION_QUERY)
+            return tuple(result.one())
+        except Exception as e:
+            logger.error(f"Error fetching category catalog version: {str(e)}")
+            raise
+
     async def get_by_name(
         self,
         db: AsyncSession,
@@ -42,13 +75,7 @@ class CategoryRepository(BaseRepository[Category]):
     ) -> Optional[Category]:
         """Get category by name"""
         try:
-            query = select(Category).where(
-                and_(
-                    Category.name == name,
-                    Category.is_active == True
-                )
-            )
-            result = await db.execute(query)
+            result = await db.execute(CATEGORY_BY_NAME_QUERY, {"name": name})
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching category by name {name}: {str(e)}")
@@ -63,9 +90,15 @@ class CategoryRepository(BaseRepository[Category]):
         try:
             db_categories = [Category(**cat) for cat in categories]
             session.add_all(db_categories)
+            await session.flush()
+            await invalidation_bus.publish(
+                session,
+                Category.__tablename__,
+                [cat.id for cat in db_categories]
+            )
             await session.commit()
-            for cat in db_categories:
-                await session.refresh(cat)
+            # ids and defaults are set by the flush and kept by the commit
+            # (expire_on_commit=False), a refresh per row would be an N+1
             return db_categories
         except Exception as e:
             await session.rollback()
@@ -1,15 +1,232 @@
 from typing import Optional, List
 
+from geoalchemy2 import Geometry
 from geoalchemy2.elements import WKTElement
-from sqlalchemy import func
+from sqlalchemy import func, bindparam, case, exists, or_, text, type_coerce, Float, Integer, String
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.dialects.postgresql import JSON, aggregate_order_by
 from sqlalchemy.future import select
+from sqlalchemy.orm import with_expression
 
+from src.models.category import Category
 from src.models.location import Location
+from src.models.review import LocationCategoryReview
 from src.repositories.recomendation import LocationCategoryRepository
+from src.core.config import get_settings
+from src.core.exceptions import NotFoundException
+from src.core.invalidation import invalidation_bus
+from src.core.tiles import TILE_BUFFER, TILE_EXTENT, TILES_TOPIC, pack_tile, tiles_for_point
+from src.schemas.location import (
+    BoundingBox,
+    ClusterResponse,
+    LocationCluster,
+    LocationPoint,
+    LocationSuggestion
+)
 from .base import BaseRepository
 
+settings = get_settings()
+
+# caps the cells of a query when a wide box is sent with a high zoom
+MAX_CLUSTER_CELLS_PER_AXIS = 64
+
+
+# The categories of each location as a json array, aggregated in the same
+# statement as the locations, so listing them is one query at any size.
+# JSON decodes it, asyncpg hands json back as text
+LOCATION_CATEGORIES = type_coerce(
+    select(
+        func.coalesce(
+            func.json_agg(aggregate_order_by(
+                func.json_build_object('id', Category.id, 'name', Category.name),
+                Category.name
+            )),
+            text("'[]'::json")
+        )
+    )
+    .join(LocationCategoryReview, LocationCategoryReview.category_id == Category.id)
+    .where(LocationCategoryReview.location_id == Location.id)
+    .correlate(Location)
+    .scalar_subquery(),
+    JSON
+)
+
+
+def with_categories(query):
+    return query.options(with_expression(Location.categories, LOCATION_CATEGORIES))
+
+
+# Built once, see BaseRepository._statements. On geography ST_DWithin takes
+# metres, geography(point) is the expression of idx_locations_point_geography
+NEARBY_QUERY = with_categories(select(Location).filter(
+    func.ST_DWithin(
+        func.geography(Location.point),
+        func.geography(bindparam('point', type_=Geometry(geometry_type='POINT', srid=4326))),
+        bindparam('distance', type_=Float)
+    )
+).limit(bindparam('limit', type_=Integer)))
+
+# populate_existing: the location may already be in the session (e.g. from
+# get, which update and delete go through) and would keep categories
+# unloaded. It overwrites that instance's pending changes, so it is only set
+# here, for a single row, and not on NEARBY_QUERY where a location already
+# loaded by the request reports no categories instead.
+DETAIL_QUERY = with_categories(
+    select(Location).where(Location.id == bindparam('id', type_=Integer))
+).execution_options(populate_existing=True)
+
+def viewport_envelope():
+    """ST_MakeEnvelope over the bound corners, ``&&`` against it hits idx_locations_point"""
+    return func.ST_MakeEnvelope(
+        bindparam('min_longitude', type_=Float),
+        bindparam('min_latitude', type_=Float),
+        bindparam('max_longitude', type_=Float),
+        bindparam('max_latitude', type_=Float),
+        4326
+    )
+
+def build_viewport_query(with_category: bool):
+    """
+    Locations inside the viewport in id order, ``after_id`` is the keyset
+    cursor so dense areas are paged without OFFSET.
+    """
+    query = select(Location).where(
+        Location.point.op('&&')(viewport_envelope()),
+        Location.id > bindparam('after_id', type_=Integer)
+    )
+    if with_category:
+        query = query.where(
+            exists().where(
+                LocationCategoryReview.location_id == Location.id,
+                LocationCategoryReview.category_id == bindparam('category_id', type_=Integer)
+            )
+        )
+    return query.order_by(Location.id).limit(bindparam('limit', type_=Integer))
+
+VIEWPORT_QUERY = build_viewport_query(with_category=False)
+VIEWPORT_CATEGORY_QUERY = build_viewport_query(with_category=True)
+
+def build_tile_query():
+    """
+    A Mapbox vector tile with one ``locations`` layer. The envelope is grown
+    by the tile buffer so markers crossing an edge are drawn on both tiles.
+    """
+    return text(f"""
+        WITH bounds AS (
+            SELECT ST_TileEnvelope(:z, :x, :y) AS geom
+        ),
+        tile AS (
+            SELECT
+                locations.id,
+                locations.name,
+                ST_AsMVTGeom(
+                    ST_Transform(locations.point, 3857),
+                    bounds.geom,
+                    {TILE_EXTENT},
+                    {TILE_BUFFER},
+                    true
+                ) AS geom
+            FROM locations, bounds
+            WHERE locations.point && ST_Transform(
+                ST_Expand(
+                    bounds.geom,
+                    (ST_XMax(bounds.geom) - ST_XMin(bounds.geom)) * {TILE_BUFFER} / {TILE_EXTENT}
+                ),
+                4326
+            )
+        )
+        SELECT ST_AsMVT(tile, 'locations', {TILE_EXTENT}, 'geom') FROM tile
+    """).bindparams(
+        bindparam('z', type_=Integer),
+        bindparam('x', type_=Integer),
+        bindparam('y', type_=Integer)
+    )
+
+TILE_QUERY = build_tile_query()
+
+def build_cluster_query():
+    """
+    One aggregate per grid cell: the centroid and the count, plus the members
+    themselves only for cells small enough to be drawn as single markers.
+    """
+    cell = func.ST_SnapToGrid(Location.point, bindparam('cell_size', type_=Float))
+    count = func.count(Location.id)
+    expand = count <= bindparam('expand_max', type_=Integer)
+
+    def members(column):
+        return case((expand, func.array_agg(column)), else_=None)
+
+    return (
+        select(
+            count.label('count'),
+            func.avg(Location.latitude).label('latitude'),
+            func.avg(Location.longitude).label('longitude'),
+            members(Location.id).label('ids'),
+            members(Location.name).label('names'),
+            members(Location.latitude).label('latitudes'),
+            members(Location.longitude).label('longitudes')
+        )
+        .where(Location.point.op('&&')(viewport_envelope()))
+        .group_by(cell)
+    )
+
+CLUSTER_QUERY = build_cluster_query()
+
+def build_search_query(near: bool):
+    """
+    Locations whose name starts with ``prefix`` or is word-similar to
+    ``query`` (pg_trgm ``<%``), both served by idx_locations_name_trgm.
+    Prefix matches rank first, then by word similarity. With ``near`` the
+    score decays with the distance to the bound point over ``bias_m``.
+    """
+    query = bindparam('query', type_=String)
+    # backslash is the default LIKE escape, see search_prefix
+    is_prefix = Location.name.ilike(bindparam('prefix', type_=String))
+    score = case((is_prefix, 1.0), else_=0.0) + func.word_similarity(query, Location.name, type_=Float)
+    columns = [Location.id, Location.name, Location.latitude, Location.longitude]
+    if near:
+        origin = func.geography(
+            func.ST_SetSRID(
+                func.ST_MakePoint(
+                    bindparam('longitude', type_=Float),
+                    bindparam('latitude', type_=Float)
+                ),
+                4326
+            )
+        )
+        distance = func.ST_Distance(func.geography(Location.point), origin, type_=Float)
+        score = score / (1 + distance / bindparam('bias_m', type_=Float))
+        columns.append((distance / 1000).label('distance_km'))
+    score = score.label('score')
+    return (
+        select(*columns, score)
+        .where(or_(is_prefix, query.op('<%')(Location.name)))
+        .order_by(score.desc(), Location.name, Location.id)
+        .limit(bindparam('limit', type_=Integer))
+    )
+
+SEARCH_QUERY = build_search_query(near=False)
+NEARBY_SEARCH_QUERY = build_search_query(near=True)
+
+
+def search_prefix(query: str) -> str:
+    """ILIKE pattern matching names that start with query, wildcards escaped"""
+    escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"{escaped}%"
+
+
+def cluster_cell_size(bbox: BoundingBox, zoom: int) -> float:
+    """Grid step in degrees, a fraction of a web map tile at this zoom"""
+    tile_size = 360.0 / (2 ** zoom)
+    span = max(
+        bbox.max_longitude - bbox.min_longitude,
+        bbox.max_latitude - bbox.min_latitude
+    )
+    return max(
+        tile_size / settings.CLUSTER_CELLS_PER_TILE,
+        span / MAX_CLUSTER_CELLS_PER_AXIS
+    )
 
 class LocationRepository(BaseRepository[Location]):
     def __init__(self):
@@ -33,6 +250,14 @@ class LocationRepository(BaseRepository[Location]):
                 description=description
             )
             session.add(location)
+            await session.flush()
+            await invalidation_bus.publish(session, Location.__tablename__, [location.id])
+            tiles = tiles_for_point(longitude, latitude, settings.TILE_MAX_ZOOM)
+            await invalidation_bus.publish(
+                session,
+                TILES_TOPIC,
+                [pack_tile(*tile) for tile in tiles]
+            )
             await session.commit()
             await session.refresh(location)
             return location
@@ -50,15 +275,96 @@ class LocationRepository(BaseRepository[Location]):
     ) -> List[Location]:
         point = WKTElement(f'POINT({longitude} {latitude})', srid=4326)
 
-        stmt = select(Location).filter(
-            func.ST_DWithin(
-                Location.point,
-                point,
-                radius_km * 1000
+        result = await session.execute(
+            NEARBY_QUERY,
+            {"point": point, "distance": radius_km * 1000, "limit": limit}
+        )
+
+        locations = result.scalars().all()
+        return locations
+
+    async def get_with_categories(self, session: AsyncSession, id: int) -> Location:
+        result = await session.execute(DETAIL_QUERY, {"id": id})
+        location = result.scalar_one_or_none()
+        if location is None:
+            raise NotFoundException(f"Location with id {id} not found")
+        return location
+
+    async def search(
+        self,
+        session: AsyncSession,
+        query: str,
+        limit: int = 10,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None
+    ) -> List[LocationSuggestion]:
+        params = {"query": query, "prefix": search_prefix(query), "limit": limit}
+        statement = SEARCH_QUERY
+        if latitude is not None and longitude is not None:
+            statement = NEARBY_SEARCH_QUERY
+            params.update(
+                latitude=latitude,
+                longitude=longitude,
+                bias_m=settings.SEARCH_BIAS_KM * 1000
             )
-        ).limit(limit)
+        result = await session.execute(statement, params)
+        return [LocationSuggestion.model_validate(row, from_attributes=True) for row in result]
 
-        result = await session.execute(stmt)
+    async def get_in_viewport(
+        self,
+        session: AsyncSession,
+        bbox: BoundingBox,
+        limit: int,
+        after_id: int = 0,
+        category_id: Optional[int] = None
+    ) -> List[Location]:
+        params = {"after_id": after_id, "limit": limit, **bbox.model_dump()}
+        if category_id is None:
+            query = VIEWPORT_QUERY
+        else:
+            query = VIEWPORT_CATEGORY_QUERY
+            params["category_id"] = category_id
 
-        locations = result.scalars().all()
-        return locations
\ No newline at end of file
+        result = await session.execute(query, params)
+        return result.scalars().all()
+
+    async def get_tile(
+        self,
+        session: AsyncSession,
+        z: int,
+        x: int,
+        y: int
+    ) -> bytes:
+        result = await session.execute(TILE_QUERY, {"z": z, "x": x, "y": y})
+        return result.scalar() or b""
+
+    async def get_clusters(
+        self,
+        session: AsyncSession,
+        bbox: BoundingBox,
+        zoom: int
+    ) -> ClusterResponse:
+        result = await session.execute(
+            CLUSTER_QUERY,
+            {
+                "cell_size": cluster_cell_size(bbox, zoom),
+                "expand_max": settings.CLUSTER_EXPAND_MAX_POINTS,
+                **bbox.model_dump()
+            }
+        )
+
+        clusters, points = [], []
+        for row in result:
+            if row.ids is None:
+                clusters.append(LocationCluster(
+                    latitude=row.latitude,
+                    longitude=row.longitude,
+                    count=row.count
+                ))
+                continue
+            points.extend(
+                LocationPoint(id=id, name=name, latitude=latitude, longitude=longitude)
+                for id, name, latitude, longitude
+                in zip(row.ids, row.names, row.latitudes, row.longitudes)
+            )
+        return ClusterResponse(zoom=zoom, clusters=clusters, points=points)
@@ -0,0 +1,631 @@
+"""
+In-memory repositories with the semantics of the SQL ones.
+
+Selected with ``REPOSITORY_BACKEND=memory``. The whole stack (FastAPI,
+pydantic, services) then runs without PostGIS, which isolates service and
+API overhead in benchmarks and allows high-concurrency tests without a
+database. Data lives in the process and is lost on restart.
+"""
+import math
+from difflib import SequenceMatcher
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncGenerator, Dict, Generic, List, Optional, Tuple, Type
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql import operators
+
+from src.core.config import get_settings
+from src.core.coverage import coverage_counters
+from src.core.exceptions import NotFoundException
+from src.models.api_key import ApiKey
+from src.models.category import Category
+from src.models.location import Location
+from src.models.review import LocationCategoryReview
+from src.schemas.location import (
+    BoundingBox,
+    ClusterResponse,
+    LocationCluster,
+    LocationPoint,
+    LocationSuggestion
+)
+from src.schemas.recomendation import ExplorationRecommendation, LeasedRecommendation
+from .api_key import ApiKeyRepository
+from .base import BaseRepository, ModelType
+from .category import CategoryRepository
+from .location import LocationRepository, cluster_cell_size
+from .recomendation import LocationCategoryRepository, RecommendationRepository
+
+settings = get_settings()
+
+EARTH_RADIUS_M = 6_371_008.8
+# pg_trgm.word_similarity_threshold default
+WORD_SIMILARITY_THRESHOLD = 0.6
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class MemorySession:
+    """
+    Stands in for the AsyncSession the services pass around. Writes are
+    applied by the repositories right away, so there is nothing to commit.
+    """
+    def add(self, instance: Any) -> None:
+        pass
+
+    def expunge(self, instance: Any) -> None:
+        pass
+
+    async def flush(self) -> None:
+        pass
+
+    async def commit(self) -> None:
+        pass
+
+    async def rollback(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+async def get_memory_db() -> AsyncGenerator[MemorySession, None]:
+    """Replaces get_db when the memory backend is selected"""
+    yield MemorySession()
+
+
+class PointIndex:
+    """Columnar copy of the location coordinates, scanned by the distance filter"""
+    def __init__(self):
+        self._ids: List[int] = []
+        self._longitudes: List[float] = []
+        self._latitudes: List[float] = []
+
+    def add(self, id: int, longitude: float, latitude: float) -> None:
+        self._ids.append(id)
+        self._longitudes.append(longitude)
+        self._latitudes.append(latitude)
+
+    def remove(self, id: int) -> None:
+        try:
+            position = self._ids.index(id)
+        except ValueError:
+            return
+        for column in (self._ids, self._longitudes, self._latitudes):
+            del column[position]
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def within(self, longitude: float, latitude: float, distance_m: float) -> List[int]:
+        """Ids within ``distance_m`` metres on the sphere, in id order"""
+        # points outside the latitude band cannot be in range, and skipping
+        # them is much cheaper than their haversine
+        band = math.degrees(distance_m / EARTH_RADIUS_M)
+        return [
+            id
+            for id, x, y in zip(self._ids, self._longitudes, self._latitudes)
+            if abs(y - latitude) <= band and _haversine_m(longitude, latitude, x, y) <= distance_m
+        ]
+
+
+class MemoryStore:
+    """Every table of the memory backend, rows are the mapped model instances"""
+    def __init__(self):
+        self.tables: Dict[type, Dict[int, Any]] = defaultdict(dict)
+        self.sequences: Dict[type, int] = defaultdict(int)
+        self.points = PointIndex()
+
+    def table(self, model: type) -> Dict[int, Any]:
+        return self.tables[model]
+
+    def next_id(self, model: type) -> int:
+        self.sequences[model] += 1
+        return self.sequences[model]
+
+    def reset(self) -> None:
+        self.tables.clear()
+        self.sequences.clear()
+        self.points.clear()
+
+
+memory_store = MemoryStore()
+
+
+class MemoryRepository(BaseRepository[ModelType], Generic[ModelType]):
+    """BaseRepository over a MemoryStore table"""
+    def __init__(self, model: Type[ModelType], store: MemoryStore = memory_store):
+        super().__init__(model=model)
+        self.store = store
+
+    @property
+    def rows(self) -> Dict[int, ModelType]:
+        return self.store.table(self.model)
+
+    def _apply_defaults(self, db_obj: ModelType) -> None:
+        # what the INSERT would fill in: column defaults and the id
+        for column in self.model.__table__.columns:
+            if getattr(db_obj, column.key, None) is not None or column.default is None:
+                continue
+            default = column.default
+            if default.is_callable:
+                setattr(db_obj, column.key, default.arg(None))
+            elif default.is_scalar:
+                setattr(db_obj, column.key, default.arg)
+        db_obj.id = self.store.next_id(self.model)
+
+    def _check_unique(self, db_obj: ModelType) -> None:
+        for column in self.model.__table__.columns:
+            if not column.unique:
+                continue
+            value = getattr(db_obj, column.key)
+            if any(
+                getattr(row, column.key) == value and row.id != db_obj.id
+                for row in self.rows.values()
+            ):
+                raise IntegrityError(
+                    f"INSERT INTO {self.model.__tablename__}",
+                    {column.key: value},
+                    Exception(f"duplicate key value violates unique constraint on {column.key}")
+                )
+
+    def _insert(self, db_obj: ModelType) -> ModelType:
+        self._check_unique(db_obj)
+        self._apply_defaults(db_obj)
+        self.rows[db_obj.id] = db_obj
+        return db_obj
+
+    @staticmethod
+    def _sort_key(order_by: list):
+        """Column attributes and their .asc()/.desc(), what get_multi callers pass"""
+        keys = []
+        for expression in order_by:
+            descending = getattr(expression, "modifier", None) is operators.desc_op
+            column = getattr(expression, "element", expression)
+            keys.append((column.key, descending))
+
+        def sort(rows: list) -> list:
+            for key, descending in reversed(keys):
+                rows.sort(
+                    key=lambda row: (getattr(row, key) is None, getattr(row, key)),
+                    reverse=descending
+                )
+            return rows
+        return sort
+
+    async def get(self, db, id: int) -> Optional[ModelType]:
+        instance = self.rows.get(id)
+        if not instance:
+            raise NotFoundException(f"{self.model.__name__} with id {id} not found")
+        return instance
+
+    async def get_many(self, db, ids: List[int]) -> Dict[int, ModelType]:
+        return {id: self.rows[id] for id in ids if id in self.rows}
+
+    async def get_multi(
+        self,
+        db,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        filters: dict = None,
+        order_by: list = None
+    ) -> List[ModelType]:
+        filters = filters or {}
+        rows = [
+            row for row in self.rows.values()
+            if all(getattr(row, field) == value for field, value in filters.items())
+        ]
+        if order_by:
+            rows = self._sort_key(order_by)(rows)
+        return rows[skip:skip + limit]
+
+    async def create(self, session, *, obj_in: dict) -> ModelType:
+        return self._insert(self.model(**obj_in))
+
+    async def update(self, db, *, id: int, obj_in: dict) -> Optional[ModelType]:
+        db_obj = self.rows.get(id)
+        if db_obj is None:
+            return None
+        for field, value in obj_in.items():
+            setattr(db_obj, field, value)
+        db_obj.updated_at = _now()
+        self._check_unique(db_obj)
+        return db_obj
+
+    async def delete(self, db, *, id: int) -> bool:
+        return self.rows.pop(id, None) is not None
+
+
+class MemoryCategoryRepository(MemoryRepository[Category]):
+    def __init__(self, store: MemoryStore = memory_store):
+        super().__init__(model=Category, store=store)
+
+    def _sorted(self) -> List[Category]:
+        return [self.rows[id] for id in sorted(self.rows)]
+
+    async def get_active_categories(self, db, skip: int = 0, limit: int = 100) -> List[Category]:
+        return [c for c in self._sorted() if c.is_active][skip:skip + limit]
+
+    async def get_all(self, db) -> List[Category]:
+        return self._sorted()
+
+    async def get_catalog_version(self, db) -> Tuple:
+        updated = [c.updated_at for c in self.rows.values()]
+        return len(updated), max(updated, default=None)
+
+    async def get_by_name(self, db, name: str) -> Optional[Category]:
+        return next(
+            (c for c in self.rows.values() if c.name == name and c.is_active),
+            None
+        )
+
+    async def bulk_create(self, session, categories: List[dict]) -> List[Category]:
+        db_categories = [Category(**cat) for cat in categories]
+        names = [cat.name for cat in db_categories]
+        if len(set(names)) != len(names):
+            raise IntegrityError(
+                f"INSERT INTO {Category.__tablename__}",
+                {"name": names},
+                Exception("duplicate key value violates unique constraint on name")
+            )
+        for cat in db_categories:
+            self._check_unique(cat)
+        return [self._insert(cat) for cat in db_categories]
+
+
+class MemoryLocationRepository(MemoryRepository[Location]):
+    def __init__(self, store: MemoryStore = memory_store):
+        super().__init__(model=Location, store=store)
+
+    async def create_with_coordinates(
+        self,
+        session,
+        name: str,
+        latitude: float,
+        longitude: float,
+        description: Optional[str] = None
+    ) -> Location:
+        location = self._insert(Location(
+            name=name,
+            latitude=latitude,
+            longitude=longitude,
+            description=description
+        ))
+        self.store.points.add(location.id, longitude, latitude)
+        return location
+
+    async def delete(self, db, *, id: int) -> bool:
+        self.store.points.remove(id)
+        return await super().delete(db, id=id)
+
+    async def get_nearby(
+        self,
+        session,
+        latitude: float,
+        longitude: float,
+        radius_km: float = 1.0,
+        limit: int = 10
+    ) -> List[Location]:
+        # ST_DWithin on geography, like the SQL path
+        ids = self.store.points.within(longitude, latitude, radius_km * 1000)
+        return [self._with_categories(self.rows[id]) for id in ids[:limit]]
+
+    def _with_categories(self, location: Location) -> Location:
+        """Fill categories like LOCATION_CATEGORIES does"""
+        categories = self.store.table(Category)
+        location.categories = sorted(
+            (
+                {"id": review.category_id, "name": categories[review.category_id].name}
+                for review in self.store.table(LocationCategoryReview).values()
+                if review.location_id == location.id and review.category_id in categories
+            ),
+            key=lambda category: category["name"]
+        )
+        return location
+
+    async def get_with_categories(self, session, id: int) -> Location:
+        return self._with_categories(await self.get(session, id))
+
+    async def search(
+        self,
+        session,
+        query: str,
+        limit: int = 10,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None
+    ) -> List[LocationSuggestion]:
+        # difflib per word stands in for pg_trgm word_similarity and its 0.6 threshold
+        query = query.lower()
+        suggestions = []
+        for location in self.rows.values():
+            name = location.name.lower()
+            similarity = max(
+                (SequenceMatcher(None, query, word).ratio() for word in name.split()),
+                default=0.0
+            )
+            is_prefix = name.startswith(query)
+            if not is_prefix and similarity < WORD_SIMILARITY_THRESHOLD:
+                continue
+            score = (1.0 if is_prefix else 0.0) + similarity
+            distance_km = None
+            if latitude is not None and longitude is not None:
+                distance_m = _haversine_m(longitude, latitude, location.longitude, location.latitude)
+                score = score / (1 + distance_m / (settings.SEARCH_BIAS_KM * 1000))
+                distance_km = distance_m / 1000
+            suggestions.append(LocationSuggestion(
+                id=location.id,
+                name=location.name,
+                latitude=location.latitude,
+                longitude=location.longitude,
+                distance_km=distance_km,
+                score=score
+            ))
+        suggestions.sort(key=lambda suggestion: (-suggestion.score, suggestion.name, suggestion.id))
+        return suggestions[:limit]
+
+    def _in_box(self, bbox: BoundingBox) -> List[Location]:
+        return [
+            self.rows[id] for id in sorted(self.rows)
+            if bbox.min_longitude <= self.rows[id].longitude <= bbox.max_longitude
+            and bbox.min_latitude <= self.rows[id].latitude <= bbox.max_latitude
+        ]
+
+    async def get_in_viewport(
+        self,
+        session,
+        bbox: BoundingBox,
+        limit: int,
+        after_id: int = 0,
+        category_id: Optional[int] = None
+    ) -> List[Location]:
+        locations = [location for location in self._in_box(bbox) if location.id > after_id]
+        if category_id is not None:
+            tagged = {
+                review.location_id
+                for review in self.store.table(LocationCategoryReview).values()
+                if review.category_id == category_id
+            }
+            locations = [location for location in locations if location.id in tagged]
+        return locations[:limit]
+
+    async def get_tile(self, session, z: int, x: int, y: int) -> bytes:
+        # vector tiles are encoded by PostGIS, the memory backend serves empty ones
+        return b""
+
+    async def get_clusters(
+        self,
+        session,
+        bbox: BoundingBox,
+        zoom: int
+    ) -> ClusterResponse:
+        cell_size = cluster_cell_size(bbox, zoom)
+        cells: Dict[Tuple[float, float], List[Location]] = defaultdict(list)
+        for location in self._in_box(bbox):
+            # ST_SnapToGrid rounds to the nearest grid point
+            cell = (
+                round(location.longitude / cell_size),
+                round(location.latitude / cell_size)
+            )
+            cells[cell].append(location)
+
+        clusters, points = [], []
+        for members in cells.values():
+            if len(members) <= settings.CLUSTER_EXPAND_MAX_POINTS:
+                points.extend(
+                    LocationPoint(
+                        id=location.id,
+                        name=location.name,
+                        latitude=location.latitude,
+                        longitude=location.longitude
+                    )
+                    for location in members
+                )
+                continue
+            clusters.append(LocationCluster(
+                latitude=sum(location.latitude for location in members) / len(members),
+                longitude=sum(location.longitude for location in members) / len(members),
+                count=len(members)
+            ))
+        return ClusterResponse(zoom=zoom, clusters=clusters, points=points)
+
+
+def _haversine_m(longitude: float, latitude: float, other_longitude: float, other_latitude: float) -> float:
+    phi, other_phi = math.radians(latitude), math.radians(other_latitude)
+    d_phi = other_phi - phi
+    d_lambda = math.radians(other_longitude - longitude)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi) * math.cos(other_phi) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def _staleness(review: LocationCategoryReview) -> Tuple:
+    """ORDER BY last_reviewed_at NULLS FIRST"""
+    return review.last_reviewed_at is not None, review.last_reviewed_at or datetime.min
+
+
+class MemoryRecommendationRepository(MemoryRepository[LocationCategoryReview]):
+    def __init__(self, store: MemoryStore = memory_store):
+        super().__init__(model=LocationCategoryReview, store=store)
+
+    def _stale_pairs(self) -> List[Tuple[LocationCategoryReview, Location, Category]]:
+        cutoff_date = _now() - timedelta(days=settings.REVIEW_EXPIRATION_DAYS)
+        locations = self.store.table(Location)
+        categories = self.store.table(Category)
+        return [
+            (review, locations[review.location_id], categories[review.category_id])
+            for review in self.rows.values()
+            if review.location_id in locations
+            and review.category_id in categories
+            and (review.last_reviewed_at is None or review.last_reviewed_at < cutoff_date)
+        ]
+
+    @staticmethod
+    def _recommendation(review, location, category, **extra) -> dict:
+        return dict(
+            location_id=location.id,
+            location_name=location.name,
+            category_id=category.id,
+            category_name=category.name,
+            last_reviewed_at=review.last_reviewed_at,
+            **extra
+        )
+
+    async def get_exploration_recommendations(
+        self,
+        db,
+        limit: int = 10
+    ) -> List[ExplorationRecommendation]:
+        pairs = sorted(self._stale_pairs(), key=lambda pair: _staleness(pair[0]))
+        return [
+            ExplorationRecommendation(**self._recommendation(*pair))
+            for pair in pairs[:limit]
+        ]
+
+    async def get_nearby_exploration_recommendations(
+        self,
+        db,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        limit: int = 10
+    ) -> List[ExplorationRecommendation]:
+        nearby = []
+        for review, location, category in self._stale_pairs():
+            distance_m = _haversine_m(longitude, latitude, location.longitude, location.latitude)
+            if distance_m <= radius_km * 1000:
+                nearby.append((_staleness(review), distance_m, review, location, category))
+        nearby.sort(key=lambda entry: entry[:2])
+        return [
+            ExplorationRecommendation(
+                **self._recommendation(review, location, category, distance_km=distance_m / 1000)
+            )
+            for _, distance_m, review, location, category in nearby[:limit]
+        ]
+
+    async def lease_exploration_recommendations(
+        self,
+        db,
+        leased_by: str,
+        limit: int = 10,
+        lease_seconds: float = 900
+    ) -> List[LeasedRecommendation]:
+        # no await between picking and marking, so concurrent callers on the
+        # event loop claim disjoint pairs like SKIP LOCKED does
+        now = _now()
+        free = sorted(
+            (
+                pair for pair in self._stale_pairs()
+                if pair[0].leased_until is None or pair[0].leased_until < now
+            ),
+            key=lambda pair: _staleness(pair[0])
+        )[:limit]
+        leased = []
+        for review, location, category in free:
+            review.leased_until = now + timedelta(seconds=lease_seconds)
+            review.leased_by = leased_by
+            leased.append(LeasedRecommendation(**self._recommendation(
+                review,
+                location,
+                category,
+                lease_id=review.id,
+                leased_until=review.leased_until
+            )))
+        return leased
+
+    async def release_lease(self, db, lease_id: int, leased_by: str) -> bool:
+        review = self.rows.get(lease_id)
+        if (
+            review is None
+            or review.leased_by != leased_by
+            or review.leased_until is None
+            or review.leased_until <= _now()
+        ):
+            return False
+        review.leased_until = None
+        review.leased_by = None
+        return True
+
+    async def record_review(self, db, location_id: int, category_id: int) -> None:
+        review = self._insert(LocationCategoryReview(
+            location_id=location_id,
+            category_id=category_id,
+            last_reviewed_at=_now()
+        ))
+        coverage_counters.pair_added(category_id, review.last_reviewed_at)
+
+
+class MemoryLocationCategoryRepository(MemoryRepository[LocationCategoryReview]):
+    def __init__(self, store: MemoryStore = memory_store):
+        super().__init__(model=LocationCategoryReview, store=store)
+
+    async def create_relationship(
+        self,
+        session,
+        location_id: int,
+        category_id: int
+    ) -> LocationCategoryReview:
+        review = self._insert(LocationCategoryReview(
+            location_id=location_id,
+            category_id=category_id
+        ))
+        coverage_counters.pair_added(category_id)
+        return review
+
+    async def get_coverage_buckets(self, session, floor: datetime) -> List[tuple]:
+        buckets: Dict[Tuple, int] = defaultdict(int)
+        for review in self.rows.values():
+            reviewed_at = review.last_reviewed_at
+            if reviewed_at is not None:
+                reviewed_at = max(reviewed_at.replace(minute=0, second=0, microsecond=0), floor)
+            buckets[(review.category_id, reviewed_at)] += 1
+        return [(category_id, reviewed_at, pairs) for (category_id, reviewed_at), pairs in buckets.items()]
+
+    async def update_last_view(
+        self,
+        session,
+        location_id: int
+    ) -> Optional[LocationCategoryReview]:
+        updated = None
+        reviewed_at = _now()
+        for review in self.rows.values():
+            if review.location_id == location_id:
+                coverage_counters.pair_reviewed(review.category_id, review.last_reviewed_at, reviewed_at)
+                review.last_reviewed_at = reviewed_at
+                updated = updated or review
+        return updated
+
+
+class MemoryApiKeyRepository(MemoryRepository[ApiKey]):
+    def __init__(self, store: MemoryStore = memory_store):
+        super().__init__(model=ApiKey, store=store)
+
+    async def get_active_by_hash(self, db, key_hash: str) -> Optional[ApiKey]:
+        return next(
+            (key for key in self.rows.values() if key.key_hash == key_hash and key.is_active),
+            None
+        )
+
+    async def revoke(self, db, id: int) -> Optional[ApiKey]:
+        api_key = self.rows.get(id)
+        if api_key is not None:
+            api_key.is_active = False
+            api_key.revoked_at = _now()
+        return api_key
+
+
+MEMORY_REPOSITORIES = {
+    CategoryRepository: MemoryCategoryRepository,
+    LocationRepository: MemoryLocationRepository,
+    RecommendationRepository: MemoryRecommendationRepository,
+    LocationCategoryRepository: MemoryLocationCategoryRepository,
+    ApiKeyRepository: MemoryApiKeyRepository,
+}
+
+
+def resolve_repository(repository_class: type) -> type:
+    """The repository class to instantiate for the configured backend"""
+    if settings.REPOSITORY_BACKEND == "memory":
+        return MEMORY_REPOSITORIES.get(repository_class, repository_class)
+    return repository_class
@@ -4,15 +4,17 @@ from typing import List, Optional
 import logging
 
 from fastapi import HTTPException, status
-from sqlalchemy import select, func, or_, update
+from sqlalchemy import select, func, or_, and_, case, update, bindparam, DateTime, Float, Integer, String
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 
 from src.core.config import get_settings
+from src.core.coverage import COVERAGE_TOPIC, coverage_counters
+from src.core.invalidation import invalidation_bus
 from src.models.category import Category
 from src.models.location import Location
 from src.models.review import LocationCategoryReview
-from src.schemas.recomendation import ExplorationRecommendation
+from src.schemas.recomendation import ExplorationRecommendation, LeasedRecommendation
 
 from .base import BaseRepository
 
@@ -22,6 +24,182 @@ from .base import BaseRepository
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+
+def build_exploration_query(near: bool = False):
+    """
+    Stale location-category pairs, the cutoff and limit are bound per call.
+    With ``near`` only pairs within ``radius_m`` of the bound point are kept,
+    through the geography GiST index, and ties are broken by distance.
+    """
+    columns = [
+        Location.id.label('location_id'),
+        Location.name.label('location_name'),
+        Category.id.label('category_id'),
+        Category.name.label('category_name'),
+        LocationCategoryReview.last_reviewed_at
+    ]
+    if near:
+        # same expression as idx_locations_point_geography
+        location_point = func.geography(Location.point)
+        origin = func.geography(
+            func.ST_SetSRID(
+                func.ST_MakePoint(
+                    bindparam('longitude', type_=Float),
+                    bindparam('latitude', type_=Float)
+                ),
+                4326
+            )
+        )
+        distance = func.ST_Distance(location_point, origin, type_=Float)
+        columns.append((distance / 1000).label('distance_km'))
+
+    query = (
+        select(*columns)
+        .select_from(Category)
+        .join(
+            LocationCategoryReview,
+            LocationCategoryReview.category_id == Category.id,
+            isouter=True
+        )
+        .join(
+            Location,
+            LocationCategoryReview.location_id == Location.id
+        )
+        .where(
+            or_(
+                LocationCategoryReview.last_reviewed_at == None,
+                LocationCategoryReview.last_reviewed_at < bindparam('cutoff_date')
+            )
+        )
+    )
+    if near:
+        return (
+            query
+            .where(
+                func.ST_DWithin(
+                    location_point,
+                    origin,
+                    bindparam('radius_m', type_=Float)
+                )
+            )
+            .order_by(
+                (LocationCategoryReview.last_reviewed_at).nullsfirst(),
+                distance
+            )
+            .limit(bindparam('limit', type_=Integer))
+        )
+    return (
+        query
+        .order_by(
+            (LocationCategoryReview.last_reviewed_at).nullsfirst(),
+            func.random()
+        )
+        .limit(bindparam('limit', type_=Integer))
+    )
+
+def build_coverage_buckets_query():
+    """
+    Pairs per category and hour of last_reviewed_at, see CoverageCounters.
+    Reviews older than ``floor`` share its bucket, which keeps the result
+    to about categories * REVIEW_EXPIRATION_DAYS * 24 rows.
+    """
+    reviewed_hour = case(
+        (LocationCategoryReview.last_reviewed_at == None, None),
+        else_=func.greatest(
+            func.date_trunc('hour', LocationCategoryReview.last_reviewed_at),
+            bindparam('floor', type_=DateTime(timezone=True))
+        )
+    )
+    return (
+        select(
+            LocationCategoryReview.category_id,
+            reviewed_hour.label('reviewed_at'),
+            func.count().label('pairs')
+        )
+        .group_by(LocationCategoryReview.category_id, 'reviewed_at')
+    )
+
+COVERAGE_BUCKETS_QUERY = build_coverage_buckets_query()
+
+# the pairs a view moves, locked until the update commits
+LAST_VIEW_PREVIOUS_QUERY = (
+    select(LocationCategoryReview.category_id, LocationCategoryReview.last_reviewed_at)
+    .where(LocationCategoryReview.location_id == bindparam('location_id', type_=Integer))
+    .with_for_update()
+)
+
+def build_lease_query():
+    """
+    Claim up to ``limit`` stale, unleased pairs in one statement. The CTE
+    locks its rows with SKIP LOCKED, so concurrent callers claim disjoint
+    pairs instead of queueing on each other's locks. Leases are checked
+    against the database clock, an expired one is free to claim again.
+    """
+    candidates = (
+        select(LocationCategoryReview.id)
+        .where(
+            or_(
+                LocationCategoryReview.last_reviewed_at == None,
+                LocationCategoryReview.last_reviewed_at < bindparam('cutoff_date')
+            ),
+            or_(
+                LocationCategoryReview.leased_until == None,
+                LocationCategoryReview.leased_until < func.now()
+            )
+        )
+        .order_by((LocationCategoryReview.last_reviewed_at).nullsfirst())
+        .limit(bindparam('limit', type_=Integer))
+        .with_for_update(skip_locked=True)
+        .cte('candidates')
+    )
+    # Core table: the ORM update drops RETURNING columns of the FROM tables
+    return (
+        update(LocationCategoryReview.__table__)
+        .where(
+            LocationCategoryReview.id == candidates.c.id,
+            Location.id == LocationCategoryReview.location_id,
+            Category.id == LocationCategoryReview.category_id
+        )
+        .values(
+            leased_until=func.now() + func.make_interval(
+                0, 0, 0, 0, 0, 0, bindparam('lease_seconds', type_=Float)
+            ),
+            leased_by=bindparam('holder', type_=String),
+            # a lease is not an edit, keep updated_at as it was
+            updated_at=LocationCategoryReview.updated_at
+        )
+        .returning(
+            LocationCategoryReview.id.label('lease_id'),
+            Location.id.label('location_id'),
+            Location.name.label('location_name'),
+            Category.id.label('category_id'),
+            Category.name.label('category_name'),
+            LocationCategoryReview.last_reviewed_at,
+            LocationCategoryReview.leased_until
+        )
+    )
+
+RELEASE_LEASE_QUERY = (
+    update(LocationCategoryReview)
+    .where(
+        and_(
+            LocationCategoryReview.id == bindparam('lease_id', type_=Integer),
+            LocationCategoryReview.leased_by == bindparam('holder', type_=String),
+            LocationCategoryReview.leased_until > func.now()
+        )
+    )
+    .values(
+        leased_until=None,
+        leased_by=None,
+        updated_at=LocationCategoryReview.updated_at
+    )
+)
+
+# Built once, see BaseRepository._statements
+EXPLORATION_QUERY = build_exploration_query()
+NEARBY_EXPLORATION_QUERY = build_exploration_query(near=True)
+LEASE_QUERY = build_lease_query()
+
 class RecommendationRepository(BaseRepository[LocationCategoryReview]):
 
     def __init__(self):
@@ -39,38 +217,10 @@ class RecommendationRepository(BaseRepository[LocationCategoryReview]):
                 days=settings.REVIEW_EXPIRATION_DAYS
             )
  
-            query = (
-                select(
-                    Location.id.label('location_id'),
-                    Location.name.label('location_name'),
-                    Category.id.label('category_id'),
-                    Category.name.label('category_name'),
-                    LocationCategoryReview.last_reviewed_at
-                )
-                .select_from(Category)
-                .join(
-                    LocationCategoryReview,
-                    LocationCategoryReview.category_id == Category.id,
-                    isouter=True
-                )
-                .join(
-                    Location,
-                    LocationCategoryReview.location_id == Location.id
-                )
-                .where(
-                    or_(
-                        LocationCategoryReview.last_reviewed_at == None,
-                        LocationCategoryReview.last_reviewed_at < cutoff_date
-                    )
-                )
-                .order_by(
-                    (LocationCategoryReview.last_reviewed_at).nullsfirst(),
-                    func.random()
-                )
-                .limit(limit)
+            result = await db.execute(
+                EXPLORATION_QUERY,
+                {"cutoff_date": cutoff_date, "limit": limit}
             )
-            
-            result = await db.execute(query)
             rows = result.all()
             
             return [
@@ -90,6 +240,120 @@ class RecommendationRepository(BaseRepository[LocationCategoryReview]):
                 detail="Error getting exploration recommendations"
             )
 
+    async def get_nearby_exploration_recommendations(
+        self,
+        db: AsyncSession,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        limit: int = 10
+    ) -> List[ExplorationRecommendation]:
+        try:
+            cutoff_date = datetime.utcnow() - timedelta(
+                days=settings.REVIEW_EXPIRATION_DAYS
+            )
+
+            result = await db.execute(
+                NEARBY_EXPLORATION_QUERY,
+                {
+                    "cutoff_date": cutoff_date,
+                    "latitude": latitude,
+                    "longitude": longitude,
+                    "radius_m": radius_km * 1000,
+                    "limit": limit
+                }
+            )
+
+            return [
+                ExplorationRecommendation(
+                    location_id=row.location_id,
+                    location_name=row.location_name,
+                    category_id=row.category_id,
+                    category_name=row.category_name,
+                    last_reviewed_at=row.last_reviewed_at,
+                    distance_km=row.distance_km
+                )
+                for row in result.all()
+            ]
+        except Exception as e:
+            logger.error(f"Error getting nearby exploration recommendations: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error getting exploration recommendations"
+            )
+
+    async def lease_exploration_recommendations(
+        self,
+        db: AsyncSession,
+        leased_by: str,
+        limit: int = 10,
+        lease_seconds: float = 900
+    ) -> List[LeasedRecommendation]:
+        """Claim stale pairs for ``leased_by`` until the lease expires"""
+        try:
+            cutoff_date = datetime.utcnow() - timedelta(
+                days=settings.REVIEW_EXPIRATION_DAYS
+            )
+
+            result = await db.execute(
+                LEASE_QUERY,
+                {
+                    "cutoff_date": cutoff_date,
+                    "limit": limit,
+                    "lease_seconds": lease_seconds,
+                    "holder": leased_by
+                }
+            )
+            rows = result.all()
+            await db.commit()
+
+            # RETURNING has no ORDER BY, restore the staleness order
+            rows.sort(key=lambda row: (
+                row.last_reviewed_at is not None,
+                row.last_reviewed_at or datetime.min
+            ))
+            return [
+                LeasedRecommendation(
+                    lease_id=row.lease_id,
+                    location_id=row.location_id,
+                    location_name=row.location_name,
+                    category_id=row.category_id,
+                    category_name=row.category_name,
+                    last_reviewed_at=row.last_reviewed_at,
+                    leased_until=row.leased_until
+                )
+                for row in rows
+            ]
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error leasing exploration recommendations: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error leasing exploration recommendations"
+            )
+
+    async def release_lease(
+        self,
+        db: AsyncSession,
+        lease_id: int,
+        leased_by: str
+    ) -> bool:
+        """Release a lease held by ``leased_by``, False if it is not held anymore"""
+        try:
+            result = await db.execute(
+                RELEASE_LEASE_QUERY,
+                {"lease_id": lease_id, "holder": leased_by}
+            )
+            await db.commit()
+            return result.rowcount > 0
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error releasing lease {lease_id}: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error releasing lease"
+            )
+
     async def record_review(
         self,
         db: AsyncSession,
@@ -104,7 +368,9 @@ class RecommendationRepository(BaseRepository[LocationCategoryReview]):
                 last_reviewed_at=datetime.utcnow()
             )
             db.add(review)
+            await invalidation_bus.publish(db, COVERAGE_TOPIC, [category_id])
             await db.commit()
+            coverage_counters.pair_added(category_id, review.last_reviewed_at)
         except Exception as e:
             await db.rollback()
             logger.error(f"Error recording review: {str(e)}")
@@ -128,27 +394,51 @@ class LocationCategoryRepository(BaseRepository[LocationCategoryReview]):
             category_id=category_id,
         )
         session.add(location_category_Reviw)
+        await invalidation_bus.publish(session, COVERAGE_TOPIC, [category_id])
 
         await session.commit()
+        coverage_counters.pair_added(category_id)
         await session.refresh(location_category_Reviw)
         return location_category_Reviw
 
+    async def get_coverage_buckets(self, session: AsyncSession, floor: datetime) -> List[tuple]:
+        """(category_id, reviewed hour or None, pairs) rows"""
+        result = await session.execute(COVERAGE_BUCKETS_QUERY, {"floor": floor})
+        return [tuple(row) for row in result]
+
     async def update_last_view(
         self,
         session: AsyncSession,
         location_id: int
     ) -> Optional[LocationCategoryReview]:
         try:
+            # what each pair moves from, for the coverage counters
+            previous = await session.execute(
+                LAST_VIEW_PREVIOUS_QUERY,
+                {"location_id": location_id}
+            )
+            previous = previous.all()
+            reviewed_at = datetime.utcnow()
             # Get all reviews for the location
             stmt = (
                 update(LocationCategoryReview)
                 .where(LocationCategoryReview.location_id == location_id)
-                .values(last_reviewed_at=datetime.utcnow())
+                .values(last_reviewed_at=reviewed_at)
                 .returning(LocationCategoryReview)
             )
             result = await session.execute(stmt)
+            review = result.scalars().first()
+            await invalidation_bus.publish(
+                session,
+                COVERAGE_TOPIC,
+                sorted({category_id for category_id, _ in previous})
+            )
             await session.commit()
-            return result.scalar_one_or_none()
+            coverage_counters.apply_reviews(
+                (category_id, last_reviewed_at, reviewed_at)
+                for category_id, last_reviewed_at in previous
+            )
+            return review
 
         except SQLAlchemyError as e:
             await session.rollback()
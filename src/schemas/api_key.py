@@ -0,0 +1,10 @@
+from pydantic import BaseModel, ConfigDict
+
+
+class ApiKeyPrincipal(BaseModel):
+    """Identity attached to a verified API key, safe to keep in memory"""
+    model_config = ConfigDict(frozen=True, from_attributes=True)
+
+    id: int
+    name: str
+    key_hash: str
@@ -1,6 +1,8 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Generic, List, Optional, TypeVar
+
+ItemType = TypeVar("ItemType")
 
 class BaseResponseSchema(BaseModel):
     id: int
@@ -8,4 +10,20 @@ class BaseResponseSchema(BaseModel):
     updated_at: datetime
     
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class BatchResponse(BaseModel, Generic[ItemType]):
+    # found records in request order, ids without a record are listed apart
+    items: List[ItemType]
+    missing: List[int] = []
+
+    @classmethod
+    def collect(cls, ids: List[int], found: Dict[int, Any]) -> "BatchResponse":
+        """ Split the requested ids into found records and missing ids """
+        return cls.model_validate(
+            {
+                "items": [found[id] for id in ids if id in found],
+                "missing": [id for id in ids if id not in found]
+            },
+            from_attributes=True
+        )
@@ -11,4 +11,8 @@ class CategoryCreate(CategoryBase):
     pass
 
 class CategoryResponse(CategoryBase, BaseResponseSchema):
-    pass
\ No newline at end of file
+    pass
+
+class CategorySummary(BaseModel):
+    id: int
+    name: str
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import List, Optional
 from .base import BaseResponseSchema
+from .category import CategorySummary
 
 
 class LocationBase(BaseModel):
@@ -18,5 +19,56 @@ class LocationCreate(LocationBase):
 class LocationResponse(LocationBase, BaseResponseSchema):
     pass
 
-class LocationWithDistance(LocationResponse):
-    distance_km: Optional[float] = Field(None, ge=0)
\ No newline at end of file
+class LocationWithCategories(LocationResponse):
+    categories: List[CategorySummary] = []
+
+    @field_validator('categories', mode='before')
+    def default_categories(cls, v):
+        """ None when the query did not load them """
+        return v or []
+
+class LocationWithDistance(LocationWithCategories):
+    distance_km: Optional[float] = Field(None, ge=0)
+
+class LocationSuggestion(BaseModel):
+    id: int
+    name: str
+    latitude: float
+    longitude: float
+    # only when the search was biased toward a point
+    distance_km: Optional[float] = None
+    score: float
+
+class BoundingBox(BaseModel):
+    min_longitude: float = Field(..., ge=-180, le=180)
+    min_latitude: float = Field(..., ge=-90, le=90)
+    max_longitude: float = Field(..., ge=-180, le=180)
+    max_latitude: float = Field(..., ge=-90, le=90)
+
+    @model_validator(mode="after")
+    def check_corners(self):
+        """ The minimum corner must be south-west of the maximum corner """
+        if self.min_longitude >= self.max_longitude or self.min_latitude >= self.max_latitude:
+            raise ValueError("min_longitude/min_latitude must be lower than max_longitude/max_latitude")
+        return self
+
+class LocationPage(BaseModel):
+    items: List[LocationResponse]
+    # pass it back as after_id for the next page, None on the last one
+    next_after_id: Optional[int] = None
+
+class LocationPoint(BaseModel):
+    id: int
+    name: str
+    latitude: float
+    longitude: float
+
+class LocationCluster(BaseModel):
+    latitude: float
+    longitude: float
+    count: int = Field(..., ge=1)
+
+class ClusterResponse(BaseModel):
+    zoom: int
+    clusters: List[LocationCluster]
+    points: List[LocationPoint]
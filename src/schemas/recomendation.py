@@ -9,3 +9,10 @@ class ExplorationRecommendation(BaseModel):
     category_id: int
     category_name: str
     last_reviewed_at: Optional[datetime]
+    # only set when the exploration is filtered around a point
+    distance_km: Optional[float] = None
+
+
+class LeasedRecommendation(ExplorationRecommendation):
+    lease_id: int
+    leased_until: datetime
@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class CategoryCoverage(BaseModel):
+    category_id: int
+    category_name: Optional[str] = None
+    never_reviewed: int
+    stale: int
+    fresh: int
+    total: int
+
+class CoverageResponse(BaseModel):
+    categories: List[CategoryCoverage]
+    stale_after_days: int
+    # when the counters were last reloaded from the database
+    reconciled_at: Optional[datetime] = None
@@ -0,0 +1,110 @@
+import hashlib
+import secrets
+from typing import Any, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from src.core.cache import MISSING, TTLCache
+from src.core.config import get_settings
+from src.core.invalidation import invalidation_bus
+from src.models.api_key import ApiKey
+from src.repositories.api_key import ApiKeyRepository
+from src.schemas.api_key import ApiKeyPrincipal
+from src.services.base_service import BaseService
+
+settings = get_settings()
+
+# Keyed by the hash of the presented key, so no plaintext key stays in
+# memory. Unknown keys are cached as None for a shorter TTL (negative caching).
+api_key_cache = TTLCache(
+    max_entries=settings.API_KEY_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.API_KEY_CACHE_TTL_SECONDS
+)
+
+
+def hash_api_key(api_key: str) -> str:
+    """Keys are random 256-bit tokens, so an unsalted sha256 is enough"""
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+class ApiKeyService(BaseService[ApiKey]):
+    def __init__(self, cache: TTLCache = api_key_cache, repository: Any = ApiKeyRepository):
+        super().__init__(repository)
+        self.cache = cache
+
+    async def verify(
+        self,
+        session: AsyncSession,
+        api_key: str
+    ) -> Optional[ApiKeyPrincipal]:
+        """Return the principal for a valid key, None otherwise"""
+        key_hash = hash_api_key(api_key)
+        principal = self.cache.get(key_hash)
+        if principal is not MISSING:
+            return principal
+
+        try:
+            api_key_obj = await self.repository.get_active_by_hash(
+                db=session,
+                key_hash=key_hash
+            )
+        except SQLAlchemyError as e:
+            raise Exception(f"Error verifying api key: {str(e)}")
+
+        if api_key_obj is None:
+            self.cache.set(key_hash, None, settings.API_KEY_NEGATIVE_CACHE_TTL_SECONDS)
+            return None
+        principal = ApiKeyPrincipal.model_validate(api_key_obj)
+        self.cache.set(key_hash, principal)
+        return principal
+
+    async def create_key(
+        self,
+        session: AsyncSession,
+        name: str
+    ) -> Tuple[str, ApiKey]:
+        """Create a key, the plaintext is returned once and never stored"""
+        plaintext = secrets.token_urlsafe(32)
+        key_hash = hash_api_key(plaintext)
+        try:
+            api_key_obj = await self.repository.create(
+                session,
+                obj_in={"name": name, "key_hash": key_hash}
+            )
+        except SQLAlchemyError as e:
+            raise Exception(f"Error creating api key: {str(e)}")
+        # drop a cached negative entry in case the key was probed before
+        self.cache.pop(key_hash)
+        return plaintext, api_key_obj
+
+    async def revoke_key(
+        self,
+        session: AsyncSession,
+        api_key_id: int
+    ) -> Optional[ApiKey]:
+        """Revoke a key and evict it from the cache right away"""
+        try:
+            api_key_obj = await self.repository.revoke(session, id=api_key_id)
+        except SQLAlchemyError as e:
+            raise Exception(f"Error revoking api key: {str(e)}")
+        if api_key_obj is not None:
+            evict_api_keys(self.cache, [api_key_obj.id])
+        return api_key_obj
+
+
+def evict_api_keys(cache: TTLCache, api_key_ids: list) -> None:
+    """
+    Evict cached principals by id, the cache is keyed by key hash. Negative
+    entries are dropped as well, one of the ids may be a key just created.
+    """
+    ids = set(api_key_ids)
+    for key_hash, principal in cache.items():
+        if principal is None or principal.id in ids:
+            cache.pop(key_hash)
+
+
+# revocations on other workers arrive through the bus
+invalidation_bus.register(
+    ApiKey.__tablename__,
+    lambda ids: evict_api_keys(api_key_cache, ids),
+    resync=api_key_cache.clear
+)
@@ -1,6 +1,7 @@
-from typing import Generic, TypeVar, Type, Optional, List, Any
+from typing import Generic, TypeVar, Type, Optional, List, Any, Dict
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import DeclarativeMeta
+from src.repositories.memory import resolve_repository
 
 
 ModelType = TypeVar("ModelType", bound=DeclarativeMeta)
@@ -9,8 +10,12 @@ class BaseService(Generic[ModelType]):
     """
     Base Service class that works with BaseRepository
     """
-    def __init__(self, repository: Type[Any]):
-        self.repository = repository()
+    def __init__(self, repository: Any):
+        # a repository class is resolved for the backend and instantiated,
+        # an instance is used as is so the container can share it
+        if isinstance(repository, type):
+            repository = resolve_repository(repository)()
+        self.repository = repository
 
     async def get(
         self, 
@@ -20,6 +25,14 @@ class BaseService(Generic[ModelType]):
         """Get a single record by ID"""
         return await self.repository.get(session, id)
 
+    async def get_many(
+        self,
+        session: AsyncSession,
+        ids: List[int]
+    ) -> Dict[int, ModelType]:
+        """Get several records by ID, keyed by ID, missing ones left out"""
+        return await self.repository.get_many(session, ids)
+
     async def get_multi(
         self,
         session: AsyncSession,
@@ -1,13 +1,69 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from src.repositories.category import CategoryRepository
 from src.models.category import Category
+from src.schemas.base import BatchResponse
+from src.schemas.category import CategoryResponse
 from src.services.base_service import BaseService
+from src.services.category_catalog import CategoryCatalog, category_catalog
 
 class CategoryService(BaseService[Category]):
-    def __init__(self):
-        super().__init__(CategoryRepository)
+    """
+    Reads are served from the in-process category catalog. Concurrent
+    refreshes of the catalog are coalesced into one reload.
+    """
+    def __init__(
+        self,
+        catalog: CategoryCatalog = category_catalog,
+        repository: Any = CategoryRepository
+    ):
+        super().__init__(repository)
+        self.catalog = catalog
+
+    async def get(
+        self,
+        session: AsyncSession,
+        id: int
+    ) -> Optional[Category]:
+        """Get a category by id, from the catalog when possible"""
+        try:
+            await self.catalog.ensure_fresh(self.repository, session)
+        except SQLAlchemyError as e:
+            raise Exception(f"Error refreshing category catalog: {str(e)}")
+        category = self.catalog.get(id)
+        if category is not None:
+            return category
+        return await self.repository.get(session, id)
+
+    async def get_many(
+        self,
+        session: AsyncSession,
+        ids: List[int]
+    ) -> Dict[int, Category]:
+        """Get categories by id, one query for the ones the catalog lacks"""
+        try:
+            await self.catalog.ensure_fresh(self.repository, session)
+            found = {}
+            for id in ids:
+                category = self.catalog.get(id)
+                if category is not None:
+                    found[id] = category
+            unknown = [id for id in ids if id not in found]
+            if unknown:
+                found.update(await self.repository.get_many(session, unknown))
+            return found
+        except SQLAlchemyError as e:
+            raise Exception(f"Error getting categories by id: {str(e)}")
+
+    async def get_categories_by_ids(
+        self,
+        session: AsyncSession,
+        ids: List[int]
+    ) -> BatchResponse[CategoryResponse]:
+        """Categories of the ids in request order, unknown ids reported as missing"""
+        found = await self.get_many(session, ids)
+        return BatchResponse[CategoryResponse].collect(ids, found)
 
     async def get_active_categories(
         self,
@@ -17,11 +73,8 @@ class CategoryService(BaseService[Category]):
     ) -> List[Category]:
         """Get all active categories"""
         try:
-            return await self.repository.get_active_categories(
-                db=session,
-                skip=skip,
-                limit=limit
-            )
+            await self.catalog.ensure_fresh(self.repository, session)
+            return self.catalog.active(skip=skip, limit=limit)
         except SQLAlchemyError as e:
             raise Exception(f"Error getting active categories: {str(e)}")
 
@@ -32,6 +85,11 @@ class CategoryService(BaseService[Category]):
     ) -> Optional[Category]:
         """Get category by name"""
         try:
+            await self.catalog.ensure_fresh(self.repository, session)
+            category = self.catalog.get_by_name(name)
+            if category is not None:
+                return category
+            # may have been created on another worker since the last check
             return await self.repository.get_by_name(
                 db=session,
                 name=name
@@ -46,10 +104,12 @@ class CategoryService(BaseService[Category]):
     ) -> List[Category]:
         """Bulk create multiple categories"""
         try:
-            return await self.repository.bulk_create(
+            created = await self.repository.bulk_create(
                 session=session,
                 categories=categories
             )
+            self.catalog.invalidate()
+            return created
         except SQLAlchemyError as e:
             raise Exception(f"Error bulk creating categories: {str(e)}")
 
@@ -67,10 +127,7 @@ class CategoryService(BaseService[Category]):
                 "description": description,
                 "is_active": is_active
             }
-            return await self.repository.create(
-                session=session,
-                obj_in=category_data
-            )
+            return await self.create(session, obj_in=category_data)
         except SQLAlchemyError as e:
             raise Exception(f"Error creating category: {str(e)}")
 
@@ -82,10 +139,44 @@ class CategoryService(BaseService[Category]):
     ) -> Optional[Category]:
         """Update category active status"""
         try:
-            return await self.repository.update(
+            return await self.update(
                 session,
                 id=category_id,
                 obj_in={"is_active": is_active}
             )
         except SQLAlchemyError as e:
-            raise Exception(f"Error updating category status: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error updating category status: {str(e)}")
+
+    async def create(
+        self,
+        session: AsyncSession,
+        *,
+        obj_in: dict
+    ) -> Category:
+        """Create a category and make the catalog pick it up on the next read"""
+        category = await self.repository.create(session, obj_in=obj_in)
+        self.catalog.invalidate()
+        return category
+
+    async def update(
+        self,
+        session: AsyncSession,
+        *,
+        id: int,
+        obj_in: dict
+    ) -> Optional[Category]:
+        """Update a category and make the catalog pick it up on the next read"""
+        category = await self.repository.update(session, id=id, obj_in=obj_in)
+        self.catalog.invalidate()
+        return category
+
+    async def delete(
+        self,
+        session: AsyncSession,
+        *,
+        id: int
+    ) -> bool:
+        """Delete a category and make the catalog pick it up on the next read"""
+        deleted = await self.repository.delete(session, id=id)
+        self.catalog.invalidate()
+        return deleted
\ No newline at end of file
@@ -0,0 +1,98 @@
+import logging
+import time
+from typing import Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.config import get_settings
+from src.core.invalidation import invalidation_bus
+from src.core.singleflight import SingleFlight
+from src.models.category import Category
+from src.repositories.category import CategoryRepository
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class CategoryCatalog:
+    """
+    In-process copy of the categories table with O(1) lookup by id and name.
+
+    Reads check a cheap version stamp at most once per refresh interval and
+    reload the whole table only when it changed. Readers never wait on a
+    refresh once the catalog is loaded.
+    """
+    def __init__(self, refresh_interval_seconds: float):
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self._by_id: Dict[int, Category] = {}
+        self._by_name: Dict[str, Category] = {}
+        self._active: List[Category] = []
+        self._version = None
+        self._next_check = 0.0
+        self._flight = SingleFlight()
+
+    @property
+    def loaded(self) -> bool:
+        return self._version is not None
+
+    async def load(self, repository: CategoryRepository, session: AsyncSession) -> None:
+        """Load every category and remember the version they were read at"""
+        version = await repository.get_catalog_version(session)
+        self._swap(await self._fetch(repository, session), version)
+
+    @staticmethod
+    async def _fetch(repository: CategoryRepository, session: AsyncSession) -> List[Category]:
+        categories = await repository.get_all(session)
+        # detach them, a rollback in the loading request must not expire
+        # objects that outlive it
+        for category in categories:
+            session.expunge(category)
+        return categories
+
+    def _swap(self, categories: List[Category], version) -> None:
+        # build new dicts and swap them in, readers never see a half-built catalog
+        self._by_id = {category.id: category for category in categories}
+        self._by_name = {
+            category.name: category for category in categories if category.is_active
+        }
+        self._active = [category for category in categories if category.is_active]
+        self._version = version
+        self._next_check = time.monotonic() + self.refresh_interval_seconds
+        logger.info(f"Category catalog loaded with {len(categories)} categories")
+
+    async def ensure_fresh(self, repository: CategoryRepository, session: AsyncSession) -> None:
+        if self.loaded and (
+            time.monotonic() < self._next_check or self._flight.in_flight("refresh")
+        ):
+            return
+        await self._flight.do("refresh", lambda: self._refresh(repository, session))
+
+    async def _refresh(self, repository: CategoryRepository, session: AsyncSession) -> None:
+        version = await repository.get_catalog_version(session)
+        if version != self._version:
+            self._swap(await self._fetch(repository, session), version)
+        else:
+            self._next_check = time.monotonic() + self.refresh_interval_seconds
+
+    def invalidate(self) -> None:
+        """Force a version check on the next read"""
+        self._next_check = 0.0
+
+    def get(self, category_id: int) -> Optional[Category]:
+        return self._by_id.get(category_id)
+
+    def get_by_name(self, name: str) -> Optional[Category]:
+        return self._by_name.get(name)
+
+    def active(self, skip: int = 0, limit: int = 100) -> List[Category]:
+        return self._active[skip:skip + limit]
+
+
+category_catalog = CategoryCatalog(
+    refresh_interval_seconds=settings.CATEGORY_CATALOG_REFRESH_SECONDS
+)
+
+# writes on other workers arrive through the bus
+invalidation_bus.register(
+    Category.__tablename__,
+    lambda ids: category_catalog.invalidate(),
+    resync=category_catalog.invalidate
+)
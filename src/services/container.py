@@ -0,0 +1,44 @@
+from src.repositories.category import CategoryRepository
+from src.repositories.location import LocationRepository
+from src.repositories.memory import resolve_repository
+from src.repositories.recomendation import (
+    LocationCategoryRepository,
+    RecommendationRepository
+)
+from src.services.api_key import ApiKeyService
+from src.services.category import CategoryService
+from src.services.location import LocationService
+from src.services.recomendation import LocationCategoryService, RecommendationService
+from src.services.stats import StatsService
+from src.services.tile import TileService
+
+
+class ServiceContainer:
+    """
+    Long-lived services, built once in the app lifespan and injected with
+    Depends. Repositories are shared between the services that use them,
+    so their prepared statements and any state they hold live as long as
+    the app instead of one request.
+    """
+    def __init__(self):
+        category_repository = resolve_repository(CategoryRepository)()
+        location_repository = resolve_repository(LocationRepository)()
+        location_category_repository = resolve_repository(LocationCategoryRepository)()
+
+        self.categories = CategoryService(repository=category_repository)
+        self.locations = LocationService(
+            location_repository=location_repository,
+            category_repository=location_category_repository
+        )
+        self.recommendations = RecommendationService(
+            repository=resolve_repository(RecommendationRepository)()
+        )
+        self.location_categories = LocationCategoryService(
+            repository=location_category_repository
+        )
+        self.tiles = TileService(location_repository=location_repository)
+        self.api_keys = ApiKeyService()
+        self.stats = StatsService(
+            repository=location_category_repository,
+            category_repository=category_repository
+        )
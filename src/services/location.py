@@ -1,17 +1,57 @@
 from typing import List, Optional
+from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.repositories.location import LocationRepository
 from src.repositories.recomendation import LocationCategoryRepository
-from src.schemas.location import  LocationWithDistance
+from src.schemas.base import BatchResponse
+from src.schemas.location import (
+    BoundingBox,
+    ClusterResponse,
+    LocationPage,
+    LocationResponse,
+    LocationSuggestion,
+    LocationWithDistance
+)
 from src.models.location import Location
 from sqlalchemy.exc import SQLAlchemyError
+from src.core.cache import MISSING, TTLCache
+from src.core.config import get_settings
+from src.core.exceptions import NotFoundException
+from src.core.invalidation import invalidation_bus
+from src.core.server_timing import timed
+from src.core.singleflight import SingleFlight, normalize_key
+from src.core.view_events import ViewEventLog, view_event_log
+from src.repositories.memory import resolve_repository
 from src.services.base_service import BaseService
+from src.services.tile import evict_point, tile_cache
+
+settings = get_settings()
+
+# Typeahead results of short unbiased queries, keyed by (query, limit).
+# Short prefixes are the hottest and the most expensive to match.
+search_cache = TTLCache(
+    max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.SEARCH_CACHE_TTL_SECONDS
+)
 
 
 class LocationService(BaseService[Location]):
-    def __init__(self):
-        self.location_repository = LocationRepository()
-        self.category_repository = LocationCategoryRepository()
+    # shared by every instance, so concurrent identical reads run one query
+    _flight = SingleFlight()
+
+    def __init__(
+        self,
+        location_repository: Optional[LocationRepository] = None,
+        category_repository: Optional[LocationCategoryRepository] = None,
+        view_log: ViewEventLog = view_event_log
+    ):
+        self.location_repository = (
+            location_repository or resolve_repository(LocationRepository)()
+        )
+        self.category_repository = (
+            category_repository or resolve_repository(LocationCategoryRepository)()
+        )
+        self.view_log = view_log
 
     async def create_location(
         self,
@@ -29,18 +69,112 @@ class LocationService(BaseService[Location]):
             longitude=longitude,
             description=description
         )
-        
-        category_relationship = await self.category_repository.create_relationship(
-            session=session, 
-            location_id=location.id, 
-            category_id=category
-        )
+        try:
+            category_relationship = await self.category_repository.create_relationship(
+                session=session, 
+                location_id=location.id, 
+                category_id=category
+            )
+        finally:
+            # this worker drops its tiles right away, the others on the
+            # notification. After the last commit, so a render started from
+            # here on sees the insert; one already in flight may have
+            # queried before it and is kept out of the cache by TileCache
+            evict_point(tile_cache, longitude, latitude)
+            search_cache.clear()
         
         if not category_relationship:
             raise Exception("Error creando la relación entre la ubicación y la categoría")
             
         return location
     
+    async def get_locations_by_ids(
+        self,
+        session: AsyncSession,
+        ids: List[int]
+    ) -> BatchResponse[LocationResponse]:
+        """Locations of the ids in request order, unknown ids reported as missing"""
+        try:
+            found = await self.location_repository.get_many(session, ids)
+        except SQLAlchemyError as e:
+            raise Exception(f"Error retrieving locations by id: {str(e)}")
+        return BatchResponse[LocationResponse].collect(ids, found)
+
+    async def get_location(
+        self,
+        session: AsyncSession,
+        id: int
+    ) -> Location:
+        """A location with its categories, 404 when it does not exist"""
+        try:
+            return await self.location_repository.get_with_categories(session, id)
+        except NotFoundException as e:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+        except SQLAlchemyError as e:
+            raise Exception(f"Error retrieving location: {str(e)}")
+
+    async def search_locations(
+        self,
+        session: AsyncSession,
+        query: str,
+        limit: int,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None
+    ) -> List[LocationSuggestion]:
+        # matching ignores case and repeated spaces, so the cache key does too
+        query = " ".join(query.split()).lower()
+        cacheable = (
+            len(query) <= settings.SEARCH_CACHE_MAX_PREFIX
+            and latitude is None
+            and longitude is None
+        )
+        key = normalize_key("search", query, limit, latitude, longitude)
+        if cacheable:
+            suggestions = search_cache.get(key)
+            if suggestions is not MISSING:
+                return suggestions
+
+        try:
+            suggestions = await self._flight.do(
+                key,
+                lambda: self.location_repository.search(
+                    session=session,
+                    query=query,
+                    limit=limit,
+                    latitude=latitude,
+                    longitude=longitude
+                )
+            )
+        except SQLAlchemyError as e:
+            raise Exception(f"Error searching locations: {str(e)}")
+        if cacheable:
+            search_cache.set(key, suggestions)
+        return suggestions
+
+    async def _get_nearby_snapshot(
+        self,
+        session: AsyncSession,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        limit: int
+    ) -> List[LocationWithDistance]:
+        """
+        Pydantic copies of the nearby rows: the callers that joined the flight
+        must not share ORM instances bound to the leader's session
+        """
+        locations = await self.location_repository.get_nearby(
+            session=session,
+            latitude=latitude,
+            longitude=longitude,
+            radius_km=radius_km,
+            limit=limit
+        )
+        return [
+            LocationWithDistance.model_validate(location, from_attributes=True)
+            for location in locations
+        ]
+
     async def get_nearby_locations(
         self,
         session: AsyncSession,
@@ -50,22 +184,84 @@ class LocationService(BaseService[Location]):
         limit: int
     ) -> List[LocationWithDistance]:
         try:
-            locations = await self.location_repository.get_nearby(
+            locations = await self._flight.do(
+                normalize_key("nearby", latitude, longitude, radius_km, limit),
+                lambda: self._get_nearby_snapshot(
+                    session=session,
+                    latitude=latitude,
+                    longitude=longitude,
+                    radius_km=radius_km,
+                    limit=limit
+                )
+            )
+
+            # one view per caller, only the read above is shared. Buffered and
+            # rolled up into last_reviewed_at in the background, see ViewEventLog
+            with timed("views"):
+                self.view_log.record(location.id for location in locations)
+            
+            # the snapshots are shared, the list each caller gets is its own
+            return list(locations)
+            
+        except SQLAlchemyError as e:
+            raise Exception(f"Error retrieving nearby locations: {str(e)}")
+
+    async def get_viewport_locations(
+        self,
+        session: AsyncSession,
+        bbox: BoundingBox,
+        limit: int,
+        after_id: int = 0,
+        category_id: Optional[int] = None
+    ) -> LocationPage:
+        try:
+            # one extra row tells whether there is a next page
+            locations = await self.location_repository.get_in_viewport(
                 session=session,
-                latitude=latitude,
-                longitude=longitude,
-                radius_km=radius_km,
-                limit=limit
+                bbox=bbox,
+                limit=limit + 1,
+                after_id=after_id,
+                category_id=category_id
             )
+        except SQLAlchemyError as e:
+            raise Exception(f"Error retrieving viewport locations: {str(e)}")
+
+        items = [
+            LocationResponse.model_validate(location, from_attributes=True)
+            for location in locations[:limit]
+        ]
+        next_after_id = items[-1].id if len(locations) > limit else None
+        return LocationPage(items=items, next_after_id=next_after_id)
 
-            # update last viewed
-            for location in locations:
-                await self.category_repository.update_last_view(
+    async def get_clusters(
+        self,
+        session: AsyncSession,
+        bbox: BoundingBox,
+        zoom: int
+    ) -> ClusterResponse:
+        try:
+            return await self._flight.do(
+                normalize_key(
+                    "clusters",
+                    bbox.min_longitude,
+                    bbox.min_latitude,
+                    bbox.max_longitude,
+                    bbox.max_latitude,
+                    zoom
+                ),
+                lambda: self.location_repository.get_clusters(
                     session=session,
-                    location_id=location.id
+                    bbox=bbox,
+                    zoom=zoom
                 )
-            
-            return locations
-            
+            )
         except SQLAlchemyError as e:
-            raise Exception(f"Error retrieving nearby locations: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error retrieving location clusters: {str(e)}")
+
+
+# new or renamed locations on other workers can change any cached prefix
+invalidation_bus.register(
+    Location.__tablename__,
+    lambda ids: search_cache.clear(),
+    resync=search_cache.clear
+)
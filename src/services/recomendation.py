@@ -1,26 +1,49 @@
-from typing import List, Optional
+from typing import Any, List, Optional
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException, status
 
+from src.core.singleflight import SingleFlight, normalize_key
 from src.services.base_service import BaseService
 from src.models.review import LocationCategoryReview
 from src.repositories.recomendation import RecommendationRepository, LocationCategoryRepository
-from src.schemas.recomendation import ExplorationRecommendation
+from src.schemas.recomendation import ExplorationRecommendation, LeasedRecommendation
 
 
 class RecommendationService(BaseService[LocationCategoryReview]):
-    def __init__(self):
-        super().__init__(RecommendationRepository)
+    # shared by every instance, so concurrent identical reads run one query
+    _flight = SingleFlight()
+
+    def __init__(self, repository: Any = RecommendationRepository):
+        super().__init__(repository)
 
     async def get_exploration_recommendations(
         self,
         session: AsyncSession,
-        limit: int = 10
+        limit: int = 10,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        radius_km: float = 1.0
     ) -> List[ExplorationRecommendation]:
         """Get exploration recommendations based on review history"""
         try:
+            if latitude is not None and longitude is not None:
+                # ordered by distance, so concurrent callers can share one
+                # query; the results are pydantic rows, not session-bound
+                recommendations = await self._flight.do(
+                    normalize_key("exploration", limit, latitude, longitude, radius_km),
+                    lambda: self.repository.get_nearby_exploration_recommendations(
+                        db=session,
+                        latitude=latitude,
+                        longitude=longitude,
+                        radius_km=radius_km,
+                        limit=limit
+                    )
+                )
+                return list(recommendations)
+            # not coalesced, ties are broken by random() so each reviewer
+            # gets their own sample of the stale pairs
             return await self.repository.get_exploration_recommendations(
                 db=session,
                 limit=limit
@@ -33,6 +56,55 @@ class RecommendationService(BaseService[LocationCategoryReview]):
                 detail=f"Error getting recommendations: {str(e)}"
             )
 
+    async def lease_exploration_recommendations(
+        self,
+        session: AsyncSession,
+        leased_by: str,
+        limit: int = 10,
+        lease_seconds: float = 900
+    ) -> List[LeasedRecommendation]:
+        """Claim stale pairs so concurrent reviewers never get the same ones"""
+        try:
+            return await self.repository.lease_exploration_recommendations(
+                db=session,
+                leased_by=leased_by,
+                limit=limit,
+                lease_seconds=lease_seconds
+            )
+        except HTTPException as http_ex:
+            raise http_ex
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error leasing recommendations: {str(e)}"
+            )
+
+    async def release_lease(
+        self,
+        session: AsyncSession,
+        lease_id: int,
+        leased_by: str
+    ) -> None:
+        """Give a leased pair back before its lease expires"""
+        try:
+            released = await self.repository.release_lease(
+                db=session,
+                lease_id=lease_id,
+                leased_by=leased_by
+            )
+        except HTTPException as http_ex:
+            raise http_ex
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error releasing lease: {str(e)}"
+            )
+        if not released:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Lease not found or already expired"
+            )
+
     async def record_review(
         self,
         session: AsyncSession,
@@ -55,8 +127,8 @@ class RecommendationService(BaseService[LocationCategoryReview]):
             )
 
 class LocationCategoryService(BaseService[LocationCategoryReview]):
-    def __init__(self):
-        super().__init__(LocationCategoryRepository)
+    def __init__(self, repository: Any = LocationCategoryRepository):
+        super().__init__(repository)
 
     async def create_category_relationship(
         self,
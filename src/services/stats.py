@@ -0,0 +1,56 @@
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.core.coverage import CoverageCounters, coverage_counters
+from src.repositories.category import CategoryRepository
+from src.repositories.memory import resolve_repository
+from src.repositories.recomendation import LocationCategoryRepository
+from src.schemas.stats import CategoryCoverage, CoverageResponse
+from src.services.category_catalog import CategoryCatalog, category_catalog
+
+
+class StatsService:
+    """
+    Served from in-process counters, the database is only read when the
+    counters were never loaded or a write was notified since (see
+    CoverageCounters for the invalidation and the reconciliation).
+    """
+    def __init__(
+        self,
+        counters: CoverageCounters = coverage_counters,
+        catalog: CategoryCatalog = category_catalog,
+        repository: Optional[LocationCategoryRepository] = None,
+        category_repository: Optional[CategoryRepository] = None
+    ):
+        self.counters = counters
+        self.catalog = catalog
+        self.repository = repository or resolve_repository(LocationCategoryRepository)()
+        self.category_repository = (
+            category_repository or resolve_repository(CategoryRepository)()
+        )
+
+    async def get_coverage(self, session: AsyncSession) -> CoverageResponse:
+        try:
+            await self.counters.ensure_loaded(self.repository, session)
+            await self.catalog.ensure_fresh(self.category_repository, session)
+        except SQLAlchemyError as e:
+            raise Exception(f"Error loading coverage counters: {str(e)}")
+
+        categories = []
+        for category_id, (never_reviewed, stale, fresh) in self.counters.snapshot().items():
+            category = self.catalog.get(category_id)
+            categories.append(CategoryCoverage(
+                category_id=category_id,
+                category_name=category.name if category is not None else None,
+                never_reviewed=never_reviewed,
+                stale=stale,
+                fresh=fresh,
+                total=never_reviewed + stale + fresh
+            ))
+        categories.sort(key=lambda coverage: coverage.category_id)
+        return CoverageResponse(
+            categories=categories,
+            stale_after_days=self.counters.stale_after_days,
+            reconciled_at=self.counters.reconciled_at
+        )
@@ -0,0 +1,122 @@
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from src.core.cache import MISSING, TTLCache
+from src.core.config import get_settings
+from src.core.invalidation import invalidation_bus
+from src.core.singleflight import SingleFlight
+from src.core.tiles import TILES_TOPIC, pack_tile, tiles_for_point
+from src.repositories.location import LocationRepository
+from src.repositories.memory import resolve_repository
+
+settings = get_settings()
+
+
+class TileCache(TTLCache):
+    """
+    TTLCache that knows which tiles are being rendered. ``pop`` and
+    ``clear`` bump a generation, and a render caches its tile only if the
+    generation did not move while it ran: a render whose query ran before
+    an insert would otherwise put back the tile the insert evicted.
+    Generations are only kept for tiles with a render in flight.
+    """
+    def __init__(self, max_entries: int, ttl_seconds: Optional[float] = None):
+        super().__init__(max_entries, ttl_seconds)
+        self._rendering: Dict[Hashable, int] = {}
+        self._generations: Dict[Hashable, int] = {}
+        self._epoch = 0
+
+    def render_started(self, key: Hashable) -> Tuple[int, int]:
+        self._rendering[key] = self._rendering.get(key, 0) + 1
+        return self._epoch, self._generations.get(key, 0)
+
+    def render_finished(self, key: Hashable, started: Tuple[int, int], tile: Optional[bytes]) -> None:
+        """Cache ``tile`` unless it was evicted since ``started``, None caches nothing"""
+        if tile is not None and started == (self._epoch, self._generations.get(key, 0)):
+            self.set(key, tile)
+        if self._rendering[key] > 1:
+            self._rendering[key] -= 1
+        else:
+            del self._rendering[key]
+            self._generations.pop(key, None)
+
+    def pop(self, key: Hashable) -> None:
+        if key in self._rendering:
+            self._generations[key] = self._generations.get(key, 0) + 1
+        super().pop(key)
+
+    def clear(self) -> None:
+        self._epoch += 1
+        super().clear()
+
+
+# Keyed by pack_tile(z, x, y). Inserts evict the tiles they land on, the TTL
+# bounds staleness for writes that do not publish tile keys (updates, deletes).
+tile_cache = TileCache(
+    max_entries=settings.TILE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.TILE_CACHE_TTL_SECONDS
+)
+
+
+class TileService:
+    # shared by every instance, a cold tile is rendered once
+    _flight = SingleFlight()
+
+    def __init__(
+        self,
+        cache: TileCache = tile_cache,
+        location_repository: Optional[LocationRepository] = None
+    ):
+        self.location_repository = (
+            location_repository or resolve_repository(LocationRepository)()
+        )
+        self.cache = cache
+
+    async def get_tile(
+        self,
+        session: AsyncSession,
+        z: int,
+        x: int,
+        y: int
+    ) -> bytes:
+        key = pack_tile(z, x, y)
+        tile = self.cache.get(key)
+        if tile is not MISSING:
+            return tile
+
+        try:
+            return await self._flight.do(key, lambda: self._render(session, key, z, x, y))
+        except SQLAlchemyError as e:
+            raise Exception(f"Error rendering tile {z}/{x}/{y}: {str(e)}")
+
+    async def _render(self, session: AsyncSession, key: int, z: int, x: int, y: int) -> bytes:
+        # the generation is taken by the render itself, not by the callers
+        # joining the flight, since the tile reflects the rows it queried
+        started = self.cache.render_started(key)
+        tile = None
+        try:
+            tile = await self.location_repository.get_tile(session=session, z=z, x=x, y=y)
+        finally:
+            self.cache.render_finished(key, started, tile)
+        return tile
+
+
+def evict_tiles(cache: TileCache, tile_keys: Iterable[int]) -> None:
+    for key in tile_keys:
+        cache.pop(key)
+
+
+def evict_point(cache: TileCache, longitude: float, latitude: float) -> None:
+    """Drop every cached tile that draws the point, at each zoom"""
+    evict_tiles(
+        cache,
+        (pack_tile(*tile) for tile in tiles_for_point(longitude, latitude, settings.TILE_MAX_ZOOM))
+    )
+
+
+# inserts on other workers arrive through the bus
+invalidation_bus.register(
+    TILES_TOPIC,
+    lambda tile_keys: evict_tiles(tile_cache, tile_keys),
+    resync=tile_cache.clear
+)
@@ -0,0 +1,57 @@
+from contextlib import contextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.core.config import get_settings
+from src.core.coverage import coverage_counters
+from src.core.query_budget import QueryStats, track_queries
+from src.repositories.memory import memory_store
+from src.services.category_catalog import category_catalog
+
+
+@pytest.fixture
+def memory_client(monkeypatch):
+    """The app on the in-memory backend, without rate limits between tests"""
+    monkeypatch.setattr(get_settings(), "REPOSITORY_BACKEND", "memory")
+    monkeypatch.setattr(get_settings(), "RATE_LIMIT_ENABLED", False)
+    memory_store.reset()
+    category_catalog.invalidate()
+    coverage_counters.reset()
+    from main import app
+    with TestClient(app) as client:
+        yield client
+    app.dependency_overrides.clear()
+    memory_store.reset()
+    category_catalog.invalidate()
+    coverage_counters.reset()
+
+
+class QueryBudget:
+    """
+    ``with query_budget(3): ...`` fails the test when the block runs more
+    than 3 statements, ``query_budget.check(response, 3)`` does the same for
+    a response of the app through its X-Query-Count header
+    """
+    @contextmanager
+    def __call__(self, max_queries: int):
+        with track_queries() as stats:
+            yield stats
+        assert stats.count <= max_queries, self._describe(stats, max_queries)
+
+    def check(self, response, max_queries: int) -> int:
+        count = int(response.headers["x-query-count"])
+        assert count <= max_queries, f"{count} queries, the budget is {max_queries}"
+        return count
+
+    @staticmethod
+    def _describe(stats: QueryStats, max_queries: int) -> str:
+        repeated = "".join(
+            f"\n  {count}x {statement}" for statement, count in stats.repeated(2)
+        )
+        return f"{stats.count} queries, the budget is {max_queries}{repeated}"
+
+
+@pytest.fixture
+def query_budget():
+    return QueryBudget()
@@ -0,0 +1,156 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api import dependencies
+from src.core import database
+from src.core.admission import AdmissionControlMiddleware, AdmissionController, UNMATCHED_ROUTE
+from src.core.database import AdmittedSession, get_db
+
+
+@pytest.fixture
+def controller():
+    return AdmissionController(
+        max_in_flight=2,
+        max_in_flight_per_route=1,
+        max_pool_wait_ms=100,
+        retry_after_seconds=3
+    )
+
+
+@pytest.fixture
+def client(controller):
+    app = FastAPI()
+    app.add_middleware(AdmissionControlMiddleware, controller=controller)
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        return {"id": item_id}
+
+    @app.get("/ready")
+    async def ready():
+        return {"status": "ready"}
+
+    return TestClient(app)
+
+
+def test_admits_until_route_limit(controller):
+    assert controller.try_admit("/a") is None
+    assert controller.try_admit("/a") == "route_in_flight"
+    assert controller.try_admit("/b") is None
+    assert controller.try_admit("/c") == "in_flight"
+
+    controller.release("/a")
+
+    assert controller.try_admit("/a") is None
+    assert controller.snapshot()["shed_by_reason"] == {"route_in_flight": 1, "in_flight": 1}
+
+
+def test_sheds_on_pool_wait(controller):
+    for _ in range(20):
+        controller.record_pool_wait(0.5)
+
+    assert controller.try_admit("/a") == "pool_wait"
+    assert controller.snapshot()["shed_total"] == 1
+
+
+def test_pool_wait_decays_without_samples(controller):
+    controller.pool_wait_decay_seconds = 1e-9
+    for _ in range(20):
+        controller.record_pool_wait(0.5)
+
+    assert controller.try_admit("/a") is None
+
+
+def test_middleware_rejects_with_retry_after(client, controller):
+    for _ in range(20):
+        controller.record_pool_wait(0.5)
+
+    response = client.get("/items/1")
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "3"
+    assert response.json()["reason"] == "pool_wait"
+    assert controller.snapshot()["shed_by_route"] == {"/items/{item_id}": 1}
+
+
+def test_middleware_releases_after_response(client, controller):
+    assert client.get("/items/1").status_code == 200
+    assert client.get("/items/2").status_code == 200
+    assert controller.in_flight == 0
+
+
+def test_unmatched_paths_share_one_route(client, controller):
+    for _ in range(20):
+        controller.record_pool_wait(0.5)
+
+    for path in ("/scan/a", "/scan/b", "/scan/c"):
+        assert client.get(path).status_code == 503
+
+    assert controller.snapshot()["shed_by_route"] == {UNMATCHED_ROUTE: 3}
+
+
+def test_in_flight_routes_are_dropped_when_idle(controller):
+    assert controller.try_admit("/a") is None
+    controller.release("/a")
+
+    assert controller.in_flight_by_route == {}
+
+
+def test_exempt_paths_are_never_shed(client, controller):
+    for _ in range(20):
+        controller.record_pool_wait(0.5)
+
+    assert client.get("/ready").status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_session_checks_out_on_the_first_statement(monkeypatch):
+    connection = AsyncMock()
+    monkeypatch.setattr(AsyncSession, "connection", connection)
+    monkeypatch.setattr(AsyncSession, "execute", AsyncMock())
+    session = AdmittedSession(bind=database.engine)
+
+    # a request answered from a cache opens a session and never uses it
+    assert connection.await_count == 0
+
+    await session.execute(text("SELECT 1"))
+    await session.execute(text("SELECT 1"))
+    assert connection.await_count == 1
+
+    # the commit returns the connection, the next statement checks out again
+    await session.commit()
+    await session.execute(text("SELECT 1"))
+    assert connection.await_count == 2
+    await session.close()
+
+
+def test_pool_timeout_on_the_first_statement_is_503(monkeypatch, controller):
+    monkeypatch.setattr(database, "admission_controller", controller)
+    monkeypatch.setattr(AsyncSession, "connection", AsyncMock(side_effect=PoolTimeoutError("pool")))
+    app = FastAPI()
+
+    @app.get("/wrapped")
+    async def wrapped(session=Depends(get_db)):
+        try:
+            await session.execute(text("SELECT 1"))
+        except Exception as e:
+            # like the services, which wrap what the repositories raise
+            raise Exception(f"Error: {e}")
+
+    response = TestClient(app).get("/wrapped")
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "3"
+    assert controller.snapshot()["shed_by_reason"] == {"pool_timeout": 1}
+
+
+def test_admission_metrics_require_an_api_key(memory_client, monkeypatch):
+    monkeypatch.setattr(dependencies.settings, "ENVIRONMENT", "production")
+
+    assert memory_client.get("/metrics/admission").status_code == 403
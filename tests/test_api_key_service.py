@@ -0,0 +1,123 @@
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src import manage
+from src.core.cache import TTLCache
+from src.core.config import get_settings
+from src.repositories.memory import MemorySession, memory_store
+from src.services.api_key import ApiKeyService, hash_api_key
+
+# Mock model
+class MockApiKey:
+    def __init__(self, id=None, name=None, key_hash=None):
+        self.id = id
+        self.name = name
+        self.key_hash = key_hash
+
+# Mock repository
+class MockApiKeyRepository:
+    async def get_active_by_hash(self, db, key_hash):
+        pass
+
+    async def create(self, session, obj_in):
+        pass
+
+    async def revoke(self, db, id):
+        pass
+
+@pytest.fixture
+def mock_repository():
+    repository = MockApiKeyRepository()
+    for method in ['get_active_by_hash', 'create', 'revoke']:
+        setattr(repository, method, AsyncMock())
+    return repository
+
+@pytest.fixture
+def api_key_service(mock_repository):
+    service = ApiKeyService(cache=TTLCache(max_entries=100, ttl_seconds=60))
+    service.repository = mock_repository
+    return service
+
+@pytest.fixture
+def mock_session():
+    return AsyncMock(spec=AsyncSession)
+
+@pytest.fixture
+def sample_api_key():
+    return MockApiKey(id=1, name="integrator", key_hash=hash_api_key("secret"))
+
+
+@pytest.mark.asyncio
+async def test_verify_caches_valid_key(api_key_service, mock_session, sample_api_key):
+    api_key_service.repository.get_active_by_hash.return_value = sample_api_key
+
+    first = await api_key_service.verify(mock_session, "secret")
+    second = await api_key_service.verify(mock_session, "secret")
+
+    assert first.id == 1
+    assert second == first
+    api_key_service.repository.get_active_by_hash.assert_called_once_with(
+        db=mock_session,
+        key_hash=hash_api_key("secret")
+    )
+
+@pytest.mark.asyncio
+async def test_verify_caches_unknown_key(api_key_service, mock_session):
+    api_key_service.repository.get_active_by_hash.return_value = None
+
+    assert await api_key_service.verify(mock_session, "unknown") is None
+    assert await api_key_service.verify(mock_session, "unknown") is None
+    api_key_service.repository.get_active_by_hash.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_revoke_evicts_cached_key(api_key_service, mock_session, sample_api_key):
+    api_key_service.repository.get_active_by_hash.return_value = sample_api_key
+    api_key_service.repository.revoke.return_value = sample_api_key
+    await api_key_service.verify(mock_session, "secret")
+
+    await api_key_service.revoke_key(mock_session, api_key_id=1)
+    api_key_service.repository.get_active_by_hash.return_value = None
+
+    assert await api_key_service.verify(mock_session, "secret") is None
+
+@pytest.mark.asyncio
+async def test_create_key_stores_only_the_hash(api_key_service, mock_session, sample_api_key):
+    api_key_service.repository.create.return_value = sample_api_key
+
+    plaintext, _ = await api_key_service.create_key(mock_session, name="integrator")
+
+    obj_in = api_key_service.repository.create.call_args.kwargs["obj_in"]
+    assert obj_in == {"name": "integrator", "key_hash": hash_api_key(plaintext)}
+
+@pytest.mark.asyncio
+async def test_cache_never_holds_plaintext_keys(api_key_service, mock_session, sample_api_key):
+    api_key_service.repository.get_active_by_hash.return_value = sample_api_key
+    await api_key_service.verify(mock_session, "secret")
+    api_key_service.repository.get_active_by_hash.return_value = None
+    await api_key_service.verify(mock_session, "probe")
+
+    keys = {key for key, _ in api_key_service.cache.items()}
+    assert keys == {hash_api_key("secret"), hash_api_key("probe")}
+
+def test_manage_commands_create_and_revoke_keys(monkeypatch, capsys):
+    monkeypatch.setattr(get_settings(), "REPOSITORY_BACKEND", "memory")
+    memory_store.reset()
+
+    @asynccontextmanager
+    async def session_factory():
+        yield MemorySession()
+
+    assert manage.main(["create-api-key", "integrator"], session_factory) == 0
+    plaintext = capsys.readouterr().out.splitlines()[-1]
+    service = ApiKeyService(cache=TTLCache(max_entries=10, ttl_seconds=60))
+    principal = asyncio.run(service.verify(MemorySession(), plaintext))
+    assert principal.name == "integrator"
+
+    assert manage.main(["revoke-api-key", str(principal.id)], session_factory) == 0
+    assert manage.main(["revoke-api-key", "999"], session_factory) == 1
+    service.cache.clear()
+    assert asyncio.run(service.verify(MemorySession(), plaintext)) is None
+    memory_store.reset()
@@ -0,0 +1,45 @@
+import pytest
+
+
+def test_locations_by_ids_report_missing_ids(memory_client):
+    category = memory_client.post("/api/v1/categories/", json={"name": "Parks"}).json()
+    ids = [
+        memory_client.post(
+            "/api/v1/locations/",
+            params={"name": name, "latitude": 4.61, "longitude": -74.08, "category": category["id"]}
+        ).json()["id"]
+        for name in ["A", "B"]
+    ]
+
+    response = memory_client.get("/api/v1/locations/batch", params={"ids": f"{ids[1]},999,{ids[0]},{ids[1]}"})
+
+    assert response.status_code == 200
+    assert [location["name"] for location in response.json()["items"]] == ["B", "A"]
+    assert response.json()["missing"] == [999]
+
+def test_categories_by_ids(memory_client):
+    category = memory_client.post("/api/v1/categories/", json={"name": "Parks"}).json()
+
+    response = memory_client.get("/api/v1/categories/batch", params={"ids": f"{category['id']},42"})
+
+    assert response.status_code == 200
+    assert [c["name"] for c in response.json()["items"]] == ["Parks"]
+    assert response.json()["missing"] == [42]
+
+@pytest.mark.parametrize("ids", ["", "1,a", ",".join(str(i) for i in range(101))])
+def test_invalid_ids_are_rejected(memory_client, ids):
+    assert memory_client.get("/api/v1/locations/batch", params={"ids": ids}).status_code == 422
+
+def test_collection_urls_without_slash_still_reach_list_and_create(memory_client):
+    category = memory_client.post("/api/v1/categories", json={"name": "Parks"})
+    assert category.status_code == 201
+
+    listing = memory_client.get("/api/v1/categories")
+    assert listing.status_code == 200
+    assert [c["name"] for c in listing.json()] == ["Parks"]
+
+    created = memory_client.post(
+        "/api/v1/locations",
+        params={"name": "A", "latitude": 4.61, "longitude": -74.08, "category": category.json()["id"]}
+    )
+    assert created.status_code == 201
@@ -0,0 +1,155 @@
+import asyncio
+from unittest.mock import AsyncMock
+import pytest
+
+from src.core.batching import BatchLoader
+from src.core.exceptions import NotFoundException
+from src.repositories.category import CategoryRepository
+
+# Mock model
+class MockCategory:
+    def __init__(self, id):
+        self.id = id
+
+class MockResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+class MockSession:
+    """Only what the loader needs: info and execute"""
+    def __init__(self, existing_ids):
+        self.info = {}
+        self.existing_ids = existing_ids
+        self.execute = AsyncMock(side_effect=self._execute)
+
+    async def _execute(self, statement, params):
+        return MockResult([MockCategory(id) for id in params["ids"] if id in self.existing_ids])
+
+
+@pytest.mark.asyncio
+async def test_loads_in_the_same_tick_share_one_batch():
+    batch_fn = AsyncMock(side_effect=lambda keys: {key: key * 10 for key in keys})
+    loader = BatchLoader(batch_fn)
+
+    assert await asyncio.gather(loader.load(1), loader.load(2), loader.load(1)) == [10, 20, 10]
+    assert await loader.load(2) == 20
+
+    batch_fn.assert_called_once_with([1, 2])
+
+@pytest.mark.asyncio
+async def test_batches_are_split_by_max_size():
+    batch_fn = AsyncMock(side_effect=lambda keys: {key: key for key in keys})
+    loader = BatchLoader(batch_fn, max_batch_size=2)
+
+    assert await loader.load_many([1, 2, 3]) == [1, 2, 3]
+    assert [call.args[0] for call in batch_fn.call_args_list] == [[1, 2], [3]]
+
+@pytest.mark.asyncio
+async def test_failures_are_not_memoized():
+    batch_fn = AsyncMock(side_effect=[RuntimeError("boom"), {1: "ok"}])
+    loader = BatchLoader(batch_fn)
+
+    with pytest.raises(RuntimeError):
+        await loader.load(1)
+    assert await loader.load(1) == "ok"
+
+@pytest.mark.asyncio
+async def test_repository_get_runs_one_query_per_tick():
+    session = MockSession(existing_ids={1, 2})
+    repository = CategoryRepository()
+
+    first, second = await asyncio.gather(repository.get(session, 1), repository.get(session, 2))
+    again = await repository.get(session, 1)
+
+    assert (first.id, second.id) == (1, 2)
+    assert again is first
+    session.execute.assert_called_once()
+    assert session.execute.call_args.args[1] == {"ids": [1, 2]}
+
+@pytest.mark.asyncio
+async def test_repository_get_raises_for_missing_ids():
+    session = MockSession(existing_ids=set())
+
+    with pytest.raises(NotFoundException):
+        await CategoryRepository().get(session, 5)
+
+@pytest.mark.asyncio
+async def test_repository_get_many_skips_missing_ids():
+    session = MockSession(existing_ids={1, 3})
+
+    found = await CategoryRepository().get_many(session, [1, 2, 3])
+
+    assert sorted(found) == [1, 3]
+    session.execute.assert_called_once()
+
+class SerialSession(MockSession):
+    """Fails like AsyncSession when a second execute starts before the first ends"""
+    def __init__(self, existing_ids):
+        super().__init__(existing_ids)
+        self.executing = False
+
+    async def _execute(self, statement, params):
+        assert not self.executing, "concurrent operations on one session"
+        self.executing = True
+        await asyncio.sleep(0.001)
+        self.executing = False
+        return await super()._execute(statement, params)
+
+@pytest.mark.asyncio
+async def test_get_many_over_the_batch_size_runs_chunks_one_after_another():
+    session = SerialSession(existing_ids=set(range(1, 251)))
+
+    found = await CategoryRepository().get_many(session, list(range(1, 251)))
+
+    assert sorted(found) == list(range(1, 251))
+    assert [len(call.args[1]["ids"]) for call in session.execute.call_args_list] == [100, 100, 50]
+
+@pytest.mark.asyncio
+async def test_dispatches_of_later_ticks_wait_for_the_running_batch():
+    session = SerialSession(existing_ids={1, 2})
+    repository = CategoryRepository()
+
+    first = asyncio.ensure_future(repository.get(session, 1))
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    second = await repository.get(session, 2)
+
+    assert (await first).id == 1
+    assert second.id == 2
+    assert session.execute.call_count == 2
+
+@pytest.mark.asyncio
+async def test_prime_resolves_a_load_already_queued():
+    batch_fn = AsyncMock(side_effect=lambda keys: {key: "queried" for key in keys})
+    loader = BatchLoader(batch_fn)
+
+    load = asyncio.ensure_future(loader.load(1))
+    await asyncio.sleep(0)
+    loader.prime(1, "primed")
+
+    assert await asyncio.wait_for(load, timeout=1) == "primed"
+    assert await loader.load(1) == "primed"
+    batch_fn.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_prime_while_the_batch_runs_wins_over_its_result():
+    started = asyncio.Event()
+
+    async def batch_fn(keys):
+        started.set()
+        await asyncio.sleep(0.001)
+        return {key: "queried" for key in keys}
+
+    loader = BatchLoader(batch_fn)
+    load = asyncio.ensure_future(loader.load(1))
+    await started.wait()
+    loader.prime(1, "primed")
+
+    assert await asyncio.wait_for(load, timeout=1) == "primed"
+    assert await loader.load(1) == "primed"
@@ -0,0 +1,33 @@
+import json
+
+from benchmarks import micro
+from benchmarks.micro import Result, cases, regressions
+
+
+def test_every_case_runs():
+    for case in cases():
+        case.fn()
+
+def test_baselines_cover_every_case():
+    baselines = micro.load_baselines()
+
+    assert {case.name for case in cases()} <= set(baselines)
+
+def test_only_slowdowns_beyond_tolerance_are_flagged():
+    results = [
+        Result(name="steady", us=1.0, ratio=1.1),
+        Result(name="slower", us=1.0, ratio=1.5),
+        Result(name="new", us=1.0, ratio=9.0),
+    ]
+
+    regressed = regressions(results, {"steady": 1.0, "slower": 1.0}, tolerance=0.3)
+
+    assert [result.name for result in regressed] == ["slower"]
+    assert results[2].change is None
+
+def test_update_round_trips(tmp_path):
+    path = tmp_path / "baselines.json"
+    micro.save_baselines([Result(name="case", us=2.0, ratio=1.23456)], path)
+
+    assert micro.load_baselines(path) == {"case": 1.2346}
+    assert "unit" in json.loads(path.read_text())
@@ -0,0 +1,33 @@
+from unittest.mock import patch
+
+from src.core.cache import MISSING, TTLCache
+
+
+def test_get_returns_missing_for_unknown_key():
+    cache = TTLCache(max_entries=2)
+
+    assert cache.get("a") is MISSING
+    assert cache.get("a", None) is None
+
+
+def test_entries_expire_after_ttl():
+    cache = TTLCache(max_entries=2, ttl_seconds=10)
+    with patch("src.core.cache.time.monotonic", return_value=100.0):
+        cache.set("a", 1)
+        cache.set("b", 2, ttl_seconds=1)
+    with patch("src.core.cache.time.monotonic", return_value=105.0):
+        assert cache.get("a") == 1
+        assert cache.get("b") is MISSING
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
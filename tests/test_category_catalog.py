@@ -0,0 +1,110 @@
+from unittest.mock import AsyncMock, Mock
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.services.category import CategoryService
+from src.services.category_catalog import CategoryCatalog
+
+# Mock model
+class MockCategory:
+    def __init__(self, id=None, name=None, is_active=True):
+        self.id = id
+        self.name = name
+        self.is_active = is_active
+
+# Mock repository
+class MockCategoryRepository:
+    async def get_all(self, db):
+        pass
+
+    async def get_catalog_version(self, db):
+        pass
+
+    async def get_by_name(self, db, name):
+        pass
+
+    async def get(self, db, id):
+        pass
+
+    async def create(self, session, obj_in):
+        pass
+
+@pytest.fixture
+def sample_categories():
+    return [
+        MockCategory(id=1, name="Restaurants"),
+        MockCategory(id=2, name="Parks"),
+        MockCategory(id=3, name="Closed", is_active=False),
+    ]
+
+@pytest.fixture
+def mock_repository(sample_categories):
+    repository = MockCategoryRepository()
+    for method in ['get_all', 'get_catalog_version', 'get_by_name', 'get', 'create']:
+        setattr(repository, method, AsyncMock())
+    repository.get_all.return_value = sample_categories
+    repository.get_catalog_version.return_value = (3, "v1")
+    return repository
+
+@pytest.fixture
+def catalog():
+    return CategoryCatalog(refresh_interval_seconds=60)
+
+@pytest.fixture
+def category_service(mock_repository, catalog):
+    service = CategoryService(catalog=catalog)
+    service.repository = mock_repository
+    return service
+
+@pytest.fixture
+def mock_session():
+    session = AsyncMock(spec=AsyncSession)
+    session.expunge = Mock()
+    return session
+
+
+@pytest.mark.asyncio
+async def test_active_categories_are_served_from_memory(category_service, mock_session):
+    first = await category_service.get_active_categories(mock_session)
+    second = await category_service.get_active_categories(mock_session, skip=1, limit=1)
+
+    assert [c.name for c in first] == ["Restaurants", "Parks"]
+    assert [c.name for c in second] == ["Parks"]
+    category_service.repository.get_all.assert_called_once()
+    category_service.repository.get_catalog_version.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_lookup_by_id_and_name(category_service, mock_session):
+    assert (await category_service.get(mock_session, 3)).name == "Closed"
+    assert (await category_service.get_by_name(mock_session, "Parks")).id == 2
+    category_service.repository.get.assert_not_called()
+    category_service.repository.get_by_name.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_misses_fall_back_to_the_database(category_service, mock_session):
+    category_service.repository.get_by_name.return_value = None
+
+    assert await category_service.get_by_name(mock_session, "Closed") is None
+    category_service.repository.get_by_name.assert_called_once_with(db=mock_session, name="Closed")
+
+@pytest.mark.asyncio
+async def test_reload_only_when_version_changes(category_service, catalog, mock_session):
+    await category_service.get_active_categories(mock_session)
+
+    catalog.invalidate()
+    await category_service.get_active_categories(mock_session)
+    assert category_service.repository.get_all.call_count == 1
+
+    catalog.invalidate()
+    category_service.repository.get_catalog_version.return_value = (4, "v2")
+    await category_service.get_active_categories(mock_session)
+    assert category_service.repository.get_all.call_count == 2
+
+@pytest.mark.asyncio
+async def test_create_invalidates_catalog(category_service, catalog, mock_session):
+    await category_service.get_active_categories(mock_session)
+
+    await category_service.create_category(mock_session, name="Museums")
+    await category_service.get_active_categories(mock_session)
+
+    assert category_service.repository.get_catalog_version.call_count == 2
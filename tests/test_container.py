@@ -0,0 +1,23 @@
+from unittest.mock import Mock
+
+from src.api.dependencies import get_location_service, get_services
+from src.services.container import ServiceContainer
+from src.services.location import LocationService
+
+
+def test_repositories_are_shared_between_services():
+    services = ServiceContainer()
+
+    assert services.locations.location_repository is services.tiles.location_repository
+    assert services.locations.category_repository is services.location_categories.repository
+
+def test_dependencies_return_the_app_scoped_services():
+    services = ServiceContainer()
+    request = Mock()
+    request.app.state.services = services
+
+    first = get_location_service(get_services(request))
+    second = get_location_service(get_services(request))
+
+    assert isinstance(first, LocationService)
+    assert first is second is services.locations
@@ -0,0 +1,135 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+import pytest
+
+from src.core.coverage import COVERAGE_TOPIC, CoverageCounters, coverage_counters
+from src.core.invalidation import invalidation_bus
+
+NOW = datetime(2026, 1, 31, 12, 30, tzinfo=timezone.utc)
+
+@pytest.fixture
+def counters():
+    return CoverageCounters(stale_after_days=30, reconcile_interval_seconds=60)
+
+
+def test_writes_move_pairs_between_states(counters):
+    counters.pair_added(1)
+    counters.pair_added(1)
+    counters.pair_added(2, reviewed_at=NOW - timedelta(days=40))
+
+    counters.pair_reviewed(1, previous=None, reviewed_at=NOW)
+    counters.pair_reviewed(2, previous=NOW - timedelta(days=40), reviewed_at=NOW)
+
+    assert counters.snapshot(now=NOW) == {1: (1, 0, 1), 2: (0, 0, 1)}
+
+def test_pairs_turn_stale_as_time_passes(counters):
+    counters.pair_added(1, reviewed_at=NOW)
+
+    assert counters.snapshot(now=NOW + timedelta(days=29))[1] == (0, 0, 1)
+    assert counters.snapshot(now=NOW + timedelta(days=31))[1] == (0, 1, 0)
+
+def test_naive_utc_timestamps_share_the_aware_buckets(counters):
+    counters.pair_added(1, reviewed_at=NOW.replace(tzinfo=None))
+    counters.pair_reviewed(1, previous=NOW, reviewed_at=NOW)
+
+    assert counters.snapshot(now=NOW)[1] == (0, 0, 1)
+
+@pytest.mark.asyncio
+async def test_reconcile_replaces_the_counts_and_reports_drift(counters):
+    counters.pair_added(1)
+    counters.pair_added(1)
+    repository = AsyncMock()
+    repository.get_coverage_buckets.return_value = [
+        (1, None, 1),
+        (1, NOW - timedelta(days=60), 3),
+        (2, datetime.now(timezone.utc), 4),
+    ]
+
+    drift = await counters.reconcile(repository, session=None)
+
+    assert counters.loaded
+    assert counters.snapshot()[1] == (1, 3, 0)
+    assert counters.snapshot()[2] == (0, 0, 4)
+    # one never-reviewed pair too many, three stale and four fresh missing
+    assert drift == 8
+
+@pytest.mark.asyncio
+async def test_reads_only_hit_the_database_until_loaded(counters):
+    repository = AsyncMock()
+    repository.get_coverage_buckets.return_value = []
+
+    await counters.ensure_loaded(repository, session=None)
+    await counters.ensure_loaded(repository, session=None)
+
+    repository.get_coverage_buckets.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_workers_agree_after_a_write_is_notified(counters):
+    table = [(1, None, 2)]
+    repository = AsyncMock()
+    repository.get_coverage_buckets.side_effect = lambda session, floor: list(table)
+    other_worker = CoverageCounters(stale_after_days=30, reconcile_interval_seconds=60)
+    await counters.ensure_loaded(repository, session=None)
+    await other_worker.ensure_loaded(repository, session=None)
+
+    # this worker writes, the other one only learns about it from the bus
+    table = [(1, None, 3)]
+    counters.pair_added(1)
+    assert other_worker.snapshot()[1] == (2, 0, 0)
+
+    other_worker.invalidate()
+    await other_worker.ensure_loaded(repository, session=None)
+
+    assert other_worker.snapshot()[1] == counters.snapshot()[1] == (3, 0, 0)
+
+@pytest.mark.asyncio
+async def test_notification_during_a_reload_triggers_another(counters):
+    queried = asyncio.Event()
+    release = asyncio.Event()
+
+    async def get_coverage_buckets(session, floor):
+        queried.set()
+        await release.wait()
+        return []
+
+    repository = AsyncMock()
+    repository.get_coverage_buckets.side_effect = get_coverage_buckets
+    reload = asyncio.ensure_future(counters.ensure_loaded(repository, session=None))
+    await queried.wait()
+    counters.invalidate()
+    release.set()
+    await reload
+
+    assert not counters.current
+
+@pytest.mark.asyncio
+async def test_bus_notification_invalidates_the_counters(monkeypatch):
+    monkeypatch.setattr(coverage_counters, "reconciled_at", datetime.now(timezone.utc))
+    monkeypatch.setattr(coverage_counters, "_reconciled_generation", coverage_counters._generation)
+    assert coverage_counters.current
+
+    await invalidation_bus.dispatch(json.dumps({"table": COVERAGE_TOPIC, "ids": [1]}))
+
+    assert not coverage_counters.current
+
+def test_coverage_endpoint(memory_client):
+    parks = memory_client.post("/api/v1/categories/", json={"name": "Parks"}).json()
+    for name in ["A", "B"]:
+        memory_client.post(
+            "/api/v1/locations/",
+            params={"name": name, "latitude": 4.61, "longitude": -74.08, "category": parks["id"]}
+        )
+
+    coverage = memory_client.get("/api/v1/stats/coverage").json()
+
+    assert coverage["stale_after_days"] == 30
+    assert coverage["categories"] == [{
+        "category_id": parks["id"],
+        "category_name": "Parks",
+        "never_reviewed": 2,
+        "stale": 0,
+        "fresh": 0,
+        "total": 2
+    }]
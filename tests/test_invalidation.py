@@ -0,0 +1,111 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core import invalidation
+from src.core.invalidation import InvalidationBus
+
+
+class FakeConnection:
+    def __init__(self):
+        self.listeners = {}
+        self.termination_listeners = []
+        self.closed = False
+
+    def add_termination_listener(self, callback):
+        self.termination_listeners.append(callback)
+
+    async def add_listener(self, channel, callback):
+        self.listeners[channel] = callback
+
+    async def remove_listener(self, channel, callback):
+        self.listeners.pop(channel, None)
+
+    async def execute(self, query, timeout=None):
+        pass
+
+    def is_closed(self):
+        return self.closed
+
+    def notify(self, channel, payload):
+        self.listeners[channel](self, 1, channel, payload)
+
+    def terminate(self):
+        self.closed = True
+        for callback in self.termination_listeners:
+            callback(self)
+
+
+class FakePool:
+    def __init__(self):
+        self.connections = []
+        self.acquired = asyncio.Event()
+
+    async def acquire(self):
+        connection = FakeConnection()
+        self.connections.append(connection)
+        self.acquired.set()
+        return connection
+
+    async def release(self, connection):
+        pass
+
+
+@pytest.fixture
+def bus():
+    return InvalidationBus(reconnect_delay_seconds=0, health_check_seconds=60)
+
+
+@pytest.mark.asyncio
+async def test_publish_notifies_in_chunks(bus, monkeypatch):
+    monkeypatch.setattr(invalidation, "MAX_IDS_PER_NOTIFICATION", 2)
+    session = AsyncMock(spec=AsyncSession)
+
+    await bus.publish(session, "categories", [1, 2, 3])
+
+    assert session.execute.call_count == 2
+    payloads = [
+        call.args[0].compile().params["pg_notify_3"]
+        for call in session.execute.call_args_list
+    ]
+    assert [json.loads(p)["ids"] for p in payloads] == [[1, 2], [3]]
+
+
+@pytest.mark.asyncio
+async def test_dispatch_calls_handlers_for_the_table(bus):
+    categories, locations = Mock(), AsyncMock()
+    bus.register("categories", categories)
+    bus.register("locations", locations)
+
+    await bus.dispatch(json.dumps({"table": "categories", "ids": [7]}))
+    await bus.dispatch("not json")
+
+    categories.assert_called_once_with([7])
+    locations.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_listener_dispatches_and_resyncs_after_reconnect(bus):
+    handler, resync = Mock(), Mock()
+    bus.register("categories", handler, resync=resync)
+    pool = FakePool()
+
+    await bus.start(pool)
+    await pool.acquired.wait()
+    await asyncio.sleep(0)
+    pool.connections[0].notify(bus.channel, json.dumps({"table": "categories", "ids": [1]}))
+    await asyncio.sleep(0)
+    handler.assert_called_once_with([1])
+    resync.assert_not_called()
+
+    pool.acquired.clear()
+    pool.connections[0].terminate()
+    await pool.acquired.wait()
+    await asyncio.sleep(0)
+
+    resync.assert_called_once()
+    assert bus.reconnects == 1
+    await bus.stop()
@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.repositories.location import DETAIL_QUERY, NEARBY_QUERY, LocationRepository
+from src.schemas.location import LocationWithDistance
+
+class MockResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+def _location(id):
+    return SimpleNamespace(
+        id=id, name=f"Location {id}", description=None, latitude=4.61, longitude=-74.08,
+        created_at="2024-01-01T00:00:00Z", updated_at="2024-01-01T00:00:00Z",
+        categories=[{"id": 1, "name": "Parks"}]
+    )
+
+class RecordingSession:
+    """Compiles what the repository executes, as PostgreSQL would receive it"""
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return MockResult(self.rows)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("rows", [1, 50])
+async def test_nearby_with_categories_is_one_query_at_any_size(rows):
+    session = RecordingSession([_location(id) for id in range(rows)])
+
+    locations = await LocationRepository().get_nearby(session, latitude=4.61, longitude=-74.08)
+
+    [sql] = session.statements
+    # the categories come from a correlated aggregate of the same statement
+    assert sql.count("FROM locations") == 1
+    assert sql.count("JOIN location_category_reviews") == 1
+    assert "json_agg" in sql
+    assert "ST_DWithin(geography(locations.point), geography(" in sql
+    assert [c.name for c in LocationWithDistance.model_validate(locations[0], from_attributes=True).categories] == ["Parks"]
+
+def test_only_the_detail_query_overwrites_loaded_instances():
+    assert DETAIL_QUERY.get_execution_options().get("populate_existing") is True
+    assert not NEARBY_QUERY.get_execution_options().get("populate_existing")
+
+@pytest.mark.parametrize("statement", [NEARBY_QUERY, DETAIL_QUERY])
+def test_categories_are_aggregated_in_the_location_statement(statement):
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+
+    assert "json_agg" in sql
+    assert sql.count("FROM locations") == 1
+
+def test_unloaded_categories_serialize_as_empty():
+    location = _location(1)
+    location.categories = None
+
+    assert LocationWithDistance.model_validate(location, from_attributes=True).categories == []
+
+def test_location_detail_and_nearby_include_categories(memory_client):
+    parks = memory_client.post("/api/v1/categories/", json={"name": "Parks"}).json()
+    location = memory_client.post(
+        "/api/v1/locations/",
+        params={"name": "A", "latitude": 4.61, "longitude": -74.08, "category": parks["id"]}
+    ).json()
+
+    detail = memory_client.get(f"/api/v1/locations/{location['id']}")
+    nearby = memory_client.get("/api/v1/locations/nearby", params={"latitude": 4.61, "longitude": -74.08})
+
+    assert detail.json()["categories"] == [{"id": parks["id"], "name": "Parks"}]
+    assert nearby.json()[0]["categories"] == [{"id": parks["id"], "name": "Parks"}]
+    assert memory_client.get("/api/v1/locations/999").status_code == 404
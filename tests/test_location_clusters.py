@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.dependencies import get_bounding_box
+from src.repositories.location import (
+    CLUSTER_QUERY,
+    LocationRepository,
+    cluster_cell_size
+)
+from src.schemas.location import BoundingBox
+
+@pytest.fixture
+def bbox():
+    return BoundingBox(
+        min_longitude=-74.2,
+        min_latitude=4.5,
+        max_longitude=-73.9,
+        max_latitude=4.8
+    )
+
+def row(count, latitude, longitude, ids=None, names=None, latitudes=None, longitudes=None):
+    return SimpleNamespace(
+        count=count,
+        latitude=latitude,
+        longitude=longitude,
+        ids=ids,
+        names=names,
+        latitudes=latitudes,
+        longitudes=longitudes
+    )
+
+
+@pytest.mark.asyncio
+async def test_clusters_and_points_come_from_one_query(bbox):
+    session = AsyncMock(spec=AsyncSession)
+    session.execute.return_value = [
+        row(120, 4.6, -74.05),
+        row(2, 4.7, -74.1, ids=[1, 2], names=["A", "B"],
+            latitudes=[4.70, 4.71], longitudes=[-74.10, -74.11]),
+    ]
+
+    response = await LocationRepository().get_clusters(session, bbox=bbox, zoom=10)
+
+    session.execute.assert_called_once()
+    statement, params = session.execute.call_args.args
+    assert statement is CLUSTER_QUERY
+    assert params["min_longitude"] == -74.2
+    assert params["cell_size"] == cluster_cell_size(bbox, 10)
+    assert [c.count for c in response.clusters] == [120]
+    assert [(p.id, p.name) for p in response.points] == [(1, "A"), (2, "B")]
+
+def test_cell_size_shrinks_with_zoom_but_caps_the_grid(bbox):
+    assert cluster_cell_size(bbox, 10) < cluster_cell_size(bbox, 5)
+
+    world = BoundingBox(
+        min_longitude=-180,
+        min_latitude=-90,
+        max_longitude=180,
+        max_latitude=90
+    )
+    assert cluster_cell_size(world, 22) == 360 / 64
+
+def test_inverted_bounding_box_is_rejected():
+    with pytest.raises(HTTPException) as exc:
+        get_bounding_box(
+            min_longitude=-73.9,
+            min_latitude=4.5,
+            max_longitude=-74.2,
+            max_latitude=4.8
+        )
+    assert exc.value.status_code == 422
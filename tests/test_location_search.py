@@ -0,0 +1,71 @@
+from unittest.mock import AsyncMock
+import pytest
+
+from src.repositories.location import search_prefix
+from src.services.location import LocationService, search_cache
+
+@pytest.fixture(autouse=True)
+def clear_search_cache():
+    search_cache.clear()
+    yield
+    search_cache.clear()
+
+@pytest.fixture
+def service():
+    return LocationService(location_repository=AsyncMock(), category_repository=AsyncMock())
+
+
+def test_search_prefix_escapes_like_wildcards():
+    assert search_prefix("50%_off") == "50\\%\\_off%"
+
+@pytest.mark.asyncio
+async def test_short_queries_are_cached(service):
+    service.location_repository.search.return_value = ["Central Park"]
+
+    await service.search_locations(None, query="Ce", limit=10)
+    cached = await service.search_locations(None, query=" ce ", limit=10)
+
+    assert cached == ["Central Park"]
+    service.location_repository.search.assert_called_once()
+    assert service.location_repository.search.call_args.kwargs["query"] == "ce"
+
+@pytest.mark.asyncio
+async def test_long_and_biased_queries_are_not_cached(service):
+    service.location_repository.search.return_value = []
+
+    for _ in range(2):
+        await service.search_locations(None, query="central", limit=10)
+        await service.search_locations(None, query="ce", limit=10, latitude=4.6, longitude=-74.0)
+
+    assert service.location_repository.search.call_count == 4
+
+def test_search_ranks_prefix_then_fuzzy_then_distance(memory_client):
+    category = memory_client.post("/api/v1/categories/", json={"name": "Parks"}).json()
+    for name, latitude, longitude in [
+        ("Parque Central", 4.61, -74.08),
+        ("Central Park", 40.78, -73.96),
+        ("Centro Comercial", 4.70, -74.04),
+        ("Museo del Oro", 4.60, -74.07),
+    ]:
+        memory_client.post(
+            "/api/v1/locations/",
+            params={"name": name, "latitude": latitude, "longitude": longitude, "category": category["id"]}
+        )
+
+    prefix = memory_client.get("/api/v1/locations/search", params={"q": "centr"}).json()
+    fuzzy = memory_client.get("/api/v1/locations/search", params={"q": "centrall"}).json()
+    near = memory_client.get(
+        "/api/v1/locations/search",
+        params={"q": "central", "latitude": 4.61, "longitude": -74.08}
+    ).json()
+
+    assert {s["name"] for s in prefix[:2]} == {"Central Park", "Centro Comercial"}
+    assert "Museo del Oro" not in {s["name"] for s in prefix}
+    assert {s["name"] for s in fuzzy} >= {"Central Park", "Parque Central"}
+    assert near[0]["name"] == "Parque Central"
+    assert near[0]["distance_km"] == pytest.approx(0, abs=0.01)
+
+def test_search_requires_both_coordinates(memory_client):
+    response = memory_client.get("/api/v1/locations/search", params={"q": "ce", "latitude": 4.6})
+
+    assert response.status_code == 422
@@ -0,0 +1,87 @@
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.repositories.location import (
+    VIEWPORT_CATEGORY_QUERY,
+    VIEWPORT_QUERY,
+    LocationRepository
+)
+from src.schemas.location import BoundingBox
+from src.services.location import LocationService
+
+# Mock model
+class MockLocation:
+    def __init__(self, id):
+        self.id = id
+        self.name = f"Location {id}"
+        self.description = None
+        self.latitude = 4.6
+        self.longitude = -74.1
+        self.created_at = datetime.now(timezone.utc)
+        self.updated_at = self.created_at
+
+class MockResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+@pytest.fixture
+def bbox():
+    return BoundingBox(
+        min_longitude=-74.2,
+        min_latitude=4.5,
+        max_longitude=-73.9,
+        max_latitude=4.8
+    )
+
+@pytest.fixture
+def location_service():
+    service = LocationService()
+    service.location_repository = AsyncMock()
+    return service
+
+@pytest.fixture
+def mock_session():
+    return AsyncMock(spec=AsyncSession)
+
+
+@pytest.mark.asyncio
+async def test_full_page_returns_a_cursor(location_service, mock_session, bbox):
+    location_service.location_repository.get_in_viewport.return_value = [
+        MockLocation(id) for id in (3, 5, 8)
+    ]
+
+    page = await location_service.get_viewport_locations(mock_session, bbox, limit=2)
+
+    assert [l.id for l in page.items] == [3, 5]
+    assert page.next_after_id == 5
+    assert location_service.location_repository.get_in_viewport.call_args.kwargs["limit"] == 3
+
+@pytest.mark.asyncio
+async def test_last_page_has_no_cursor(location_service, mock_session, bbox):
+    location_service.location_repository.get_in_viewport.return_value = [MockLocation(9)]
+
+    page = await location_service.get_viewport_locations(mock_session, bbox, limit=2, after_id=8)
+
+    assert [l.id for l in page.items] == [9]
+    assert page.next_after_id is None
+
+@pytest.mark.asyncio
+async def test_category_filter_uses_its_own_statement(mock_session, bbox):
+    mock_session.execute.return_value = MockResult([])
+    repository = LocationRepository()
+
+    await repository.get_in_viewport(mock_session, bbox, limit=10)
+    await repository.get_in_viewport(mock_session, bbox, limit=10, category_id=4)
+
+    (plain, _), (filtered, params) = [c.args for c in mock_session.execute.call_args_list]
+    assert plain is VIEWPORT_QUERY
+    assert filtered is VIEWPORT_CATEGORY_QUERY
+    assert params["category_id"] == 4
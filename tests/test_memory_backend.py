@@ -0,0 +1,109 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from src.core.config import get_settings
+from src.repositories.location import LocationRepository
+from src.repositories.memory import (
+    MemoryCategoryRepository,
+    MemoryLocationRepository,
+    MemoryRecommendationRepository,
+    MemorySession,
+    memory_store,
+    resolve_repository
+)
+from src.services.category_catalog import category_catalog
+
+@pytest.fixture
+def memory_backend(monkeypatch):
+    monkeypatch.setattr(get_settings(), "REPOSITORY_BACKEND", "memory")
+    memory_store.reset()
+    category_catalog.invalidate()
+    yield memory_store
+    memory_store.reset()
+    category_catalog.invalidate()
+
+@pytest.fixture
+def client(memory_backend):
+    from main import app
+    with TestClient(app) as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+def test_backend_is_selected_by_settings(memory_backend, monkeypatch):
+    assert resolve_repository(LocationRepository) is MemoryLocationRepository
+    monkeypatch.setattr(get_settings(), "REPOSITORY_BACKEND", "postgres")
+    assert resolve_repository(LocationRepository) is LocationRepository
+
+def test_full_stack_without_a_database(client):
+    category = client.post("/api/v1/categories/", json={"name": "Parks"})
+    assert category.status_code == 201
+
+    for name, latitude, longitude in [("A", 4.61, -74.08), ("B", 4.62, -74.07)]:
+        response = client.post(
+            "/api/v1/locations/",
+            params={
+                "name": name,
+                "latitude": latitude,
+                "longitude": longitude,
+                "category": category.json()["id"]
+            }
+        )
+        assert response.status_code == 201
+
+    categories = client.get("/api/v1/categories/")
+    assert [c["name"] for c in categories.json()] == ["Parks"]
+
+    explore = client.get("/api/v1/recommendations/explore", params={"limit": 5})
+    assert {r["location_name"] for r in explore.json()} == {"A", "B"}
+
+    viewport = client.get(
+        "/api/v1/locations/viewport",
+        params={
+            "min_longitude": -74.1,
+            "min_latitude": 4.6,
+            "max_longitude": -74.075,
+            "max_latitude": 4.65,
+            "limit": 1
+        }
+    )
+    assert [l["name"] for l in viewport.json()["items"]] == ["A"]
+    assert viewport.json()["next_after_id"] is None
+
+@pytest.mark.asyncio
+async def test_nearby_search_radius_is_in_km(memory_backend):
+    repository = MemoryLocationRepository()
+    session = MemorySession()
+    # 0.005 and 0.01 degrees of latitude are about 0.56 and 1.11 km
+    near = await repository.create_with_coordinates(session, "near", 4.605, -74.0)
+    outside = await repository.create_with_coordinates(session, "just outside", 4.61, -74.0)
+    await repository.create_with_coordinates(session, "far", 40.0, 3.0)
+
+    found = await repository.get_nearby(session, 4.6, -74.0, radius_km=1.1, limit=10)
+    assert [location.id for location in found] == [near.id]
+
+    found = await repository.get_nearby(session, 4.6, -74.0, radius_km=1.12, limit=10)
+    assert [location.id for location in found] == [near.id, outside.id]
+
+@pytest.mark.asyncio
+async def test_leases_are_disjoint(memory_backend):
+    session = MemorySession()
+    locations = MemoryLocationRepository()
+    recommendations = MemoryRecommendationRepository()
+    category = await MemoryCategoryRepository().create(
+        session, obj_in={"name": "Museums"}
+    )
+    for index in range(3):
+        location = await locations.create_with_coordinates(session, f"L{index}", 4.6, -74.0)
+        await recommendations.create(
+            session,
+            obj_in={"location_id": location.id, "category_id": category.id}
+        )
+
+    first = await recommendations.lease_exploration_recommendations(session, "a", limit=2)
+    second = await recommendations.lease_exploration_recommendations(session, "b", limit=2)
+
+    assert len(first) == 2 and len(second) == 1
+    assert not {r.lease_id for r in first} & {r.lease_id for r in second}
+    assert await recommendations.release_lease(session, second[0].lease_id, "a") is False
+    assert await recommendations.release_lease(session, second[0].lease_id, "b") is True
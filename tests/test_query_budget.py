@@ -0,0 +1,90 @@
+import logging
+from unittest.mock import AsyncMock, MagicMock
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from src.core.query_budget import QueryBudgetMiddleware, install, track_queries
+from src.repositories.category import CategoryRepository
+
+engine = create_engine("sqlite://")
+install(engine)
+install(engine)
+
+
+def run(statement: str, times: int = 1, **params) -> None:
+    with engine.connect() as connection:
+        for _ in range(times):
+            connection.execute(text(statement), params)
+
+
+def make_app(expose_header: bool = True) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(QueryBudgetMiddleware, expose_header=expose_header)
+
+    @app.get("/loop")
+    async def loop():
+        run("SELECT 1")
+        run("SELECT :id", times=5, id=1)
+        return {}
+
+    return app
+
+
+def test_track_queries_counts_only_inside_the_block():
+    run("SELECT 1")
+    with track_queries() as stats:
+        run("SELECT 1", times=2)
+        with track_queries() as nested:
+            run("SELECT 2")
+        run("SELECT 3")
+
+    assert stats.count == 3
+    assert nested.count == 1
+    assert stats.repeated(2) == [("SELECT 1", 2)]
+
+def test_header_reports_the_count_and_n_plus_one_is_logged(caplog):
+    client = TestClient(make_app())
+
+    with caplog.at_level(logging.WARNING, logger="src.core.query_budget"):
+        response = client.get("/loop")
+
+    assert response.headers["x-query-count"] == "6"
+    assert "Possible N+1 in GET /loop, 5 times: SELECT ?" in caplog.text
+
+def test_header_is_hidden_when_disabled():
+    response = TestClient(make_app(expose_header=False)).get("/loop")
+
+    assert "x-query-count" not in response.headers
+
+def test_query_budget_fixture_fails_over_budget(query_budget):
+    with query_budget(2) as stats:
+        run("SELECT 1", times=2)
+    assert stats.count == 2
+
+    with pytest.raises(AssertionError, match="3 queries, the budget is 2"):
+        with query_budget(2):
+            run("SELECT 1", times=3)
+
+def test_memory_backend_endpoint_runs_no_sql(memory_client, query_budget):
+    response = memory_client.get("/api/v1/categories/")
+
+    assert response.status_code == 200
+    assert query_budget.check(response, 0) == 0
+
+@pytest.mark.asyncio
+async def test_bulk_create_does_not_refresh_each_row():
+    session = MagicMock()
+    session.flush = AsyncMock()
+    session.execute = AsyncMock()
+    session.commit = AsyncMock()
+    session.refresh = AsyncMock()
+
+    created = await CategoryRepository().bulk_create(
+        session,
+        [{"name": f"category {i}"} for i in range(3)]
+    )
+
+    assert len(created) == 3
+    session.refresh.assert_not_called()
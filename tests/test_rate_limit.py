@@ -0,0 +1,123 @@
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from src.api import dependencies
+from src.core.database import get_db
+from src.core.rate_limit import InMemoryRateLimiter, RateLimitPolicy
+
+POLICY = RateLimitPolicy(name="test", burst=2, per_minute=60)
+VALID_KEYS = {"integrator": 1, "other": 2}
+
+
+class FakeApiKeyService:
+    async def verify(self, session, api_key):
+        if api_key in VALID_KEYS:
+            return SimpleNamespace(id=VALID_KEYS[api_key])
+        return None
+
+
+async def no_db():
+    yield None
+
+
+@pytest.fixture
+def limiter():
+    return InMemoryRateLimiter()
+
+
+@pytest.fixture
+def client(limiter):
+    app = FastAPI()
+    app.state.services = SimpleNamespace(api_keys=FakeApiKeyService())
+    app.dependency_overrides[get_db] = no_db
+
+    @app.get("/limited", dependencies=[Depends(dependencies._rate_limit(POLICY))])
+    async def limited():
+        return {"ok": True}
+
+    with patch.object(dependencies, "get_rate_limiter", return_value=limiter):
+        yield TestClient(app)
+
+
+@pytest.mark.asyncio
+async def test_bucket_allows_burst_then_rejects(limiter):
+    first = await limiter.hit("key", POLICY)
+    second = await limiter.hit("key", POLICY)
+    third = await limiter.hit("key", POLICY)
+
+    assert (first.allowed, first.remaining) == (True, 1)
+    assert (second.allowed, second.remaining) == (True, 0)
+    assert not third.allowed
+    assert third.headers()["Retry-After"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_bucket_refills_over_time(limiter):
+    with patch("src.core.rate_limit.time.monotonic", return_value=100.0):
+        await limiter.hit("key", POLICY)
+        await limiter.hit("key", POLICY)
+    with patch("src.core.rate_limit.time.monotonic", return_value=101.5):
+        result = await limiter.hit("key", POLICY)
+
+    assert result.allowed
+    assert result.remaining == 0
+
+
+@pytest.mark.asyncio
+async def test_keys_have_separate_buckets(limiter):
+    await limiter.hit("a", POLICY)
+    await limiter.hit("a", POLICY)
+
+    assert (await limiter.hit("b", POLICY)).allowed
+
+
+@pytest.mark.asyncio
+async def test_full_limiter_evicts_the_least_recently_used_bucket():
+    limiter = InMemoryRateLimiter(max_keys=2)
+    await limiter.hit("heavy", POLICY)
+    await limiter.hit("idle", POLICY)
+    await limiter.hit("heavy", POLICY)
+
+    await limiter.hit("new", POLICY)
+
+    # heavy keeps its spent bucket, idle was evicted
+    assert not (await limiter.hit("heavy", POLICY)).allowed
+    assert (await limiter.hit("idle", POLICY)).remaining == 1
+
+
+@pytest.mark.asyncio
+async def test_hit_overhead_is_sub_millisecond(limiter):
+    hits = 10_000
+    started = time.perf_counter()
+    for i in range(hits):
+        await limiter.hit(f"key-{i % 100}", POLICY)
+
+    assert (time.perf_counter() - started) / hits < 0.001
+
+
+def test_dependency_sets_headers_and_returns_429(client):
+    headers = {"X-API-KEY": "integrator"}
+
+    ok = client.get("/limited", headers=headers)
+    client.get("/limited", headers=headers)
+    limited = client.get("/limited", headers=headers)
+
+    assert ok.status_code == 200
+    assert ok.headers["RateLimit-Limit"] == "2"
+    assert ok.headers["RateLimit-Remaining"] == "1"
+    assert limited.status_code == 429
+    assert "Retry-After" in limited.headers
+    assert client.get("/limited", headers={"X-API-KEY": "other"}).status_code == 200
+
+
+def test_unverified_keys_share_the_client_address_bucket(client):
+    client.get("/limited", headers={"X-API-KEY": "random-1"})
+    client.get("/limited", headers={"X-API-KEY": "random-2"})
+
+    assert client.get("/limited", headers={"X-API-KEY": "random-3"}).status_code == 429
+    assert client.get("/limited", headers={"X-API-KEY": "integrator"}).status_code == 200
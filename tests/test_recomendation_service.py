@@ -278,4 +278,75 @@ async def test_update_location_view_error(location_category_service, mock_sessio
             location_id=1
         )
     assert exc_info.value.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
-    assert "Error updating location view" in exc_info.value.detail
\ No newline at end of file
+    assert "Error updating location view" in exc_info.value.detail
+
+# Test exploration around a point
+@pytest.mark.asyncio
+async def test_get_exploration_recommendations_near_point(
+    recommendation_service,
+    mock_session,
+    sample_exploration_recommendations
+):
+    # Configure mock
+    recommendation_service.repository.get_nearby_exploration_recommendations = AsyncMock(
+        return_value=sample_exploration_recommendations
+    )
+
+    # Execute
+    result = await recommendation_service.get_exploration_recommendations(
+        session=mock_session,
+        limit=5,
+        latitude=4.61,
+        longitude=-74.08,
+        radius_km=2.0
+    )
+
+    # Assert
+    assert result == sample_exploration_recommendations
+    recommendation_service.repository.get_nearby_exploration_recommendations.assert_called_once_with(
+        db=mock_session,
+        latitude=4.61,
+        longitude=-74.08,
+        radius_km=2.0,
+        limit=5
+    )
+    recommendation_service.repository.get_exploration_recommendations.assert_not_called()
+
+# Test leasing recommendations
+@pytest.mark.asyncio
+async def test_lease_exploration_recommendations(recommendation_service, mock_session):
+    # Configure mock
+    recommendation_service.repository.lease_exploration_recommendations = AsyncMock(return_value=[])
+
+    # Execute
+    result = await recommendation_service.lease_exploration_recommendations(
+        session=mock_session,
+        leased_by="holder",
+        limit=3,
+        lease_seconds=60
+    )
+
+    # Assert
+    assert result == []
+    recommendation_service.repository.lease_exploration_recommendations.assert_called_once_with(
+        db=mock_session,
+        leased_by="holder",
+        limit=3,
+        lease_seconds=60
+    )
+
+# Test releasing a lease that is not held
+@pytest.mark.asyncio
+async def test_release_lease_not_held(recommendation_service, mock_session):
+    # Configure mock
+    recommendation_service.repository.release_lease = AsyncMock(return_value=False)
+
+    # Execute and Assert
+    with pytest.raises(HTTPException) as exc_info:
+        await recommendation_service.release_lease(
+            session=mock_session,
+            lease_id=7,
+            leased_by="someone-else"
+        )
+
+    assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
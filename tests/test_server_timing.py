@@ -0,0 +1,114 @@
+import re
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from src.core import server_timing
+from src.core.server_timing import (
+    ServerTiming,
+    ServerTimingMiddleware,
+    TimedRoute,
+    _current,
+    install,
+    timed
+)
+
+engine = create_engine("sqlite://")
+install(engine)
+
+
+def phases(response) -> dict:
+    header = response.headers["server-timing"]
+    return {
+        name: float(duration)
+        for name, duration in re.findall(r"([\w-]+);dur=([\d.]+)", header)
+    }
+
+
+def make_app(**options) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware, **options)
+    router = APIRouter(route_class=TimedRoute)
+
+    async def auth():
+        with timed("auth"):
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+
+    @router.get("/items/{item_id}", dependencies=[Depends(auth)])
+    async def get_item(item_id: int):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT :id"), {"id": item_id})
+        return {"id": item_id}
+
+    app.include_router(router)
+    return app
+
+
+def test_timed_records_self_time_only_when_sampled():
+    with timed("ignored"):
+        pass
+
+    timing = ServerTiming()
+    token = _current.set(timing)
+    try:
+        with timed("outer"):
+            with timed("inner"):
+                timing.add("db", 0.5)
+    finally:
+        _current.reset(token)
+
+    assert timing.phases["db"] == 0.5
+    assert timing.phases["outer"] < 0.5
+    assert set(timing.phases) == {"outer", "inner", "db"}
+
+def test_header_breaks_down_the_request():
+    response = TestClient(make_app(sample_rate=1.0)).get("/items/7")
+
+    assert response.json() == {"id": 7}
+    assert set(phases(response)) == {"auth", "db", "app", "encode", "total"}
+
+def test_unsampled_requests_are_not_timed_unless_forced():
+    client = TestClient(make_app(sample_rate=0.0))
+
+    assert "server-timing" not in client.get("/items/1").headers
+    assert "total" in phases(client.get("/items/1", headers={"X-Server-Timing": "1"}))
+
+def test_production_forces_timing_only_with_the_token():
+    client = TestClient(make_app(sample_rate=0.0, require_token=True, force_token="internal"))
+
+    assert "server-timing" not in client.get("/items/1", headers={"X-Server-Timing": "1"}).headers
+    assert "total" in phases(client.get("/items/1", headers={"X-Server-Timing": "internal"}))
+
+def test_production_without_a_token_never_forces_timing():
+    client = TestClient(make_app(sample_rate=0.0, require_token=True, force_token=""))
+
+    assert "server-timing" not in client.get("/items/1", headers={"X-Server-Timing": ""}).headers
+
+def test_production_defaults_sample_nothing(monkeypatch):
+    monkeypatch.setattr(server_timing.settings, "ENVIRONMENT", "production")
+    monkeypatch.setattr(server_timing.settings, "SERVER_TIMING_SAMPLE_RATE", None)
+    middleware = ServerTimingMiddleware(None)
+
+    assert middleware.sample_rate == 0.0
+    assert middleware.require_token
+
+    monkeypatch.setattr(server_timing.settings, "ENVIRONMENT", "staging")
+    middleware = ServerTimingMiddleware(None)
+
+    assert middleware.sample_rate == 1.0
+    assert not middleware.require_token
+
+def test_disabled_ignores_forced_requests():
+    client = TestClient(make_app(enabled=False))
+
+    assert "server-timing" not in client.get("/items/1", headers={"X-Server-Timing": "1"}).headers
+
+def test_app_endpoints_report_timing(memory_client):
+    response = memory_client.get(
+        "/api/v1/locations/nearby",
+        params={"latitude": 40.0, "longitude": -3.0, "radius_km": 5}
+    )
+
+    assert response.status_code == 200
+    assert {"views", "app", "encode", "total"} <= set(phases(response))
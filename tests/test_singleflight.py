@@ -0,0 +1,127 @@
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.core.singleflight import SingleFlight, normalize_key
+from src.models.location import Location
+from src.schemas.location import LocationWithDistance
+from src.services.location import LocationService
+from src.services.recomendation import RecommendationService
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = 0
+
+    async def query():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return ["row"]
+
+    results = await asyncio.gather(*(flight.do("key", query) for _ in range(10)))
+
+    assert calls == 1
+    assert all(result == ["row"] for result in results)
+    assert flight.coalesced == 9
+    assert not flight.in_flight("key")
+
+
+@pytest.mark.asyncio
+async def test_different_keys_run_separately():
+    flight = SingleFlight()
+    calls = []
+
+    async def query(key):
+        calls.append(key)
+        await asyncio.sleep(0)
+        return key
+
+    results = await asyncio.gather(flight.do("a", lambda: query("a")), flight.do("b", lambda: query("b")))
+
+    assert results == ["a", "b"]
+    assert sorted(calls) == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_and_not_cached():
+    flight = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        flight.do("key", failing),
+        flight.do("key", failing),
+        return_exceptions=True
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert await flight.do("key", lambda: asyncio.sleep(0, result="ok")) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_waiters_take_over_when_leader_is_cancelled():
+    flight = SingleFlight()
+    started = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(10)
+
+    leader = asyncio.create_task(flight.do("key", slow))
+    await started.wait()
+    waiter = asyncio.create_task(flight.do("key", lambda: asyncio.sleep(0, result="retried")))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await waiter == "retried"
+
+
+def test_normalize_key_rounds_floats():
+    assert normalize_key("nearby", 40.71280001, -74.006, 1) == ("nearby", 40.7128, -74.006, 1)
+
+
+@pytest.mark.asyncio
+async def test_nearby_callers_get_detached_snapshots():
+    now = datetime.now(timezone.utc)
+    location = Location(id=1, name="Park", latitude=4.6, longitude=-74.0, created_at=now, updated_at=now)
+    location.categories = [{"id": 2, "name": "Parks"}]
+    repository = AsyncMock()
+
+    async def get_nearby(**kwargs):
+        await asyncio.sleep(0.01)
+        return [location]
+
+    repository.get_nearby.side_effect = get_nearby
+    service = LocationService(location_repository=repository, category_repository=AsyncMock())
+
+    first, second = await asyncio.gather(*(
+        service.get_nearby_locations(None, latitude=4.6, longitude=-74.0, radius_km=1.0, limit=5)
+        for _ in range(2)
+    ))
+
+    repository.get_nearby.assert_called_once()
+    assert first is not second
+    assert isinstance(first[0], LocationWithDistance)
+    assert first[0].categories[0].name == "Parks"
+
+
+@pytest.mark.asyncio
+async def test_random_exploration_is_not_coalesced():
+    repository = AsyncMock()
+
+    async def get_exploration_recommendations(db, limit):
+        await asyncio.sleep(0.01)
+        return []
+
+    repository.get_exploration_recommendations.side_effect = get_exploration_recommendations
+    service = RecommendationService(repository=repository)
+
+    await asyncio.gather(*(service.get_exploration_recommendations(None, limit=5) for _ in range(2)))
+
+    assert repository.get_exploration_recommendations.call_count == 2
@@ -0,0 +1,20 @@
+from src.core.config import get_settings
+from src.core.profiling import measure_import_time, profile_imports
+
+
+def test_import_main_stays_within_budget():
+    budget = get_settings().STARTUP_IMPORT_BUDGET_SECONDS
+
+    elapsed = measure_import_time("main")
+
+    assert elapsed <= budget, (
+        f"`import main` took {elapsed:.3f}s, budget is {budget:.3f}s. "
+        "Run `python -m src.core.profiling` to find the slow imports."
+    )
+
+
+def test_migration_and_server_modules_are_not_imported_at_startup():
+    imported = {timing.module for timing in profile_imports("main")}
+
+    assert "alembic" not in imported
+    assert "uvicorn" not in imported
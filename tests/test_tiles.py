@@ -0,0 +1,108 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.invalidation import invalidation_bus
+from src.core.tiles import TILES_TOPIC, pack_tile, tiles_for_point, unpack_tile
+from src.services.location import LocationService
+from src.services.tile import TileCache, TileService, evict_point, tile_cache
+
+@pytest.fixture
+def tile_service():
+    service = TileService(cache=TileCache(max_entries=10))
+    service.location_repository = AsyncMock()
+    service.location_repository.get_tile.return_value = b"\x1a\x02"
+    return service
+
+@pytest.fixture
+def mock_session():
+    return AsyncMock(spec=AsyncSession)
+
+
+def test_pack_tile_round_trips():
+    assert unpack_tile(pack_tile(20, 1048575, 3)) == (20, 1048575, 3)
+
+def test_point_is_in_one_tile_per_zoom_away_from_edges():
+    # centre of tile 2/1/1, away from every tile edge up to zoom 2
+    tiles = list(tiles_for_point(-67.5, 40.98, max_zoom=2))
+
+    assert tiles == [(0, 0, 0), (1, 0, 0), (2, 1, 1)]
+
+def test_point_near_an_edge_is_in_the_buffered_neighbour():
+    # just east of the meridian: tile x=1 at zoom 1, inside the buffer of x=0
+    tiles = set(tiles_for_point(0.1, 45.0, max_zoom=1))
+
+    assert {(1, 0, 0), (1, 1, 0)} <= tiles
+
+@pytest.mark.asyncio
+async def test_tiles_are_rendered_once(tile_service, mock_session):
+    first = await tile_service.get_tile(mock_session, 3, 2, 3)
+    second = await tile_service.get_tile(mock_session, 3, 2, 3)
+
+    assert first == second == b"\x1a\x02"
+    tile_service.location_repository.get_tile.assert_called_once_with(
+        session=mock_session, z=3, x=2, y=3
+    )
+
+@pytest.mark.asyncio
+async def test_insert_evicts_only_the_affected_tiles(tile_service, mock_session):
+    bogota = next(t for t in tiles_for_point(-74.08, 4.61, 5) if t[0] == 5)
+    await tile_service.get_tile(mock_session, *bogota)
+    await tile_service.get_tile(mock_session, 5, 0, 0)
+
+    evict_point(tile_service.cache, -74.08, 4.61)
+
+    assert pack_tile(*bogota) not in tile_service.cache
+    assert pack_tile(5, 0, 0) in tile_service.cache
+
+@pytest.mark.asyncio
+async def test_render_in_flight_during_an_insert_is_not_cached(tile_service, mock_session):
+    queried, evicted = asyncio.Event(), asyncio.Event()
+
+    async def get_tile(**kwargs):
+        # the rows are read before the insert, the tile is ready after it
+        queried.set()
+        await evicted.wait()
+        return b"stale"
+
+    tile_service.location_repository.get_tile.side_effect = get_tile
+    render = asyncio.ensure_future(tile_service.get_tile(mock_session, 0, 0, 0))
+    await queried.wait()
+    evict_point(tile_service.cache, -74.08, 4.61)
+    evicted.set()
+
+    assert await render == b"stale"
+    assert pack_tile(0, 0, 0) not in tile_service.cache
+
+    tile_service.location_repository.get_tile.side_effect = None
+    await tile_service.get_tile(mock_session, 0, 0, 0)
+    assert tile_service.cache.get(pack_tile(0, 0, 0)) == b"\x1a\x02"
+
+@pytest.mark.asyncio
+async def test_bus_notification_evicts_tiles():
+    tile_cache.set(pack_tile(4, 1, 2), b"tile")
+
+    await invalidation_bus.dispatch(
+        json.dumps({"table": TILES_TOPIC, "ids": [pack_tile(4, 1, 2)]})
+    )
+
+    assert pack_tile(4, 1, 2) not in tile_cache
+
+@pytest.mark.asyncio
+async def test_create_location_evicts_tiles_after_the_commit(mock_session):
+    key = pack_tile(0, 0, 0)
+    service = LocationService(location_repository=AsyncMock(), category_repository=AsyncMock())
+    service.location_repository.create_with_coordinates.return_value = AsyncMock(id=1)
+
+    async def create_relationship(**kwargs):
+        # a render in flight caches the tile before the relationship commits
+        tile_cache.set(key, b"stale")
+        return object()
+
+    service.category_repository.create_relationship.side_effect = create_relationship
+
+    await service.create_location(mock_session, name="Park", latitude=4.61, longitude=-74.08, category=1)
+
+    assert key not in tile_cache
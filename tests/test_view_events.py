@@ -0,0 +1,131 @@
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+import pytest
+
+from src.core.coverage import COVERAGE_TOPIC
+from src.core.view_events import EVENT_COLUMNS, EVENTS_TABLE, ROLLUP, ViewEventLog
+from src.models.location import Location
+from src.models.view_event import LocationViewEvent
+from src.services.location import LocationService
+
+class MockPool:
+    def __init__(self, connection):
+        self.connection = connection
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.connection
+
+def _connection(locked=True):
+    connection = AsyncMock()
+    connection.fetchval.return_value = locked
+    # transaction() is a sync call returning an async context manager
+    connection.transaction = MagicMock()
+    return connection
+
+def _log(**kwargs):
+    log = ViewEventLog(**kwargs)
+    log.enabled = True
+    return log
+
+
+def test_views_are_not_buffered_until_started():
+    log = ViewEventLog()
+
+    log.record([1, 2])
+
+    assert len(log) == 0
+
+@pytest.mark.asyncio
+async def test_flush_copies_the_buffer_in_one_batch():
+    connection = _connection()
+    log = _log()
+    log.record([1, 2])
+    log.record([3])
+
+    assert await log.flush(MockPool(connection)) == 3
+
+    connection.copy_records_to_table.assert_called_once()
+    args, kwargs = connection.copy_records_to_table.call_args
+    assert args == (EVENTS_TABLE,)
+    assert kwargs["columns"] == EVENT_COLUMNS
+    assert [location_id for location_id, _ in kwargs["records"]] == [1, 2, 3]
+    assert len(log) == 0
+
+@pytest.mark.asyncio
+async def test_failed_flush_requeues_and_drops_the_oldest_beyond_the_bound():
+    connection = _connection()
+    connection.copy_records_to_table.side_effect = OSError("connection lost")
+    log = _log(max_buffered=3)
+    log.record([1, 2])
+
+    with pytest.raises(OSError):
+        await log.flush(MockPool(connection))
+    log.record([3, 4])
+
+    assert [location_id for location_id, _ in log._buffer] == [2, 3, 4]
+    assert log.dropped == 1
+
+def test_a_full_buffer_wakes_the_flusher():
+    log = _log(flush_size=2)
+
+    log.record([1])
+    assert not log._full.is_set()
+    log.record([2])
+    assert log._full.is_set()
+
+@pytest.mark.asyncio
+async def test_rollup_is_skipped_without_the_advisory_lock():
+    connection = _connection(locked=False)
+
+    assert await _log().rollup(MockPool(connection)) is None
+    connection.fetch.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_rollup_runs_with_the_lag():
+    connection = _connection()
+    log = _log(rollup_lag_seconds=10.0, retention_seconds=3600.0)
+
+    await log.rollup(MockPool(connection))
+
+    connection.fetch.assert_called_once_with(ROLLUP, 10.0, 3600.0)
+    assert log.rollups == 1
+
+@pytest.mark.asyncio
+async def test_rollup_notifies_the_coverage_of_the_reviewed_categories():
+    connection = _connection()
+    now = datetime.now(timezone.utc)
+    connection.fetch.return_value = [(2, None, now), (1, now, now), (2, now, now)]
+
+    await _log().rollup(MockPool(connection))
+
+    [(statement, channel, payload)] = [call.args for call in connection.execute.call_args_list[1:]]
+    assert "pg_notify" in statement
+    assert json.loads(payload) == {"table": COVERAGE_TOPIC, "ids": [1, 2]}
+
+def test_events_are_windowed_by_the_database_copy_time():
+    # COPY leaves recorded_at to the server default, so a batch requeued
+    # after a failed copy is stamped when it finally lands
+    assert "recorded_at" not in EVENT_COLUMNS
+    assert LocationViewEvent.__table__.c.recorded_at.server_default is not None
+    assert "e.recorded_at >= b.start AND e.recorded_at < b.stop" in ROLLUP
+    assert "DELETE FROM location_view_events" in ROLLUP
+
+@pytest.mark.asyncio
+async def test_nearby_records_views_instead_of_updating_reviews():
+    location_repository = AsyncMock()
+    now = datetime.now(timezone.utc)
+    location_repository.get_nearby.return_value = [
+        Location(id=id, name=f"Place {id}", latitude=4.6, longitude=-74.0, created_at=now, updated_at=now)
+        for id in (1, 2)
+    ]
+    category_repository = AsyncMock()
+    log = _log()
+    service = LocationService(location_repository, category_repository, view_log=log)
+
+    await service.get_nearby_locations(None, latitude=4.6, longitude=-74.0, radius_km=1.0, limit=10)
+
+    assert [location_id for location_id, _ in log._buffer] == [1, 2]
+    category_repository.update_last_view.assert_not_called()
@@ -0,0 +1,79 @@
+from contextlib import asynccontextmanager
+from unittest.mock import Mock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.health import router as health_router
+from src.core import warmup
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+    app.include_router(health_router)
+    return app
+
+
+def test_ready_returns_503_while_warming_up(app):
+    app.state.ready = False
+    client = TestClient(app)
+
+    response = client.get("/ready")
+
+    assert response.status_code == 503
+    assert response.json() == {"status": "warming_up"}
+
+
+def test_ready_returns_200_once_warm(app):
+    app.state.ready = True
+    client = TestClient(app)
+
+    response = client.get("/ready")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ready"}
+
+
+@pytest.mark.asyncio
+async def test_warm_up_failure_leaves_the_app_unready(app):
+    app.state.ready = False
+
+    failing_engine = Mock()
+    failing_engine.connect.side_effect = OSError("connection refused")
+
+    with patch.object(warmup, "engine", failing_engine):
+        assert await warmup.warm_up(app) is False
+
+    assert app.state.ready is False
+    response = TestClient(app).get("/ready")
+    assert response.status_code == 503
+    assert response.json() == {"status": "degraded"}
+
+
+@pytest.mark.asyncio
+async def test_warm_up_closes_opened_connections_when_one_fails(app, monkeypatch):
+    app.state.ready = False
+    monkeypatch.setattr(warmup.settings, "DB_POOL_MIN_SIZE", 3)
+    opened = []
+
+    @asynccontextmanager
+    async def connect():
+        if len(opened) == 2:
+            raise OSError("too many connections")
+        connection = Mock(closed=False)
+        opened.append(connection)
+        try:
+            yield connection
+        finally:
+            connection.closed = True
+
+    failing_engine = Mock()
+    failing_engine.connect.side_effect = connect
+
+    with patch.object(warmup, "engine", failing_engine):
+        assert await warmup.warm_up(app) is False
+
+    assert len(opened) == 2
+    assert all(connection.closed for connection in opened)